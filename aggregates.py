@@ -0,0 +1,76 @@
+"""Dataset aggregates that can be updated from a ``Delta``.
+
+Each aggregate is a sum over rows, so the value for a new version is the old
+value plus the contribution of the added rows minus that of the removed ones.
+The store carries them forward on incremental reloads (see ``INCREMENTAL_AGGREGATES``).
+"""
+import numpy as np
+import pandas as pd
+
+from procurement import ProcurementIndex, update_procurement_index
+from schedule import Schedule, update_schedule
+from schema import money_sum
+
+
+# --- Tasks ---
+def task_totals(df):
+    """Counts and money totals over all tasks, including the EVM sums."""
+    percent = pd.to_numeric(df['Percent Complete'], errors='coerce').fillna(0).astype(np.float64)
+    budget = pd.to_numeric(df['Budget'], errors='coerce').fillna(0).astype(np.float64)
+    return pd.Series({
+        'Tasks': float(len(df)),
+        'Completed': float((percent == 100).sum()),
+        'Budget': float(budget.sum()),
+        'Actual Cost': money_sum(pd.to_numeric(df['Actual Cost'], errors='coerce')),
+        'Cost Variance': money_sum(pd.to_numeric(df['Cost Variance'], errors='coerce')),
+        'Earned Value': float((budget * percent / 100).sum()),
+        'Percent Complete': float(percent.sum()),
+    })
+
+
+def update_task_totals(totals, delta):
+    return totals + task_totals(delta.added) - task_totals(delta.removed)
+
+
+# --- Procurement ---
+def procurement_buckets(df):
+    """Total Cost and PO count per (order month, Status)."""
+    month = pd.to_datetime(df['Order Date']).dt.to_period('M').rename('Month')
+    # Summed in float64 whatever width the schema stored the costs in.
+    cost = pd.to_numeric(df['Total Cost'], errors='coerce').astype(np.float64)
+    return cost.groupby([month, df['Status'].rename('Status')], dropna=False, observed=True).agg(
+        ['sum', 'size']
+    ).set_axis(['Total Cost', 'POs'], axis=1).astype(float)
+
+
+def update_procurement_buckets(buckets, delta):
+    updated = buckets.add(procurement_buckets(delta.added), fill_value=0).sub(
+        procurement_buckets(delta.removed), fill_value=0
+    )
+    return updated[updated['POs'] > 0]
+
+
+def monthly_procurement_cost(buckets):
+    """Total Cost per month as a frame with an 'Order Date' (month end) column."""
+    monthly = buckets['Total Cost'].groupby(level='Month').sum()
+    if not monthly.empty:
+        # Months without orders show as zero, as with a monthly resample.
+        monthly = monthly.reindex(pd.period_range(monthly.index.min(), monthly.index.max(), freq='M'), fill_value=0)
+    month_end = monthly.index.to_timestamp(how='end').normalize()
+    return pd.DataFrame({'Order Date': month_end, 'Total Cost': monthly.to_numpy()})
+
+
+# Dataset name -> {derived key: (build, update)}
+INCREMENTAL_AGGREGATES = {
+    'tasks': {
+        'task_totals': (task_totals, update_task_totals),
+        # Keyed ('schedule', as_of); reuses the dependency graph when only
+        # dates or progress changed.
+        'schedule': (Schedule.build, update_schedule),
+    },
+    'procurement': {
+        'procurement_buckets': (procurement_buckets, update_procurement_buckets),
+        # Not a sum: the index merges appended POs and is rebuilt otherwise.
+        'procurement_index': (ProcurementIndex, update_procurement_index),
+    },
+}
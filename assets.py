@@ -0,0 +1,56 @@
+"""Pre-encoded image assets.
+
+``st.image`` decodes and re-encodes an image file on every rerun, and the
+company logo is a 15862 x 5735 PNG (91 MP) that takes seconds to decode.
+Images are instead resized once to the pixels they are shown at (twice the
+display width, for high-DPI screens), encoded as PNG and kept in memory and
+on disk under ``CACHE_DIR/assets``, keyed by the source file's path, mtime
+and size and the width.
+"""
+import functools
+import hashlib
+import io
+import os
+import warnings
+
+from data_cache import CACHE_DIR
+
+ASSET_DIR = os.path.join(CACHE_DIR, "assets")
+# Device pixels per display pixel the encoded images are sized for.
+PIXEL_RATIO = 2
+
+
+@functools.lru_cache(maxsize=16)
+def _encoded(path, mtime_ns, size, width):
+    key = hashlib.sha256(f"{path}:{mtime_ns}:{size}:{width}".encode()).hexdigest()
+    cache_file = os.path.join(ASSET_DIR, key + ".png")
+    try:
+        with open(cache_file, "rb") as f:
+            return f.read()
+    except FileNotFoundError:
+        pass
+
+    from PIL import Image
+
+    with warnings.catch_warnings():
+        # Our own logo, not untrusted input; it is just over Pillow's bomb limit.
+        warnings.simplefilter("ignore", Image.DecompressionBombWarning)
+        with Image.open(path) as image:
+            image.thumbnail((width * PIXEL_RATIO, image.height))
+            buffer = io.BytesIO()
+            image.save(buffer, format="PNG", optimize=True)
+    data = buffer.getvalue()
+
+    os.makedirs(ASSET_DIR, exist_ok=True)
+    tmp = f"{cache_file}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, cache_file)
+    return data
+
+
+def image_bytes(path, width):
+    """PNG bytes of the image at ``path`` sized for display at ``width`` pixels."""
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    return _encoded(path, stat.st_mtime_ns, stat.st_size, width)
@@ -0,0 +1,195 @@
+"""Headless batch PDF reports.
+
+Renders one PDF per combination of project, category selection and date
+window, with the same loaders and ``generate_pdf_report`` as the dashboard
+but no Streamlit::
+
+    python batch_reports.py --each-category --window 2024-01-01:2024-03-31 \\
+        --window 2024-04-01:2024-06-30 --output-dir reports
+
+Each project's workbooks are loaded once (through the columnar cache) and
+its forecast computed once.  Reports whose filters select the same rows are
+generated once and copied to every name.  All report figures are built here,
+deduplicated by spec and rasterized up front through one warm Kaleido
+browser into the PNG cache, so charts the reports share -- procurement,
+forecast, identical subsets -- render once.  The worker processes then find
+every chart in the cache and only assemble the HTML and run wkhtmltopdf, in
+parallel.
+"""
+import argparse
+import hashlib
+import os
+import re
+import shutil
+import sys
+from concurrent.futures import as_completed
+
+import pandas as pd
+
+from filters import FilterIndex
+from forecast import monte_carlo
+from loaders import (PROCUREMENT_FILENAME, RISK_FILENAME, TASKS_FILENAME, load_and_process_data,
+                     load_procurement_data, load_risk_data)
+from portfolio import discover_projects
+from report_jobs import REPORT_WORKERS
+from worker_pool import spawn_pool
+
+ALL_CATEGORIES = 'all'
+# Separates categories within one --categories selection; category names contain commas.
+CATEGORY_SEPARATOR = ';'
+
+
+# --- Data ---
+class Project:
+    """One site's data, loaded once and shared by all of its reports."""
+
+    def __init__(self, name, directory, forecast=True):
+        self.name = name
+        self.tasks = load_and_process_data(os.path.join(directory, TASKS_FILENAME))
+        self.procurement = load_procurement_data(os.path.join(directory, PROCUREMENT_FILENAME))
+        self.index = FilterIndex(self.tasks)
+        self.forecast = None
+        if forecast:
+            risk_path = os.path.join(directory, RISK_FILENAME)
+            self.forecast = monte_carlo(self.tasks, load_risk_data(risk_path) if os.path.isfile(risk_path) else None)
+
+
+class Report:
+    def __init__(self, project, filtered_df):
+        self.project = project
+        self.filtered_df = filtered_df
+        self.paths = []
+
+
+def _slug(text):
+    return re.sub(r'[^A-Za-z0-9]+', '-', text).strip('-') or 'report'
+
+
+def parse_window(text):
+    """``START:END`` with either side optional, as Timestamps or None."""
+    start, _, end = text.partition(':')
+    return (pd.Timestamp(start) if start else None), (pd.Timestamp(end) if end else None)
+
+
+def plan_reports(projects, selections, each_category, windows, search, output_dir):
+    """Returns the distinct reports to generate, each with every path it is written to."""
+    reports = {}
+    for project in projects:
+        tasks = project.tasks
+        project_selections = list(selections)
+        if each_category:
+            project_selections += [[category] for category in project.index.categories]
+        if not project_selections:
+            project_selections = [[ALL_CATEGORIES]]
+        for categories in project_selections:
+            label = ALL_CATEGORIES if categories == [ALL_CATEGORIES] else '+'.join(_slug(c) for c in categories)
+            if categories == [ALL_CATEGORIES]:
+                categories = project.index.categories
+            for start, end in windows:
+                start = start if start is not None else tasks['Start Date'].min()
+                end = end if end is not None else tasks['End Date'].max()
+                filtered_df = project.index.filter(categories, search, start, end)
+                name = f"{_slug(project.name)}_{label}_{start:%Y%m%d}-{end:%Y%m%d}.pdf"
+                if filtered_df.empty:
+                    print(f"skipped {name}: no tasks match")
+                    continue
+                # Same project, same rows: the same report.
+                rows = hashlib.sha256(filtered_df.index.to_numpy().tobytes()).hexdigest()
+                report = reports.setdefault((project.name, rows), Report(project, filtered_df))
+                report.paths.append(os.path.join(output_dir, name))
+    return list(reports.values())
+
+
+# --- Rendering ---
+def prerender_figures(reports):
+    """Rasterizes every distinct report figure once, filling the PNG cache the workers read."""
+    from report import report_figures
+    from report_render import figure_key, render_figures
+
+    figures = {}
+    for report in reports:
+        for fig in report_figures(report.filtered_df, report.project.procurement, report.project.forecast).values():
+            figures.setdefault(figure_key(fig), fig)
+    render_figures(figures)
+    return len(figures)
+
+
+def _write_report(paths, filtered_df, tasks_df, procurement_df, forecast):
+    from report import generate_pdf_report
+
+    pdf = generate_pdf_report(filtered_df, tasks_df, procurement_df, forecast)
+    with open(paths[0], "wb") as f:
+        f.write(pdf)
+    for path in paths[1:]:
+        shutil.copyfile(paths[0], path)
+    return paths
+
+
+def write_reports(reports, workers):
+    """Generates the reports, ``workers`` at a time; yields ``(paths, error)`` as each finishes."""
+    jobs = [(report.paths, report.filtered_df, report.project.tasks, report.project.procurement,
+             report.project.forecast) for report in reports]
+    if workers <= 1:
+        for job in jobs:
+            try:
+                yield _write_report(*job), None
+            except Exception as exc:
+                yield job[0], exc
+        return
+    with spawn_pool(workers) as executor:
+        futures = {executor.submit(_write_report, *job): job[0] for job in jobs}
+        for future in as_completed(futures):
+            yield futures[future], future.exception()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--project', action='append', default=[], metavar='DIR',
+                        help="directory holding a project's workbooks (default: the current directory)")
+    parser.add_argument('--portfolio', metavar='ROOT', help="add every project under ROOT, as the portfolio tab does")
+    parser.add_argument('--categories', action='append', default=[], metavar='LIST',
+                        help=f"categories for one report, separated by '{CATEGORY_SEPARATOR}' (default: all)")
+    parser.add_argument('--each-category', action='store_true', help="also one report per category")
+    parser.add_argument('--window', action='append', default=[], metavar='START:END',
+                        help="date window for one report; either side may be left open (default: the whole project)")
+    parser.add_argument('--search', default='', help="task name filter applied to every report")
+    parser.add_argument('--no-forecast', action='store_true', help="leave the Monte Carlo forecast out of the reports")
+    parser.add_argument('--output-dir', default='reports')
+    parser.add_argument('--workers', type=int, default=REPORT_WORKERS)
+    parser.add_argument('--dry-run', action='store_true', help="list the reports without generating them")
+    args = parser.parse_args()
+
+    directories = {os.path.basename(os.path.abspath(d)) or d: d for d in args.project}
+    if args.portfolio:
+        directories.update(discover_projects(args.portfolio))
+    if not directories:
+        directories = {os.path.basename(os.getcwd()): '.'}
+    selections = [[c.strip() for c in text.split(CATEGORY_SEPARATOR) if c.strip()] for text in args.categories]
+    windows = [parse_window(text) for text in args.window] or [(None, None)]
+
+    projects = [Project(name, directory, forecast=not args.no_forecast) for name, directory in directories.items()]
+    reports = plan_reports(projects, selections, args.each_category, windows, args.search, args.output_dir)
+    print(f"{sum(len(r.paths) for r in reports)} reports, {len(reports)} distinct")
+    if args.dry_run:
+        for report in reports:
+            print(f"{len(report.filtered_df):>8} tasks  " + ", ".join(report.paths))
+        return
+    if not reports:
+        return
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    print(f"{prerender_figures(reports)} distinct figures rendered")
+    failed = 0
+    for paths, error in write_reports(reports, args.workers):
+        if error is not None:
+            failed += 1
+            print(f"failed {', '.join(paths)}: {error}", file=sys.stderr)
+        else:
+            for path in paths:
+                print(f"wrote {path}")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""Benchmark: vectorized EVM engine vs. the old per-row iterrows/.loc loop.
+
+Also times the time-phased S-curve sweep.  Tasks come from ``synthetic.py``;
+larger sizes span more sites and so a longer horizon.
+
+Usage: python benchmarks/bench_evm.py [--sizes 1000 10000 100000]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from evm import evm_frame, project_evm, time_phased_evm  # noqa: E402
+from synthetic import make_tasks  # noqa: E402
+
+
+def legacy_evm(filtered_df):
+    # The loop Main.py used before the EVM engine existed.
+    filtered_df = filtered_df.copy()
+    for index, row in filtered_df.iterrows():
+        ev = row['Budget'] * (row['Percent Complete'] / 100)
+        filtered_df.loc[index, 'EV'] = ev
+        filtered_df.loc[index, 'SV'] = ev - row['Budget']
+        filtered_df.loc[index, 'CV'] = ev - row['Actual Cost']
+        filtered_df.loc[index, 'SPI'] = ev / row['Budget'] if row['Budget'] != 0 else 0
+        filtered_df.loc[index, 'CPI'] = ev / row['Actual Cost'] if row['Actual Cost'] != 0 else 0
+    total_pv = filtered_df['Budget'].sum()
+    total_ev = filtered_df['EV'].sum()
+    total_ac = filtered_df['Actual Cost'].sum()
+    return filtered_df, (total_ev - total_pv, total_ev - total_ac)
+
+
+def vectorized_evm(df):
+    return evm_frame(df), project_evm(df)
+
+
+def best_of(func, df, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'tasks':>8} {'legacy (s)':>12} {'vectorized (s)':>15} {'speedup':>9}")
+    for n in args.sizes:
+        df = make_tasks(n, predecessors=False)
+        # The legacy loop is slow enough that one run is representative.
+        legacy = best_of(legacy_evm, df, 1)
+        fast = best_of(vectorized_evm, df, args.repeat)
+        print(f"{n:>8} {legacy:>12.3f} {fast:>15.5f} {legacy / fast:>8.0f}x")
+
+    print()
+    print(f"{'tasks':>8} {'profile':>13} {'S-curves (s)':>13}")
+    for n in args.sizes:
+        df = make_tasks(n, predecessors=False)
+        for profile in ('linear', 'bell'):
+            elapsed = best_of(lambda d: time_phased_evm(d, as_of='2025-01-01', profile=profile), df, args.repeat)
+            print(f"{n:>8} {profile:>13} {elapsed:>13.4f}")
+
+
+if __name__ == '__main__':
+    main()
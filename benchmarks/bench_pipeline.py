@@ -0,0 +1,258 @@
+"""Benchmark: the dashboard's data paths end to end, outside Streamlit.
+
+For each size, synthetic workbooks (see ``synthetic.py``) are written once
+under ``--data-dir`` and reused on later runs.  Each stage is timed on its
+own: Excel parsing, the Arrow cache, derived columns, filters, EVM, the
+schedule and forecast, procurement grouping, the risk matrix, snapshot
+history, figure construction and the PDF report.  Stages that can't run here (no Chrome for
+Kaleido, no wkhtmltopdf) are recorded as skipped with the reason.
+
+Results are written as JSON; ``--compare`` prints the ratio to an earlier
+result file and flags stages that got slower.
+
+Usage: python benchmarks/bench_pipeline.py [--sizes 1000 10000 100000] [--output results.json] [--compare old.json]
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from aggregates import procurement_buckets  # noqa: E402
+from data_cache import read_excel_cached  # noqa: E402
+from evm import evm_frame, evm_rollup, project_evm, time_phased_evm  # noqa: E402
+from filters import FilterIndex  # noqa: E402
+from forecast import build_forecast_figures, monte_carlo  # noqa: E402
+from history import DatasetHistory  # noqa: E402
+from loaders import process_procurement, process_tasks  # noqa: E402
+from procurement import ProcurementIndex  # noqa: E402
+from risk import RiskAnalysis, build_risk_heatmap  # noqa: E402
+from schedule import Schedule  # noqa: E402
+from synthetic import make_procurement, make_risks, make_tasks, write_workbooks  # noqa: E402
+from timeline import build_timeline_figure  # noqa: E402
+
+AS_OF = pd.Timestamp('2025-01-01')
+# Ratio to the baseline above which --compare flags a stage.
+REGRESSION_THRESHOLD = 1.25
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def workbooks(data_dir, n, seed):
+    """Synthetic workbooks for ``n`` tasks and POs, written on first use."""
+    directory = os.path.join(data_dir, f"{n}-seed{seed}")
+    marker = os.path.join(directory, "complete")
+    if not os.path.exists(marker):
+        paths = write_workbooks(directory, make_tasks(n, seed), make_risks(max(10, n // 100), seed),
+                                make_procurement(n, seed))
+        with open(marker, "w") as f:
+            json.dump(paths, f)
+    with open(marker) as f:
+        return json.load(f)
+
+
+# --- Stages ---
+def run_stages(paths, repeat, forecast_iterations, report):
+    """Yields ``(stage, seconds, rows)``; seconds is None with a reason in place of rows when skipped."""
+    # Parsing a large workbook takes minutes, so the cold paths run once.
+    start = time.perf_counter()
+    raw_tasks = pd.read_excel(paths['tasks'])
+    yield 'excel.read_tasks', time.perf_counter() - start, len(raw_tasks)
+
+    cache_dir = tempfile.mkdtemp(prefix="bench-cache-")
+    try:
+        start = time.perf_counter()
+        raw_procurement = read_excel_cached(paths['procurement'], cache_dir=cache_dir)
+        yield 'cache.build_procurement', time.perf_counter() - start, len(raw_procurement)
+        read_excel_cached(paths['tasks'], cache_dir=cache_dir)
+        yield 'cache.read_tasks', best_of(lambda: read_excel_cached(paths['tasks'], cache_dir=cache_dir), repeat), len(raw_tasks)
+        risk_df = read_excel_cached(paths['risk'], cache_dir=cache_dir)
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+    yield 'loaders.process_tasks', best_of(lambda: process_tasks(raw_tasks.copy()), repeat), len(raw_tasks)
+    tasks_df = process_tasks(raw_tasks.copy())
+    procurement_df = process_procurement(raw_procurement.copy())
+    n = len(tasks_df)
+
+    yield 'filters.build_index', best_of(lambda: FilterIndex(tasks_df), repeat), n
+    categories = tasks_df['Category'].unique()[::2]
+    window = (tasks_df['Start Date'].min(), tasks_df['End Date'].max() - pd.Timedelta(days=30))
+    index = FilterIndex(tasks_df)
+    filtered_df = index.filter(categories, "install", *window)
+
+    def uncached_filter():
+        # Repeat filters on one index are memoised; time the first call.
+        index._cache.clear()
+        return index.filter(categories, "install", *window)
+    yield 'filters.filter', best_of(uncached_filter, repeat), len(filtered_df)
+
+    yield 'evm.frame_and_totals', best_of(lambda: (evm_frame(tasks_df), project_evm(tasks_df)), repeat), n
+    yield 'evm.rollup', best_of(lambda: evm_rollup(tasks_df), repeat), n
+    yield 'evm.time_phased_weekly', best_of(lambda: time_phased_evm(tasks_df, as_of=AS_OF, freq='W'), repeat), n
+
+    yield 'schedule.build', best_of(lambda: Schedule.build(tasks_df, AS_OF), repeat), n
+    forecast = monte_carlo(tasks_df, risk_df, AS_OF, iterations=forecast_iterations, workers=0)
+    yield 'forecast.monte_carlo', best_of(
+        lambda: monte_carlo(tasks_df, risk_df, AS_OF, iterations=forecast_iterations, workers=0), repeat), n
+
+    yield 'procurement.build_index', best_of(lambda: ProcurementIndex(procurement_df), repeat), len(procurement_df)
+    yield 'procurement.monthly_buckets', best_of(
+        lambda: ProcurementIndex(procurement_df).buckets('M', 'Status'), repeat), len(procurement_df)
+    yield 'procurement.aggregate_buckets', best_of(lambda: procurement_buckets(procurement_df), repeat), len(procurement_df)
+
+    yield 'risk.analysis', best_of(lambda: RiskAnalysis(risk_df), repeat), len(risk_df)
+
+    # History: a first (full) record, one with 1% of the rows edited, and
+    # queries over ten versions.
+    history_dir = tempfile.mkdtemp(prefix="bench-history-")
+    try:
+        def empty_history():
+            path = os.path.join(history_dir, "tasks.history")
+            if os.path.exists(path):
+                os.remove(path)
+            return DatasetHistory('tasks', path)
+
+        def edit(df, step):
+            rows = (np.arange(0, n, 100) + step) % n
+            edited = df.copy()
+            edited.loc[rows, 'Actual Cost'] = edited.loc[rows, 'Actual Cost'] + 100
+            return edited
+        yield 'history.keyframe', best_of(lambda: empty_history().append(tasks_df, 0), repeat), n
+        delta_times = []
+        for _ in range(repeat):
+            dataset = empty_history()
+            dataset.append(tasks_df, 0)
+            edited = edit(tasks_df, 1)
+            start = time.perf_counter()
+            dataset.append(edited, 1)
+            delta_times.append(time.perf_counter() - start)
+        yield 'history.delta', min(delta_times), n
+        dataset = empty_history()
+        version = tasks_df
+        for step in range(10):
+            version = edit(version, step)
+            dataset.append(version, step)
+
+        def uncached_trend():
+            dataset._trends.clear()
+            return dataset.trend('Actual Cost', by='Category')
+        yield 'history.as_of', best_of(lambda: dataset.as_of(pd.Timestamp.fromtimestamp(9)), repeat), n
+        yield 'history.trend', best_of(uncached_trend, repeat), n
+    finally:
+        shutil.rmtree(history_dir, ignore_errors=True)
+
+    # Construction plus serialisation, which is what reaches the browser.
+    yield 'figure.timeline', best_of(lambda: build_timeline_figure(tasks_df).to_json(), repeat), n
+    yield 'figure.risk_matrix', best_of(lambda: build_risk_heatmap(RiskAnalysis(risk_df)).to_json(), repeat), len(risk_df)
+    yield 'figure.forecast', best_of(lambda: [fig.to_json() for fig in build_forecast_figures(forecast)], repeat), \
+        forecast.iterations
+
+    if not report:
+        yield 'report.pdf', None, "disabled (--no-report)"
+        return
+    from report import generate_pdf_report
+
+    start = time.perf_counter()
+    try:
+        generate_pdf_report(filtered_df, tasks_df, procurement_df, forecast)
+    except Exception as exc:  # Kaleido without Chrome, pdfkit without wkhtmltopdf
+        yield 'report.pdf', None, f"{type(exc).__name__}: {str(exc).splitlines()[0] if str(exc) else ''}"
+    else:
+        yield 'report.pdf', time.perf_counter() - start, len(filtered_df)
+
+
+# --- Results ---
+def environment():
+    try:
+        revision = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                                  text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        revision = None
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'git_revision': revision,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def compare(results, baseline_path, threshold):
+    """Prints the ratio of each stage to the baseline; returns the regressed (size, stage) pairs."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    print(f"\nCompared with {baseline_path} ({baseline['environment'].get('git_revision')}):")
+    print(f"{'tasks':>8} {'stage':<32} {'before (s)':>11} {'after (s)':>10} {'ratio':>7}")
+    regressions = []
+    for size, stages in results.items():
+        for stage, result in stages.items():
+            before = baseline['results'].get(size, {}).get(stage, {}).get('seconds')
+            after = result['seconds']
+            if before is None or after is None:
+                continue
+            ratio = after / before if before else float('inf')
+            flag = "  slower" if ratio > threshold else ""
+            print(f"{size:>8} {stage:<32} {before:>11.4f} {after:>10.4f} {ratio:>6.2f}x{flag}")
+            if flag:
+                regressions.append((size, stage))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000],
+                        help="tasks and POs per run; Excel caps a sheet at 1,048,575 rows")
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--forecast-iterations', type=int, default=2_000)
+    parser.add_argument('--no-report', action='store_true', help="skip the PDF report stage")
+    parser.add_argument('--data-dir', default=os.path.join(REPO_ROOT, ".cache", "bench"))
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'tasks':>8} {'stage':<32} {'seconds':>10} {'rows':>9}")
+    for n in args.sizes:
+        paths = workbooks(args.data_dir, n, args.seed)
+        stages = results[str(n)] = {}
+        for stage, seconds, rows in run_stages(paths, args.repeat, args.forecast_iterations, not args.no_report):
+            if seconds is None:
+                stages[stage] = {'seconds': None, 'skipped': rows}
+                print(f"{n:>8} {stage:<32} {'skipped':>10}  {rows}")
+            else:
+                stages[stage] = {'seconds': seconds, 'rows': rows}
+                print(f"{n:>8} {stage:<32} {seconds:>10.4f} {rows if rows is not None else '':>9}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({'environment': environment(), 'repeat': args.repeat, 'results': results}, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Benchmark: dashboard cold start and first paint.
+
+Each run starts a fresh Python process that executes ``Main.py`` twice through
+Streamlit's ``AppTest`` with instrumentation on, and reads back:
+
+* ``main.imports``: the script's imports on the first run (cold);
+* ``main.first_paint``: script start until the logos, filters and project
+  header are written;
+* the wall time of the whole first run and of a rerun.
+
+Results use the same JSON layout as ``bench_pipeline.py``, so ``--compare``
+works the same way.
+
+Usage: python benchmarks/bench_startup.py [--runs 3] [--cold-assets] [--output startup.json] [--compare old.json]
+"""
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+from bench_pipeline import REGRESSION_THRESHOLD, compare, environment  # noqa: E402
+
+_CHILD = """
+import json, sys, time
+from streamlit.testing.v1 import AppTest
+app = AppTest.from_file(sys.argv[1], default_timeout=300)
+start = time.perf_counter()
+app.run()
+first = time.perf_counter() - start
+start = time.perf_counter()
+app.run()
+print(json.dumps({'first_run': first, 'rerun': time.perf_counter() - start, 'exceptions': len(app.exception)}))
+"""
+# First-run spans to report, by name.
+SPANS = ('main.imports', 'main.first_paint')
+
+
+def measure_once(cold_assets):
+    """Timings in seconds from one fresh process."""
+    if cold_assets:
+        from assets import ASSET_DIR
+        shutil.rmtree(os.path.join(REPO_ROOT, ASSET_DIR), ignore_errors=True)
+    with tempfile.TemporaryDirectory(prefix="bench-startup-") as workdir:
+        spans_file = os.path.join(workdir, "spans.jsonl")
+        env = dict(os.environ, SOLAR_INSTRUMENT="1", SOLAR_METRICS_FILE=spans_file, SOLAR_WATCH="0")
+        output = subprocess.run([sys.executable, "-c", _CHILD, os.path.join(REPO_ROOT, "Main.py")], cwd=REPO_ROOT,
+                                env=env, capture_output=True, text=True, check=True).stdout
+        timings = json.loads(output.strip().splitlines()[-1])
+        if timings.pop('exceptions'):
+            raise RuntimeError("Main.py raised during the benchmark run")
+        with open(spans_file) as f:
+            records = [json.loads(line) for line in f]
+    for name in SPANS:
+        # The first record of each is from the first run.
+        timings[name] = next(r['wall_ms'] for r in records if r['name'] == name) / 1000
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3, help="fresh processes; the best time per stage is kept")
+    parser.add_argument('--cold-assets', action='store_true', help="clear the encoded image cache before each run")
+    parser.add_argument('--output', help="write results as JSON to this file")
+    parser.add_argument('--compare', help="earlier results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    runs = [measure_once(args.cold_assets) for _ in range(args.runs)]
+    label = 'cold-assets' if args.cold_assets else 'app'
+    results = {label: {stage: {'seconds': min(run[stage] for run in runs), 'rows': None} for stage in runs[0]}}
+    print(f"{'stage':<20} {'best (s)':>9} {'worst (s)':>10}")
+    for stage, result in results[label].items():
+        print(f"{stage:<20} {result['seconds']:>9.3f} {max(run[stage] for run in runs):>10.3f}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({'environment': environment(), 'repeat': args.runs, 'results': results}, f, indent=2)
+        print(f"\nWrote {args.output}")
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
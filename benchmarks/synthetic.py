@@ -0,0 +1,141 @@
+"""Synthetic workbooks with the dashboard's schemas, at any size.
+
+The generators return frames shaped like ``solar_project_data.xlsx``,
+``risk.xlsx``, ``Procurement.xlsx`` and ``project_overview.xlsx``;
+``write_workbooks`` saves them under the file names the loaders expect, so a
+directory of them can stand in for the repo's sample data (or for a
+portfolio site).
+
+Usage: python benchmarks/synthetic.py OUTPUT_DIR --tasks 100000 [--pos N] [--risks N]
+"""
+import argparse
+import os
+
+import numpy as np
+import pandas as pd
+
+TASK_STAGES = ['Engineering Design', 'Permitting', 'Procurement', 'Civil Works', 'Mechanical Installation',
+               'Electrical Installation', 'Testing', 'Commissioning']
+RISK_CATEGORIES = ['Supply Chain', 'Environmental', 'Regulatory', 'Human Resources']
+RATINGS = ['Low', 'Medium', 'High']
+RISK_STATUSES = ['New', 'Planned', 'Ongoing', 'Mitigated']
+SUPPLIERS = ['ABC Supplies', 'Solar Tech', 'Gulf Electrical', 'Desert Logistics', 'Red Sea Steel']
+ITEMS = ['Construction Materials', 'Electrical Services', 'PV Modules', 'Inverters', 'Mounting Structures']
+PO_STATUSES = ['Ordered', 'Shipped', 'Delivered', 'Invoiced', 'Paid']
+# Sites of about this many tasks each.
+TASKS_PER_CATEGORY = 200
+
+
+def make_tasks(n, seed=0, predecessors=True):
+    """Tasks grouped into sites of stages; with ``predecessors``, each task follows the previous one of its site."""
+    rng = np.random.default_rng(seed)
+    site = np.arange(n) // TASKS_PER_CATEGORY
+    position = np.arange(n) % TASKS_PER_CATEGORY
+    budget = rng.integers(10, 1_000, n) * 1_000
+    start = pd.Timestamp('2024-01-01') + pd.to_timedelta(site * 7 + position * 3 + rng.integers(0, 5, n), unit='D')
+    size = rng.integers(0, 500, n)
+    tasks = pd.DataFrame({
+        'Task': [f"{TASK_STAGES[i % len(TASK_STAGES)]} {i}" for i in range(n)],
+        'Start Date': start,
+        'End Date': start + pd.to_timedelta(rng.integers(1, 30, n), unit='D'),
+        'Percent Complete': np.where(rng.random(n) < 0.4, 100, rng.integers(0, 100, n)),
+        'Category': np.char.add(np.char.add('PR', np.char.zfill((site + 1).astype(str), 4)), ', Site'),
+        'Budget': budget,
+        'Actual Cost': (budget * rng.uniform(0.5, 1.5, n)).astype(np.int64),
+        'System Size (kWp)': size,
+        'Actual Energy Production (kWh)': size * rng.integers(0, 1_500, n),
+        'PV System Energy Production (kWh)': size * rng.integers(0, 1_500, n),
+    })
+    tasks.insert(7, 'Cost Variance', tasks['Budget'] - tasks['Actual Cost'])
+    if predecessors:
+        # 1-based sheet row of the previous task in the same site.
+        previous = np.arange(n).astype(object)
+        previous[position == 0] = None
+        tasks['Predecessors'] = previous
+    return tasks
+
+
+def make_risks(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'Risk ID': [f"R-{i + 1:06d}" for i in range(n)],
+        'Risk Description': [f"Risk {i + 1}" for i in range(n)],
+        'Category': rng.choice(RISK_CATEGORIES, n),
+        'Probability': rng.choice(RATINGS, n),
+        'Impact': rng.choice(RATINGS, n),
+        'Mitigation Plan': 'Monitor and escalate',
+        'Owner': rng.choice(['John Doe', 'Jane Smith', 'Ali Hassan'], n),
+        'Status': rng.choice(RISK_STATUSES, n),
+    })
+
+
+def make_procurement(n, seed=0):
+    rng = np.random.default_rng(seed)
+    quantity = rng.integers(1, 500, n)
+    unit_price = rng.integers(10, 20_000, n)
+    order = pd.Timestamp('2023-12-01') + pd.to_timedelta(rng.integers(0, 3 * 365, n), unit='D')
+    return pd.DataFrame({
+        'PO Number': [f"PO-{i + 1:07d}" for i in range(n)],
+        'Vendor/Supplier Name': rng.choice(SUPPLIERS, n),
+        'Item/Service Description': rng.choice(ITEMS, n),
+        'Quantity': quantity,
+        'Unit Price': unit_price,
+        'Total Cost': quantity * unit_price,
+        'Order Date': order,
+        'Delivery Date': order + pd.to_timedelta(rng.integers(5, 90, n), unit='D'),
+        'Status': rng.choice(PO_STATUSES, n),
+    })
+
+
+def make_overview():
+    fields = {
+        'Client': 'Synthetic Client', 'Project Name': 'Synthetic Project', 'Location': 'Benchmark',
+        'Start Date': '2024-01-01', 'End Date': '2026-12-31', 'Project Manager': 'PM',
+        'Project Sponsor': 'Sponsor', 'Budget (USD)': 0,
+    }
+    return pd.DataFrame({'Field': list(fields), 'Value': list(fields.values())})
+
+
+def write_workbooks(directory, tasks, risks, procurement, overview=None):
+    """Writes the four workbooks into ``directory``; returns ``{dataset: path}``."""
+    from loaders import OVERVIEW_FILENAME, PROCUREMENT_FILENAME, RISK_FILENAME, TASKS_FILENAME
+
+    os.makedirs(directory, exist_ok=True)
+    frames = {
+        'tasks': (TASKS_FILENAME, tasks),
+        'risk': (RISK_FILENAME, risks),
+        'procurement': (PROCUREMENT_FILENAME, procurement),
+        'project_overview': (OVERVIEW_FILENAME, overview if overview is not None else make_overview()),
+    }
+    paths = {}
+    for name, (filename, frame) in frames.items():
+        paths[name] = os.path.join(directory, filename)
+        frame.to_excel(paths[name], index=False)
+    return paths
+
+
+def main():
+    import sys
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('output_dir')
+    parser.add_argument('--tasks', type=int, default=10_000)
+    parser.add_argument('--pos', type=int, help="purchase orders (default: as many as tasks)")
+    parser.add_argument('--risks', type=int, help="risks (default: one per 100 tasks, at least 10)")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-predecessors', action='store_true')
+    args = parser.parse_args()
+
+    paths = write_workbooks(
+        args.output_dir,
+        make_tasks(args.tasks, args.seed, predecessors=not args.no_predecessors),
+        make_risks(args.risks or max(10, args.tasks // 100), args.seed),
+        make_procurement(args.pos or args.tasks, args.seed),
+    )
+    for name, path in paths.items():
+        print(f"{name:>17}: {path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""Shared state and helpers for the dashboard's tabs.
+
+``Main.py`` loads the task snapshot, applies the sidebar filters and passes
+the result to the selected tab as a ``Page``.  Each tab lives in its own
+module (``progress_tab``, ``financial_tab``, ...) exposing ``render(page)``,
+and is only imported once it is first shown, so its chart libraries and
+metric engines stay out of the cold start.
+"""
+import os
+from dataclasses import dataclass
+
+import pandas as pd
+import streamlit as st
+
+from dataset_store import Snapshot, store
+from filters import FilterIndex
+
+
+@dataclass
+class Page:
+    """The task data and sidebar filters every tab renders from."""
+    tasks_snapshot: Snapshot
+    filter_index: FilterIndex
+    filtered_df: pd.DataFrame
+    filter_args: tuple   # (categories, search, start date, end date)
+    filter_state: dict   # the same, as chart cache inputs
+    task_totals: pd.Series
+
+    @property
+    def df(self):
+        return self.tasks_snapshot.data
+
+
+def get_snapshot(name):
+    """Returns the current shared snapshot of ``name``.
+
+    Sessions only keep the version number; the data itself is one read-only
+    copy per version shared by every session.
+    """
+    try:
+        snapshot = store.get(name)
+    except FileNotFoundError:
+        st.error(f"Error: File '{os.path.basename(store.source(name))}' not found. Make sure it's in the same directory as this script.")
+        st.stop()
+    st.session_state[f'{name}_version'] = snapshot.version
+    return snapshot
+
+
+def kpi_card(text):
+    st.markdown(
+        f'<div style="background-color: #f0f0f0; padding: 10px; border-radius: 5px;">'
+        f'<span style="color:black">{text}</span>'
+        '</div>',
+        unsafe_allow_html=True
+    )
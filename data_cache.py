@@ -0,0 +1,142 @@
+"""Columnar on-disk cache for the dashboard's Excel workbooks.
+
+Each workbook is parsed through openpyxl once and written as an Arrow IPC
+(Feather v2) file.  Later loads memory-map that file instead of parsing the
+XML again.  Cache entries are keyed by the workbook's path, mtime, size and a
+SHA-256 of its contents, so a cache file is only rebuilt when the source
+workbook actually changes.
+"""
+import hashlib
+import json
+import os
+import threading
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from instrumentation import span, timed
+
+CACHE_DIR = os.environ.get("SOLAR_CACHE_DIR", ".cache")
+MANIFEST_NAME = "manifest.json"
+
+_lock = threading.Lock()
+
+
+# --- Fingerprinting ---
+def _content_hash(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def file_fingerprint(path, manifest=None):
+    """Returns (abspath, mtime_ns, size, sha256) for a workbook.
+
+    The content hash is only recomputed when mtime or size differ from the
+    manifest entry, so an untouched workbook costs a single ``os.stat``.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    entry = (manifest or {}).get(path)
+    if entry and entry["mtime_ns"] == stat.st_mtime_ns and entry["size"] == stat.st_size:
+        sha = entry["sha256"]
+    else:
+        sha = _content_hash(path)
+    return path, stat.st_mtime_ns, stat.st_size, sha
+
+
+# --- Manifest ---
+def _manifest_path(cache_dir):
+    return os.path.join(cache_dir, MANIFEST_NAME)
+
+
+def _read_manifest(cache_dir):
+    try:
+        with open(_manifest_path(cache_dir)) as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+
+
+def _write_manifest(cache_dir, manifest):
+    # Per-process temp names: portfolio workers share the cache directory.
+    tmp = _manifest_path(cache_dir) + f".{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        json.dump(manifest, f, indent=1)
+    os.replace(tmp, _manifest_path(cache_dir))
+
+
+# --- Conversion ---
+def _to_arrow_table(df):
+    # Mixed object columns (e.g. the Value column of project_overview.xlsx,
+    # which holds text, numbers and dates) have no Arrow type; store them as
+    # text, which is how the dashboard displays them anyway.
+    for col in df.columns[df.dtypes == object]:
+        try:
+            pa.array(df[col], from_pandas=True)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            df[col] = df[col].map(lambda v: v if pd.isna(v) else str(v))
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+
+def _write_cache_file(df, cache_file):
+    tmp = cache_file + f".{os.getpid()}.tmp"
+    # Uncompressed so the file can be memory-mapped without decoding.
+    feather.write_feather(_to_arrow_table(df), tmp, compression="uncompressed")
+    os.replace(tmp, cache_file)
+
+
+def _cache_file(cache_dir, sha, sheet_name):
+    return os.path.join(cache_dir, f"{sha}-{sheet_name}.arrow")
+
+
+# --- Public API ---
+@timed('data_cache.read_excel')
+def read_excel_cached(filename, sheet_name=0, cache_dir=None):
+    """Drop-in replacement for ``pd.read_excel`` backed by the columnar cache."""
+    cache_dir = cache_dir or CACHE_DIR
+    os.makedirs(cache_dir, exist_ok=True)
+
+    with _lock:
+        manifest = _read_manifest(cache_dir)
+        path, mtime_ns, size, sha = file_fingerprint(filename, manifest)
+        cache_file = _cache_file(cache_dir, sha, sheet_name)
+
+        if not os.path.exists(cache_file):
+            with span('data_cache.parse_workbook'):
+                _write_cache_file(pd.read_excel(path, sheet_name=sheet_name), cache_file)
+
+        entry = {"mtime_ns": mtime_ns, "size": size, "sha256": sha}
+        if manifest.get(path) != entry:
+            previous = manifest.get(path)
+            manifest[path] = entry
+            _write_manifest(cache_dir, manifest)
+            if previous and previous["sha256"] != sha:
+                _discard_stale(cache_dir, previous["sha256"], manifest)
+
+    # Memory-mapped read: the Arrow buffers stay backed by the page cache and
+    # numeric columns are handed to pandas without copying.
+    table = feather.read_table(cache_file, memory_map=True)
+    return table.to_pandas(split_blocks=True)
+
+
+def _discard_stale(cache_dir, sha, manifest):
+    # Another workbook may have identical contents; keep the file if so.
+    if any(entry["sha256"] == sha for entry in manifest.values()):
+        return
+    for name in os.listdir(cache_dir):
+        if name.startswith(sha + "-"):
+            os.remove(os.path.join(cache_dir, name))
+
+
+def clear_cache(cache_dir=None):
+    """Removes every cached columnar file and the manifest."""
+    cache_dir = cache_dir or CACHE_DIR
+    with _lock:
+        if not os.path.isdir(cache_dir):
+            return
+        for name in os.listdir(cache_dir):
+            os.remove(os.path.join(cache_dir, name))
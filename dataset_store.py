@@ -0,0 +1,263 @@
+"""Process-wide, versioned snapshots of the dashboard datasets.
+
+Every successful load publishes a new immutable ``Snapshot`` with a
+monotonically increasing version.  All sessions read the same parsed copy;
+readers keep whatever snapshot they fetched, and a reload never mutates data
+that a script run is still using.
+"""
+import os
+import sys
+import threading
+import time
+import weakref
+from dataclasses import dataclass, field
+
+import numpy as np
+import pandas as pd
+
+from aggregates import INCREMENTAL_AGGREGATES
+from data_cache import file_fingerprint, read_excel_cached
+from history import history
+from ingest import ROW_HASHES, ingest
+from instrumentation import span
+from loaders import DATASETS, INCREMENTAL
+from storage import storage
+
+# Snapshots are shared between sessions, so derived frames must never write
+# through to them.  With copy-on-write, column selections and ``assign`` share
+# the snapshot's buffers and only copy a column when it is modified.
+pd.set_option("mode.copy_on_write", True)
+
+
+def estimate_nbytes(obj):
+    """Approximate resident size of a dataset or derived object."""
+    if isinstance(obj, pd.DataFrame):
+        return int(obj.memory_usage(deep=True, index=True).sum())
+    if isinstance(obj, pd.Series):
+        return int(obj.memory_usage(deep=True, index=True))
+    if isinstance(obj, np.ndarray):
+        return obj.nbytes
+    if isinstance(obj, dict):
+        return sys.getsizeof(obj) + sum(sys.getsizeof(k) + estimate_nbytes(v) for k, v in obj.items())
+    if isinstance(obj, (list, tuple)):
+        return sys.getsizeof(obj) + sum(estimate_nbytes(v) for v in obj)
+    return sys.getsizeof(obj)
+
+
+def _parametrised(derived, key):
+    """Keys of ``derived`` that are ``key`` or tuples starting with it."""
+    return [k for k in list(derived) if k == key or (isinstance(k, tuple) and k and k[0] == key)]
+
+
+@dataclass(frozen=True, eq=False)
+class Snapshot:
+    name: str
+    version: int
+    data: object
+    source: str
+    fingerprint: tuple = None
+    # Rows changed since the previous version, when it was ingested incrementally.
+    delta: object = None
+    loaded_at: float = field(default_factory=time.time)
+    _derived: dict = field(default_factory=dict, repr=False)
+    _derived_lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def derived(self, key, builder):
+        """Returns ``builder(data)`` computed once for this version.
+
+        Use it for indexes, aggregates and figures that every session needs;
+        they are dropped together with the snapshot.
+        """
+        try:
+            return self._derived[key]
+        except KeyError:
+            pass
+        with self._derived_lock:
+            if key not in self._derived:
+                self._derived[key] = builder(self.data)
+            return self._derived[key]
+
+    def nbytes(self):
+        return self.derived("__nbytes__", estimate_nbytes)
+
+    def derived_nbytes(self):
+        return sum(estimate_nbytes(v) for k, v in list(self._derived.items()) if k != "__nbytes__")
+
+
+class DatasetStore:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        self._sources = {}
+        self._loaders = {}
+        self._snapshots = {}
+        self._versions = {}
+        self._listeners = []
+        self._incremental = {}
+        self._aggregates = {}
+        # Every snapshot some script run still references, current or not.
+        self._resident = weakref.WeakValueDictionary()
+
+    # --- Registration ---
+    def register(self, name, source, loader):
+        with self._lock:
+            self._sources[name] = os.path.abspath(source)
+            self._loaders[name] = loader
+            self._load_locks[name] = threading.Lock()
+
+    def register_incremental(self, name, key, process):
+        """Re-ingests ``name`` row by row on reload, keyed by the ``key`` columns.
+
+        ``process`` turns raw sheet rows into dataset rows and must work on any
+        subset of them.
+        """
+        with self._lock:
+            self._incremental[name] = (key, process)
+
+    def register_aggregate(self, name, key, build, update):
+        """Declares ``snapshot.derived(key, build)`` as updatable from a delta.
+
+        When a new version of ``name`` is ingested incrementally and the
+        previous version had computed ``key``, the new value is
+        ``update(previous_value, delta)`` instead of a rebuild, unless that
+        returns None.  Derived keys that are tuples starting with ``key``
+        (the same aggregate for different parameters, e.g. an as-of date)
+        are carried forward the same way.
+        """
+        with self._lock:
+            self._aggregates.setdefault(name, {})[key] = (build, update)
+
+    def names(self):
+        return list(self._loaders)
+
+    def source(self, name):
+        return self._sources[name]
+
+    def dataset_for_path(self, path):
+        """Returns the dataset loaded from ``path``, or None."""
+        path = os.path.abspath(path)
+        for name, source in self._sources.items():
+            if source == path:
+                return name
+        return None
+
+    def add_listener(self, callback):
+        """Calls ``callback(snapshot)`` after each publish."""
+        with self._lock:
+            self._listeners.append(callback)
+
+    # --- Reads ---
+    def get(self, name):
+        """Returns the current snapshot, loading it on first access."""
+        snapshot = self._snapshots.get(name)
+        if snapshot is None:
+            with self._load_locks[name]:
+                # Another session may have loaded it while we waited.
+                snapshot = self._snapshots.get(name)
+                if snapshot is None:
+                    snapshot = self._load(name)
+        return snapshot
+
+    def version(self, name):
+        return self._versions.get(name, 0)
+
+    # --- Writes ---
+    def reload(self, name):
+        """Re-runs the loader for one dataset and publishes a new version."""
+        with self._load_locks[name]:
+            return self._load(name)
+
+    def refresh(self, name):
+        """Reloads ``name`` only if its workbook changed since the last load.
+
+        Returns the new snapshot, or None when the contents are unchanged.
+        """
+        with self._load_locks[name]:
+            current = self._snapshots.get(name)
+            if current is not None and current.fingerprint is not None:
+                path, mtime_ns, size, sha = current.fingerprint
+                manifest = {path: {"mtime_ns": mtime_ns, "size": size, "sha256": sha}}
+                if file_fingerprint(path, manifest)[3] == sha:
+                    return None
+            return self._load(name)
+
+    def _load(self, name):
+        with span(f"store.load:{name}") as current:
+            snapshot = self._load_version(name)
+            current.rows = len(snapshot.data)
+        return snapshot
+
+    def _load_version(self, name):
+        source = self._sources[name]
+        fingerprint = file_fingerprint(source)
+        if name not in self._incremental:
+            data = self._loaders[name](source)
+            return self.publish(name, data, fingerprint)
+
+        key, process = self._incremental[name]
+        current = self._snapshots.get(name)
+        previous_hashes = current._derived.get(ROW_HASHES) if current is not None else None
+        data, hashes, delta = ingest(
+            read_excel_cached(source), key, process,
+            current.data if current is not None else None, previous_hashes,
+        )
+        derived = {ROW_HASHES: hashes} if hashes is not None else {}
+        if delta is not None:
+            for aggregate_key, (_, update) in self._aggregates.get(name, {}).items():
+                for derived_key in _parametrised(current._derived, aggregate_key):
+                    value = update(current._derived[derived_key], delta)
+                    # None means the update can't be applied; rebuild on first use.
+                    if value is not None:
+                        derived[derived_key] = value
+        return self.publish(name, data, fingerprint, delta, derived)
+
+    def publish(self, name, data, fingerprint=None, delta=None, derived=None):
+        with self._lock:
+            version = self._versions.get(name, 0) + 1
+            snapshot = Snapshot(name, version, data, self._sources[name], fingerprint, delta)
+            snapshot._derived.update(derived or {})
+            self._versions[name] = version
+            self._snapshots[name] = snapshot
+            self._resident[(name, version)] = snapshot
+            listeners = list(self._listeners)
+        for callback in listeners:
+            callback(snapshot)
+        return snapshot
+
+
+    # --- Memory accounting ---
+    def memory_report(self):
+        """Returns one row per resident dataset version with its size in bytes."""
+        rows = []
+        for (name, version), snapshot in sorted(self._resident.items()):
+            rows.append({
+                "Dataset": name,
+                "Version": version,
+                "Current": self._versions.get(name) == version,
+                "Rows": len(snapshot.data),
+                "Data (bytes)": snapshot.nbytes(),
+                "Derived (bytes)": snapshot.derived_nbytes(),
+                "Changed rows": len(snapshot.delta) if snapshot.delta is not None else None,
+                "Loaded": time.strftime("%H:%M:%S", time.localtime(snapshot.loaded_at)),
+            })
+        return rows
+
+
+def _build_default_store():
+    store = DatasetStore()
+    for name, (source, loader) in DATASETS.items():
+        store.register(name, source, loader)
+    for name, (key, process) in INCREMENTAL.items():
+        store.register_incremental(name, key, process)
+    for name, aggregates in INCREMENTAL_AGGREGATES.items():
+        for key, (build, update) in aggregates.items():
+            store.register_aggregate(name, key, build, update)
+    # Mirror published versions into the optional SQL backend.
+    store.add_listener(storage.sync)
+    # Record each version's changed cells for as-of queries and trends.
+    store.add_listener(history.record)
+    return store
+
+
+# Module-level so every Streamlit session (and the watcher thread) shares it.
+store = _build_default_store()
@@ -0,0 +1,235 @@
+"""Earned Value Management metrics computed column-wise with NumPy.
+
+All per-task metrics come from one pass over the Budget, Actual Cost and
+Percent Complete columns; project-level metrics apply the same formulas to the
+column totals.  Divisions by zero yield 0, matching what the dashboard has
+always shown for tasks without a budget or without spend.
+"""
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+from schema import day_number, day_numbers
+
+# Per-task columns added by evm_frame, in display order.
+TASK_METRICS = ['PV', 'EV', 'SV', 'CV', 'SPI', 'CPI', 'EAC', 'ETC', 'VAC', 'TCPI']
+
+METRIC_LABELS = {
+    'PV': 'Planned Value (PV)',
+    'EV': 'Earned Value (EV)',
+    'AC': 'Actual Cost (AC)',
+    'SV': 'Schedule Variance (SV)',
+    'CV': 'Cost Variance (CV)',
+    'SPI': 'Schedule Performance Index (SPI)',
+    'CPI': 'Cost Performance Index (CPI)',
+    'EAC': 'Estimate at Completion (EAC)',
+    'ETC': 'Estimate to Complete (ETC)',
+    'VAC': 'Variance at Completion (VAC)',
+    'TCPI': 'To-Complete Performance Index (TCPI)',
+}
+
+
+def safe_divide(numerator, denominator):
+    """Element-wise ``numerator / denominator`` with 0 wherever the denominator is 0."""
+    numerator = np.asarray(numerator, dtype=np.float64)
+    denominator = np.asarray(denominator, dtype=np.float64)
+    out = np.zeros(np.broadcast(numerator, denominator).shape)
+    np.divide(numerator, denominator, out=out, where=denominator != 0)
+    return out
+
+
+def _numeric(column):
+    values = pd.to_numeric(column, errors='coerce')
+    return np.nan_to_num(np.asarray(values, dtype=np.float64))
+
+
+def evm_arrays(budget, actual_cost, percent_complete, planned_value=None):
+    """Computes every EVM metric from aligned float arrays.
+
+    ``budget`` is the budget at completion (BAC).  ``planned_value`` defaults
+    to the full budget, i.e. every task is planned to be done.
+    """
+    bac = np.asarray(budget, dtype=np.float64)
+    ac = np.asarray(actual_cost, dtype=np.float64)
+    pv = bac if planned_value is None else np.asarray(planned_value, dtype=np.float64)
+    ev = bac * (np.asarray(percent_complete, dtype=np.float64) / 100)
+
+    cpi = safe_divide(ev, ac)
+    # Without a usable CPI (nothing earned or nothing spent yet) assume the
+    # remaining work is done at budget rate.
+    eac = np.where(cpi > 0, safe_divide(bac, cpi), ac + (bac - ev))
+    return {
+        'PV': pv,
+        'EV': ev,
+        'AC': ac,
+        'SV': ev - pv,
+        'CV': ev - ac,
+        'SPI': safe_divide(ev, pv),
+        'CPI': cpi,
+        'EAC': eac,
+        'ETC': eac - ac,
+        'VAC': bac - eac,
+        'TCPI': safe_divide(bac - ev, bac - ac),
+    }
+
+
+@timed('evm.evm_frame')
+def evm_frame(df, planned_value=None):
+    """Returns ``df`` with the per-task EVM columns added."""
+    metrics = evm_arrays(
+        _numeric(df['Budget']),
+        _numeric(df['Actual Cost']),
+        _numeric(df['Percent Complete']),
+        planned_value,
+    )
+    return df.assign(**{name: metrics[name] for name in TASK_METRICS})
+
+
+@timed('evm.project_evm')
+def project_evm(df, planned_value=None):
+    """Returns the project-level EVM metrics for ``df`` as a dict of floats."""
+    budget = _numeric(df['Budget'])
+    actual_cost = _numeric(df['Actual Cost'])
+    earned = budget * (_numeric(df['Percent Complete']) / 100)
+    total_pv = budget.sum() if planned_value is None else np.asarray(planned_value, dtype=np.float64).sum()
+    # Project percent complete is the budget-weighted EV share.
+    total_budget = budget.sum()
+    percent = safe_divide(earned.sum(), total_budget) * 100
+    metrics = evm_arrays(total_budget, actual_cost.sum(), percent, total_pv)
+    return {name: float(value) for name, value in metrics.items()}
+
+
+# --- Rollups ---
+ROLLUP_METRICS = ['Tasks', 'BAC', 'EV', 'AC', 'CV', 'CPI', 'EAC', 'VAC']
+
+
+def rollup_metrics(sums):
+    """Adds CV, CPI, EAC and VAC to a frame of per-group Tasks/BAC/EV/AC sums."""
+    percent = safe_divide(sums['EV'], sums['BAC']) * 100
+    metrics = evm_arrays(sums['BAC'], sums['AC'], percent)
+    out = sums.copy()
+    for name in ('CV', 'CPI', 'EAC', 'VAC'):
+        out[name] = metrics[name]
+    return out[ROLLUP_METRICS]
+
+
+@timed('evm.evm_rollup')
+def evm_rollup(df, by='Category'):
+    """Budget, earned value, actual cost and derived metrics per ``by`` group."""
+    budget = _numeric(df['Budget'])
+    sums = pd.DataFrame({
+        'Tasks': 1,
+        'BAC': budget,
+        'EV': budget * (_numeric(df['Percent Complete']) / 100),
+        'AC': _numeric(df['Actual Cost']),
+    }, index=df.index).groupby(df[by].to_numpy()).sum()
+    sums.index.name = by
+    return rollup_metrics(sums)
+
+
+# --- Time-phased EVM ---
+# Budget spread profiles: relative weights of equal-length slices of a task's
+# duration.  Each slice is spread linearly, so any profile stays a
+# piecewise-linear curve that the difference-array sweep handles exactly.
+PROFILES = {
+    'linear': (1.0,),
+    'front-loaded': (0.4, 0.3, 0.2, 0.1),
+    'back-loaded': (0.1, 0.2, 0.3, 0.4),
+    'bell': (0.1, 0.2, 0.4, 0.2, 0.1),
+}
+
+
+def _segments(start_days, end_days, amounts, profile):
+    """Splits each task window into profile slices.
+
+    Returns (first_day, length, amount) arrays of shape (tasks, slices).
+    Windows are inclusive of the end day; a zero-length slice is a point
+    amount on its first day.
+    """
+    weights = np.asarray(PROFILES[profile] if isinstance(profile, str) else profile, dtype=np.float64)
+    weights = weights / weights.sum()
+    slices = len(weights)
+    span = np.maximum(end_days - start_days + 1, 1)
+    bounds = start_days[:, None] + np.round(span[:, None] * np.arange(slices + 1) / slices).astype(np.int64)
+    first = bounds[:, :-1]
+    length = bounds[:, 1:] - first
+    return first, length, amounts[:, None] * weights[None, :]
+
+
+def _daily_amounts(first, length, amount, origin, n_days):
+    # Difference array over daily rates: each slice adds amount/length per day
+    # from its first day and removes it again after its last day.  One
+    # bincount plus one cumsum replaces a loop over tasks and days.
+    length = np.maximum(length, 1)
+    rate = (amount / length).ravel()
+    starts = (first - origin).ravel()
+    stops = (first + length - origin).ravel()
+    diff = np.bincount(
+        np.concatenate([starts, stops]),
+        weights=np.concatenate([rate, -rate]),
+        minlength=n_days + 1,
+    )
+    return np.cumsum(diff)[:n_days]
+
+
+@timed('evm.planned_value_as_of')
+def planned_value_as_of(df, as_of, profile='linear'):
+    """Per-task planned value at the end of ``as_of`` under ``profile``.
+
+    Tasks without a Start or End Date can't be placed in time and have no PV.
+    """
+    start_days, start_valid = day_numbers(df['Start Date'])
+    end_days, end_valid = day_numbers(df['End Date'])
+    budget = np.where(start_valid & end_valid, _numeric(df['Budget']), 0.0)
+    first, length, amount = _segments(start_days, end_days, budget, profile)
+    as_of_day = day_number(as_of)
+    elapsed = np.clip(as_of_day + 1 - first, 0, np.maximum(length, 1))
+    return (amount * safe_divide(elapsed, np.maximum(length, 1))).sum(axis=1)
+
+
+@timed('evm.time_phased_evm')
+def time_phased_evm(df, as_of=None, profile='linear', freq='D'):
+    """Builds cumulative PV, EV and AC series plus SV, CV, SPI and CPI.
+
+    PV spreads each task's Budget between its Start and End Date under
+    ``profile``.  The workbook only holds current progress, so EV (Budget x
+    Percent Complete) and Actual Cost are assumed to have accrued linearly
+    from the task's start up to ``as_of`` (or its end, if earlier); EV and AC
+    are undefined after ``as_of``.  ``freq`` is 'D' for daily points or 'W'
+    for week-ending points.  Tasks without a Start or End Date are left out.
+    """
+    as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.now()).normalize()
+    columns = ['PV', 'EV', 'AC', 'SV', 'CV', 'SPI', 'CPI']
+    start_days, start_valid = day_numbers(df['Start Date'])
+    end_days, end_valid = day_numbers(df['End Date'])
+    dated = start_valid & end_valid
+    if not dated.any():
+        return pd.DataFrame(columns=columns, index=pd.DatetimeIndex([], name='Date'))
+    df, start_days = df[dated], start_days[dated]
+    end_days = np.maximum(end_days[dated], start_days)
+    as_of_day = day_number(as_of)
+    origin = int(start_days.min())
+    n_days = int(max(end_days.max(), as_of_day)) - origin + 1
+
+    budget = _numeric(df['Budget'])
+    earned = budget * (_numeric(df['Percent Complete']) / 100)
+    actual = _numeric(df['Actual Cost'])
+
+    pv = np.cumsum(_daily_amounts(*_segments(start_days, end_days, budget, profile), origin, n_days))
+    # EV and AC accrue over the same window, so the slices are shared.
+    accrual_end = np.clip(as_of_day, start_days, end_days)
+    first, length, _ = _segments(start_days, accrual_end, np.ones_like(budget), 'linear')
+    ev = np.cumsum(_daily_amounts(first, length, earned[:, None], origin, n_days))
+    ac = np.cumsum(_daily_amounts(first, length, actual[:, None], origin, n_days))
+
+    dates = pd.date_range(pd.Timestamp(np.datetime64(origin, 'D')), periods=n_days, freq='D', name='Date')
+    series = pd.DataFrame({'PV': pv, 'EV': ev, 'AC': ac}, index=dates)
+    series.loc[series.index > as_of, ['EV', 'AC']] = np.nan
+    if freq == 'W':
+        series = series.resample('W').last()
+    series['SV'] = series['EV'] - series['PV']
+    series['CV'] = series['EV'] - series['AC']
+    series['SPI'] = safe_divide(series['EV'].fillna(0), series['PV'])
+    series['CPI'] = safe_divide(series['EV'].fillna(0), series['AC'].fillna(0))
+    series.loc[series['EV'].isna(), ['SPI', 'CPI']] = np.nan
+    return series[columns]
@@ -0,0 +1,99 @@
+"""Memoized Plotly figures.
+
+Each chart is built through ``cached_figure`` with the inputs it depends on:
+dataset snapshots (identified by name and version), filter values and widget
+state.  The figure is stored as serialized JSON under a hash of those inputs,
+so a rerun, or another session, with the same inputs skips the builder.  The
+cache is process-wide and evicts the least recently used figures once the
+stored JSON exceeds a byte budget.
+"""
+import hashlib
+import json
+import os
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+import plotly.io as pio
+
+from dataset_store import Snapshot
+from instrumentation import span
+
+FIGURE_CACHE_MAX_BYTES = int(os.environ.get("SOLAR_FIGURE_CACHE_MB", "64")) * 1024 * 1024
+
+
+def _fingerprint_part(value):
+    if isinstance(value, Snapshot):
+        # Snapshots are immutable, so the version stands in for the data.
+        return f"snapshot:{value.name}:{value.version}".encode()
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest = hashlib.sha256(pd.util.hash_pandas_object(value, index=True).to_numpy().tobytes())
+        columns = value.columns if isinstance(value, pd.DataFrame) else [value.name]
+        digest.update(repr(list(columns)).encode())
+        return digest.hexdigest().encode()
+    return json.dumps(value, sort_keys=True, default=str).encode()
+
+
+def fingerprint(*inputs):
+    """Stable hash of chart inputs."""
+    digest = hashlib.sha256()
+    for value in inputs:
+        digest.update(_fingerprint_part(value))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class FigureCache:
+    """LRU of figure JSON, bounded by the total size of the stored JSON."""
+
+    def __init__(self, max_bytes=FIGURE_CACHE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            figure_json = self._items.get(key)
+            if figure_json is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return figure_json
+
+    def put(self, key, figure_json):
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= len(self._items.pop(key))
+            self._items[key] = figure_json
+            self.nbytes += len(figure_json)
+            while self.nbytes > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+    def figure(self, name, builder, *inputs):
+        """Returns ``builder()``, reusing the stored figure for the same ``name`` and inputs."""
+        key = fingerprint(name, *inputs)
+        figure_json = self.get(key)
+        if figure_json is not None:
+            with span(f"figure.restore:{name}"):
+                return pio.from_json(figure_json)
+        with span(f"figure.build:{name}"):
+            fig = builder()
+            self.put(key, fig.to_json())
+        return fig
+
+    def stats(self):
+        with self._lock:
+            return {"Figures": len(self._items), "Bytes": self.nbytes, "Hits": self.hits, "Misses": self.misses}
+
+
+# Module-level so every session shares the stored figures.
+figure_cache = FigureCache()
+
+
+def cached_figure(name, builder, *inputs):
+    return figure_cache.figure(name, builder, *inputs)
@@ -0,0 +1,170 @@
+"""Process-wide workbook watcher.
+
+A single watchdog observer watches the directories that hold the dataset
+workbooks.  Bursts of events for one file (Excel writes a temp file and
+renames it over the original) are debounced, then only the affected dataset
+is reloaded into the shared store.  Sessions that are viewing that dataset
+get a rerun; all others are left alone.
+
+Watching is on unless ``SOLAR_WATCH=0``; watchdog is only imported once the
+observer starts.
+"""
+import logging
+import os
+import threading
+
+from dataset_store import store as default_store
+
+WATCH = os.environ.get("SOLAR_WATCH", "1").lower() in ("1", "true", "yes")
+DEBOUNCE_SECONDS = 1.0
+
+_LOGGER = logging.getLogger(__name__)
+
+
+class FileChangeHandler:
+    """Observer event handler; watchdog only calls ``dispatch``."""
+
+    def __init__(self, store, debounce=DEBOUNCE_SECONDS):
+        self.store = store
+        self.debounce = debounce
+        self._timers = {}
+        self._lock = threading.Lock()
+
+    def dispatch(self, event):
+        if event.is_directory:
+            return
+        # Saves usually arrive as a rename onto the workbook, so check both ends.
+        for path in (event.src_path, getattr(event, 'dest_path', '')):
+            name = self.store.dataset_for_path(path) if path else None
+            if name is not None:
+                self._schedule(name)
+
+    def _schedule(self, name):
+        with self._lock:
+            timer = self._timers.get(name)
+            if timer is not None:
+                timer.cancel()
+            timer = threading.Timer(self.debounce, self._reload, args=(name,))
+            timer.daemon = True
+            self._timers[name] = timer
+            timer.start()
+
+    def _reload(self, name):
+        with self._lock:
+            self._timers.pop(name, None)
+        try:
+            self.store.refresh(name)
+        except Exception:
+            # A half-written workbook can fail to parse; the next event retries.
+            _LOGGER.exception("Reloading dataset %r failed", name)
+
+
+# --- Streamlit internals ---
+# Streamlit has no public API to rerun another session, so reruns go through
+# the runtime's session manager and event loop.  These are private and were
+# checked against these releases; outside them, failures are logged once.
+TESTED_STREAMLIT = ((1, 30), (1, 65))
+_internals_warned = False
+
+
+def _warn_internals(message, *args):
+    global _internals_warned
+    if not _internals_warned:
+        _internals_warned = True
+        _LOGGER.warning(message, *args)
+
+
+def _rerun_internals(runtime):
+    """``(session manager, event loop)`` of the Streamlit runtime, or None if unavailable."""
+    import streamlit
+
+    version = tuple(int(part) for part in streamlit.__version__.split('.')[:2] if part.isdigit())
+    if not TESTED_STREAMLIT[0] <= version <= TESTED_STREAMLIT[1]:
+        _warn_internals("Streamlit %s is outside the releases the workbook watcher was checked against (%s to %s)",
+                        streamlit.__version__, *('.'.join(map(str, v)) for v in TESTED_STREAMLIT))
+    try:
+        return runtime._session_mgr, runtime._get_async_objs().eventloop
+    except AttributeError:
+        _warn_internals("Streamlit %s has no session manager or event loop where expected; "
+                        "edited workbooks are reloaded but open sessions are not rerun", streamlit.__version__)
+        return None
+
+
+# --- Session subscriptions ---
+_subscriptions = {}  # session id -> set of dataset names
+_subscriptions_lock = threading.Lock()
+
+
+def _prune_subscriptions(runtime):
+    """Forgets sessions that have ended."""
+    with _subscriptions_lock:
+        for session_id in [sid for sid in _subscriptions if not runtime.is_active_session(sid)]:
+            del _subscriptions[session_id]
+
+
+def subscribe_current_session(dataset_names):
+    """Records which datasets the running session is viewing."""
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    if ctx is None:
+        return
+    with _subscriptions_lock:
+        _subscriptions[ctx.session_id] = set(dataset_names)
+    if Runtime.exists():
+        _prune_subscriptions(Runtime.instance())
+
+
+def _request_reruns(snapshot):
+    from streamlit.runtime import Runtime
+
+    # The first version is the initial load; nobody is viewing stale data yet.
+    if snapshot.version == 1 or not Runtime.exists():
+        return
+    runtime = Runtime.instance()
+    _prune_subscriptions(runtime)
+    internals = _rerun_internals(runtime)
+    if internals is None:
+        return
+    session_mgr, eventloop = internals
+    with _subscriptions_lock:
+        session_ids = [sid for sid, names in _subscriptions.items() if snapshot.name in names]
+    for session_id in session_ids:
+        info = session_mgr.get_active_session_info(session_id)
+        if info is None:
+            # Disconnected since the prune; forget it.
+            with _subscriptions_lock:
+                _subscriptions.pop(session_id, None)
+            continue
+        # AppSession is not thread-safe; hand the rerun to Streamlit's event loop.
+        eventloop.call_soon_threadsafe(info.session.request_rerun, None)
+
+
+# --- Observer lifecycle ---
+_observer = None
+_observer_lock = threading.Lock()
+
+
+def start_watcher(store=default_store, debounce=DEBOUNCE_SECONDS):
+    """Starts the shared observer once per process; later calls are no-ops.
+
+    Returns None when watching is disabled.
+    """
+    global _observer
+    if not WATCH:
+        return None
+    with _observer_lock:
+        if _observer is not None:
+            return _observer
+        from watchdog.observers import Observer
+
+        handler = FileChangeHandler(store, debounce)
+        observer = Observer()
+        for directory in {os.path.dirname(store.source(name)) for name in store.names()}:
+            observer.schedule(handler, directory, recursive=False)
+        observer.daemon = True
+        observer.start()
+        store.add_listener(_request_reruns)
+        _observer = observer
+        return observer
@@ -0,0 +1,128 @@
+"""Indexed sidebar filtering for the task dataset.
+
+A ``FilterIndex`` is built once per dataset version (via
+``Snapshot.derived``) and shared by every session.  It holds:
+
+* integer category codes, so a category filter is one table lookup;
+* a trigram index over lower-cased task names for the search box;
+* Start/End Date as sorted int64 day numbers, so a date window is two
+  ``searchsorted`` calls.
+
+Filtered frames are memoised per filter tuple.  The index dies with its
+snapshot, so the cache is effectively keyed by (dataset version, filters).
+"""
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+from schema import day_number, day_numbers
+
+NGRAM = 3
+MAX_CACHED_FILTERS = 32
+
+
+def _ngrams(text):
+    return {text[i:i + NGRAM] for i in range(len(text) - NGRAM + 1)}
+
+
+class FilterIndex:
+    def __init__(self, df):
+        self.df = df
+        self.size = len(df)
+
+        codes, uniques = pd.factorize(df['Category'])
+        self.category_codes = codes
+        self.categories = list(uniques)
+
+        self.task_names = df['Task'].astype(str).str.lower().to_numpy()
+        postings = {}
+        for row, name in enumerate(self.task_names):
+            for gram in _ngrams(name):
+                postings.setdefault(gram, []).append(row)
+        self._postings = {gram: np.asarray(rows, dtype=np.int64) for gram, rows in postings.items()}
+
+        start_days, start_valid = day_numbers(df['Start Date'])
+        end_days, end_valid = day_numbers(df['End Date'])
+        # Tasks missing either date never fall in a date window.
+        dated = np.flatnonzero(start_valid & end_valid)
+        self._start_order = dated[np.argsort(start_days[dated], kind='stable')]
+        self._start_sorted = start_days[self._start_order]
+        self._end_order = dated[np.argsort(end_days[dated], kind='stable')]
+        self._end_sorted = end_days[self._end_order]
+
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+
+    # --- Individual masks ---
+    def category_mask(self, categories):
+        wanted = np.zeros(len(self.categories) + 1, dtype=bool)  # last slot: missing (-1)
+        lookup = {category: code for code, category in enumerate(self.categories)}
+        for category in categories:
+            if category in lookup:
+                wanted[lookup[category]] = True
+        return wanted[self.category_codes]
+
+    def search_mask(self, query):
+        query = query.lower()
+        if not query:
+            return np.ones(self.size, dtype=bool)
+        if len(query) < NGRAM:
+            return np.fromiter((query in name for name in self.task_names), dtype=bool, count=self.size)
+
+        # Rows containing every trigram of the query, rarest trigram first.
+        candidates = None
+        for gram in sorted(_ngrams(query), key=lambda g: len(self._postings.get(g, ()))):
+            rows = self._postings.get(gram)
+            if rows is None:
+                return np.zeros(self.size, dtype=bool)
+            candidates = rows if candidates is None else np.intersect1d(candidates, rows, assume_unique=True)
+            if candidates.size == 0:
+                return np.zeros(self.size, dtype=bool)
+        mask = np.zeros(self.size, dtype=bool)
+        # Trigrams can match out of order; confirm the substring on the survivors.
+        mask[[row for row in candidates if query in self.task_names[row]]] = True
+        return mask
+
+    def date_mask(self, start_date, end_date):
+        """Tasks starting on/after ``start_date`` and ending on/before ``end_date``."""
+        mask = np.zeros(self.size, dtype=bool)
+        first = np.searchsorted(self._start_sorted, day_number(start_date), side='left')
+        mask[self._start_order[first:]] = True
+        ends_in_window = np.zeros(self.size, dtype=bool)
+        last = np.searchsorted(self._end_sorted, day_number(end_date), side='right')
+        ends_in_window[self._end_order[:last]] = True
+        return mask & ends_in_window
+
+    # --- Combined, memoised ---
+    def mask(self, categories, search, start_date, end_date):
+        key = (frozenset(categories), search.lower(), day_number(start_date), day_number(end_date))
+        return self._lookup(key)[0]
+
+    @timed('filters.filter')
+    def filter(self, categories, search, start_date, end_date):
+        """Returns the filtered frame; repeat calls with the same filters are free."""
+        key = (frozenset(categories), search.lower(), day_number(start_date), day_number(end_date))
+        return self._lookup(key)[1]
+
+    def _lookup(self, key):
+        with self._lock:
+            hit = self._cache.get(key)
+            if hit is not None:
+                self._cache.move_to_end(key)
+                return hit
+        categories, search, start_day, end_day = key
+        mask = self.category_mask(categories)
+        if mask.any():
+            mask &= self.date_mask(np.datetime64(start_day, 'D'), np.datetime64(end_day, 'D'))
+        if mask.any():
+            mask &= self.search_mask(search)
+        mask.flags.writeable = False
+        entry = (mask, self.df[mask])
+        with self._lock:
+            self._cache[key] = entry
+            if len(self._cache) > MAX_CACHED_FILTERS:
+                self._cache.popitem(last=False)
+        return entry
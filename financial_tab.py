@@ -0,0 +1,218 @@
+"""Financial Tracking tab: costs, EVM metrics and trends, and the completion forecast."""
+import functools
+
+import pandas as pd
+import plotly.express as px
+import streamlit as st
+
+from dashboard import get_snapshot
+from evm import PROFILES, TASK_METRICS, evm_frame, evm_rollup, planned_value_as_of, project_evm, time_phased_evm
+from figure_cache import cached_figure
+from schema import money_sum
+from forecast import build_forecast_figures, format_or_na, task_forecast
+from storage import storage
+from task_list import render_task_list, task_statuses
+
+
+def render(page):
+    filtered_df, tasks_snapshot = page.filtered_df, page.tasks_snapshot
+    filter_state, filter_args = page.filter_state, page.filter_args
+
+    # --- Financial Tracking ---
+    st.subheader("Financial Overview")
+
+    # Calculate filtered totals, handling empty DataFrame
+    total_budget = money_sum(filtered_df['Budget'])
+    total_actual_cost = money_sum(filtered_df['Actual Cost'])
+    total_cost_variance = total_budget - total_actual_cost
+
+    st.write(f"**Total Budget (Filtered):** ${total_budget:,.2f}")
+    st.write(f"**Total Actual Cost (Filtered):** ${total_actual_cost:,.2f}")
+    st.write(f"**Total Cost Variance (Filtered):** ${total_cost_variance:,.2f}")
+
+    # Budget Allocation Pie Chart
+    if not filtered_df.empty:
+        fig_budget = cached_figure(
+            'budget_allocation', lambda: px.pie(filtered_df, values='Budget', names='Category', title='Budget Allocation'),
+            tasks_snapshot, filter_state,
+        )
+        st.plotly_chart(fig_budget, key='budget_chart')
+    else:
+        st.write("No data to display for budget allocation.")
+
+    # Cost Comparison Bar Chart
+    if not filtered_df.empty:
+        def build_cost_comparison():
+            cost_df = filtered_df.melt(id_vars='Task', value_vars=['Budget', 'Actual Cost'])
+            return px.bar(cost_df, x='Task', y='value', color='variable', barmode='group', title='Cost Comparison')
+        fig_cost = cached_figure('cost_comparison', build_cost_comparison, tasks_snapshot, filter_state)
+        st.plotly_chart(fig_cost, key='cost_chart')
+    else:
+        st.write("No data to display for cost comparison.")
+
+        # --- Projected vs. Actual Cost Bar Chart ---
+        if not filtered_df.empty:
+            cost_df = filtered_df.melt(id_vars='Task', value_vars=['Budget', 'Actual Cost'])
+            fig_cost = px.bar(cost_df, x='Task', y='value', color='variable', barmode='group',
+                              title='Cost Comparison: Projected vs. Actual')
+            st.plotly_chart(fig_cost, key='projected_cost_chart')
+
+    # Cost Variance Alerts (one page at a time)
+    if not filtered_df.empty:
+        cost_status_labels = task_statuses(tasks_snapshot).loc[filtered_df.index, 'Cost Status']
+        over_budget_count = int((filtered_df['Cost Variance'] < 0).sum())
+        if over_budget_count:
+            st.error(f"🚨 {over_budget_count} task(s) have exceeded their budget.")
+        render_task_list(
+            filtered_df.assign(**{'Cost Status': cost_status_labels}),
+            key='cost_list',
+            columns=['Task', 'Cost Status', 'Budget', 'Actual Cost', 'Cost Variance'],
+            sort_options={
+                'Largest overrun': ('Cost Variance', True),
+                'Largest saving': ('Cost Variance', False),
+                'Schedule order': ('Start Date', True),
+                'Budget': ('Budget', False),
+            },
+            column_config={
+                column: st.column_config.NumberColumn(column, format="$%d")
+                for column in ['Budget', 'Actual Cost', 'Cost Variance']
+            },
+        )
+
+    # Detailed Financial Table
+    st.subheader('Financial Details')
+    if not filtered_df.empty:
+        st.table(filtered_df[['Task', 'Budget', 'Actual Cost', 'Cost Variance']])
+    else:
+        st.write("No financial data to display.")
+
+    # EVM Calculations (Planned Value is the Budget spread over each task's dates)
+    st.subheader("Earned Value Management (EVM)")
+    evm_profile = st.selectbox("Budget Spread Profile", list(PROFILES), help="How each task's Budget is planned between its Start and End Date.")
+    evm_as_of = pd.Timestamp.now().normalize()
+
+    # Per-task and project-level metrics, computed column-wise
+    planned_value = planned_value_as_of(filtered_df, evm_as_of, evm_profile)
+    evm_df = evm_frame(filtered_df, planned_value)
+    project_metrics = project_evm(filtered_df, planned_value)
+
+    # Create a dictionary to store EVM metrics
+    evm_metrics = {
+        "Schedule Variance (SV)": f"{project_metrics['SV']:.2f} $",
+        "Cost Variance (CV)": f"{project_metrics['CV']:.2f} $",
+        "SPI": f"{project_metrics['SPI']:.2f}",
+        "CPI": f"{project_metrics['CPI']:.2f}",
+        "Estimate at Completion (EAC)": f"{project_metrics['EAC']:.2f} $",
+        "Estimate to Complete (ETC)": f"{project_metrics['ETC']:.2f} $",
+        "Variance at Completion (VAC)": f"{project_metrics['VAC']:.2f} $",
+        "TCPI": f"{project_metrics['TCPI']:.2f}",
+    }
+
+    # Style the EVM metrics display
+    st.markdown(
+        """
+        <style>
+        .evm-metric {
+            background-color: black;
+            color: white;
+            padding: 15px;
+            border-radius: 5px;
+            margin-bottom: 10px;
+            text-align: center;
+        }
+        .evm-metric-label {
+            font-weight: bold;
+            font-size: 18px;
+        }
+        .evm-metric-value {
+            font-size: 24px;
+        }
+        </style>
+        """,
+        unsafe_allow_html=True,
+    )
+
+    # Display EVM metrics using st.markdown
+    for label, value in evm_metrics.items():
+        st.markdown(
+            f"""
+            <div class="evm-metric">
+                <div class="evm-metric-label">{label}</div>
+                <div class="evm-metric-value">{value}</div>
+            </div>
+            """,
+            unsafe_allow_html=True,
+        )
+
+    # Display EVM metrics table per task
+    st.subheader("EVM Metrics per Task")
+    st.table(evm_df[['Task', 'Budget', 'EV', 'Actual Cost'] + [m for m in TASK_METRICS if m not in ('PV', 'EV')]])
+
+    # EVM rollup per category (summed in SQL when a database backend is active)
+    st.subheader("EVM by Category")
+    category_rollup = storage.evm_rollup(tasks_snapshot, *filter_args)
+    if category_rollup is None:
+        category_rollup = evm_rollup(filtered_df)
+    st.dataframe(category_rollup, use_container_width=True)
+
+    # Monte Carlo completion forecast for the whole project, from the tasks
+    # and the open risks; cached per tasks/risk version for the day
+    st.subheader("Completion Forecast")
+    risk_snapshot = get_snapshot('risk')
+    forecast = task_forecast(tasks_snapshot, risk_snapshot, evm_as_of)
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("P50 Completion", forecast.finish_date(50).strftime('%Y-%m-%d'))
+    col2.metric("P80 Completion", forecast.finish_date(80).strftime('%Y-%m-%d'))
+    col3.metric("P50 Cost at Completion", f"${forecast.cost_at(50):,.0f}")
+    col4.metric("P80 Cost at Completion", f"${forecast.cost_at(80):,.0f}")
+    st.caption(
+        f"{forecast.iterations:,} simulated runs; chance of finishing by the planned "
+        f"{format_or_na(forecast.planned_finish, '%Y-%m-%d')}: {format_or_na(forecast.on_time_probability(), '.0%')}, "
+        f"within the ${forecast.budget:,.0f} budget: {format_or_na(forecast.within_budget_probability(), '.0%')}."
+    )
+    forecast_keys = (tasks_snapshot, risk_snapshot, evm_as_of)
+    forecast_figures = functools.cache(lambda: build_forecast_figures(forecast))
+    forecast_cols = st.columns(2)
+    with forecast_cols[0]:
+        st.plotly_chart(cached_figure('forecast_finish', lambda: forecast_figures()[0], *forecast_keys),
+                        use_container_width=True)
+    with forecast_cols[1]:
+        st.plotly_chart(cached_figure('forecast_cost', lambda: forecast_figures()[1], *forecast_keys),
+                        use_container_width=True)
+
+    # EVM Trend Charts
+    st.subheader("EVM Trends Over Time")
+
+    # Cumulative time-phased PV/EV/AC curves (S-curves)
+    evm_freq = st.radio("Trend Resolution", ['W', 'D'], format_func={'W': 'Weekly', 'D': 'Daily'}.get, horizontal=True)
+    trend_inputs = (tasks_snapshot, filter_state, evm_profile, evm_as_of, evm_freq)
+
+    # Computed at most once per run, and only if a trend chart is not cached
+    @functools.cache
+    def evm_trend():
+        trend_df = time_phased_evm(filtered_df, as_of=evm_as_of, profile=evm_profile, freq=evm_freq).reset_index()
+        return trend_df.rename(columns={'PV': 'Planned Value', 'EV': 'Earned Value', 'AC': 'Actual Cost'})
+
+    # SV Trend Chart
+    st.subheader("Schedule Variance (SV) Trend")
+    sv_trend = cached_figure(
+        'sv_trend', lambda: px.line(evm_trend(), x='Date', y=['Planned Value', 'Earned Value', 'SV'], title='Schedule Variance Trend'),
+        *trend_inputs,
+    )
+    st.plotly_chart(sv_trend, key='sv_trend_chart')
+
+    # CV Trend Chart
+    st.subheader("Cost Variance (CV) Trend")
+    cv_trend = cached_figure(
+        'cv_trend', lambda: px.line(evm_trend(), x='Date', y=['Earned Value', 'Actual Cost', 'CV'], title='Cost Variance Trend'),
+        *trend_inputs,
+    )
+    st.plotly_chart(cv_trend, key='cv_trend_chart')
+
+    # SPI and CPI Trend Chart
+    st.subheader("SPI and CPI Trends")
+    spi_cpi_trend = cached_figure(
+        'spi_cpi_trend', lambda: px.line(evm_trend(), x='Date', y=['SPI', 'CPI'], title='SPI and CPI Trends'),
+        *trend_inputs,
+    )
+    st.plotly_chart(spi_cpi_trend, key='spi_cpi_trend_chart')
@@ -0,0 +1,252 @@
+"""Monte Carlo forecasts of the completion date and cost at completion.
+
+Every iteration perturbs each open task's remaining work and remaining
+budget with triangular multipliers, and draws which open risks from the
+risk register occur.  A risk that occurs adds a fraction of the remaining
+work and cost (by its Impact) to the tasks of its Category, or to every
+task when its Category isn't a task category.  Iterations run as batched
+``(iterations, tasks)`` NumPy arrays: the completion date comes from the
+critical path forward pass of ``schedule.py`` evaluated for the whole batch
+at once, the cost from summing the perturbed remaining budgets onto the
+actual cost to date.
+
+Large runs are split into shards with independent seeds, which can run in a
+process pool (``SOLAR_FORECAST_WORKERS``).  Results are cached per tasks and
+risk version by the caller.
+"""
+import os
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+from instrumentation import timed
+from risk import level_scores
+from schedule import Schedule
+from schema import day_number
+from worker_pool import LazyPool
+
+FORECAST_ITERATIONS = int(os.environ.get("SOLAR_FORECAST_ITERATIONS", "20000"))
+# 0 or 1 runs in-process; more shards the iterations over a process pool.
+FORECAST_WORKERS = int(os.environ.get("SOLAR_FORECAST_WORKERS", "0"))
+FORECAST_SEED = int(os.environ.get("SOLAR_FORECAST_SEED", "42"))
+
+# (low, mode, high) multipliers on remaining work and remaining budget.
+DURATION_SPREAD = (0.9, 1.0, 1.5)
+COST_SPREAD = (0.95, 1.0, 1.3)
+# Per rating in LEVELS: chance a risk occurs, and the share of remaining work
+# and cost it adds when it does.
+RISK_PROBABILITY = np.array([0.1, 0.3, 0.6])
+RISK_IMPACT = np.array([0.05, 0.15, 0.3])
+# Risks in these states no longer affect the forecast.
+INACTIVE_RISK_STATUSES = {'Closed', 'Mitigated'}
+
+# Iterations x tasks cells per batch, to bound memory.
+_BATCH_CELLS = 2_000_000
+PERCENTILES = (10, 50, 80, 90)
+
+
+@dataclass
+class ForecastInputs:
+    """Arrays a simulation needs; small and picklable for worker processes."""
+    schedule: Schedule
+    floor: np.ndarray        # earliest finish regardless of remaining work (planned end of started tasks)
+    lower: np.ndarray        # earliest start regardless of predecessors
+    remaining_budget: np.ndarray
+    actual_cost: float
+    task_category: np.ndarray
+    risk_probability: np.ndarray
+    risk_impact: np.ndarray
+    risk_targets: np.ndarray  # risks x categories, 1 where a risk applies
+
+
+def forecast_inputs(tasks_df, risk_df, as_of):
+    schedule = Schedule.build(tasks_df, as_of)
+    today = day_number(schedule.as_of)
+    started = (schedule.percent > 0) & ~schedule.complete
+    percent = schedule.percent / 100
+    budget = np.nan_to_num(pd.to_numeric(tasks_df['Budget'], errors='coerce').to_numpy(dtype=np.float64))
+    actual = np.nan_to_num(pd.to_numeric(tasks_df['Actual Cost'], errors='coerce').to_numpy(dtype=np.float64))
+
+    # Through object: astype(str) of an empty categorical fails under copy-on-write.
+    task_category, categories = pd.factorize(tasks_df['Category'].astype(object).astype(str))
+    if risk_df is not None and not risk_df.empty:
+        risk_df = risk_df[~risk_df['Status'].astype(str).isin(INACTIVE_RISK_STATUSES)]
+    if risk_df is None or risk_df.empty:
+        probability = impact = np.empty(0)
+        targets = np.empty((0, len(categories)))
+    else:
+        # Unrated risks count as Low.
+        probability = RISK_PROBABILITY[np.maximum(level_scores(risk_df['Probability']), 1) - 1]
+        impact = RISK_IMPACT[np.maximum(level_scores(risk_df['Impact']), 1) - 1]
+        risk_category = pd.Index(categories).get_indexer(risk_df['Category'].astype(str))
+        targets = np.zeros((len(risk_df), len(categories)))
+        targets[risk_category < 0] = 1  # not a task category: project-wide
+        matched = np.flatnonzero(risk_category >= 0)
+        targets[matched, risk_category[matched]] = 1
+
+    return ForecastInputs(
+        schedule=schedule,
+        floor=np.where(started | schedule.complete, schedule.end, np.iinfo(np.int64).min // 2),
+        lower=np.where(started, np.maximum(schedule.start, today), schedule.constraint),
+        remaining_budget=np.where(schedule.complete, 0.0, budget * (1 - percent)),
+        actual_cost=float(actual.sum()),
+        task_category=task_category,
+        risk_probability=probability,
+        risk_impact=impact,
+        risk_targets=targets,
+    )
+
+
+# --- Simulation ---
+def _forward_batch(inputs, work):
+    """Project finish day per iteration for remaining ``work`` (iterations x tasks)."""
+    schedule = inputs.schedule
+    graph = schedule.graph
+    finish = np.empty_like(work)
+    for nodes in graph.levels:
+        earliest = np.broadcast_to(inputs.lower[nodes].astype(np.float64), (len(work), nodes.size)).copy()
+        preds, owners = graph.predecessor_edges(nodes)
+        if preds.size:
+            columns = np.searchsorted(nodes, owners)
+            # Iterations x edges, reduced onto the level's columns.
+            np.maximum.at(earliest.T, columns, finish[:, preds].T)
+        # Finished tasks keep their planned end, whatever their predecessors do.
+        finish[:, nodes] = np.where(schedule.complete[nodes], schedule.end[nodes],
+                                    np.maximum(inputs.floor[nodes], earliest + work[:, nodes]))
+    return finish.max(axis=1) if finish.shape[1] else np.zeros(len(work))
+
+
+def _simulate(inputs, iterations, seed):
+    """``(finish days, cost at completion)`` arrays for ``iterations`` runs."""
+    rng = np.random.default_rng(seed)
+    n = inputs.schedule.graph.n
+    batch = max(1, _BATCH_CELLS // max(n, 1))
+    finishes, costs = [], []
+    for done in range(0, iterations, batch):
+        size = min(batch, iterations - done)
+        duration = rng.triangular(*DURATION_SPREAD, size=(size, n))
+        cost = rng.triangular(*COST_SPREAD, size=(size, n))
+        if len(inputs.risk_probability):
+            occurs = rng.random((size, len(inputs.risk_probability))) < inputs.risk_probability
+            extra = ((occurs * inputs.risk_impact) @ inputs.risk_targets)[:, inputs.task_category]
+            duration *= 1 + extra
+            cost *= 1 + extra
+        finishes.append(_forward_batch(inputs, inputs.schedule.remaining * duration))
+        costs.append(inputs.actual_cost + (inputs.remaining_budget * cost).sum(axis=1))
+    return np.concatenate(finishes), np.concatenate(costs)
+
+
+# Module-level so every session's forecasts share the worker processes.
+_pool = LazyPool()
+
+
+@timed('forecast.monte_carlo', rows=lambda forecast: forecast.iterations)
+def monte_carlo(tasks_df, risk_df=None, as_of=None, iterations=FORECAST_ITERATIONS,
+                workers=FORECAST_WORKERS, seed=FORECAST_SEED):
+    """Runs the simulation and returns a ``Forecast``."""
+    as_of = as_of if as_of is not None else pd.Timestamp.now()
+    inputs = forecast_inputs(tasks_df, risk_df, as_of)
+    shards = max(1, min(workers, iterations))
+    sizes = np.diff(np.linspace(0, iterations, shards + 1).astype(np.int64))
+    seeds = np.random.SeedSequence(seed).spawn(shards)
+    if shards == 1:
+        results = [_simulate(inputs, iterations, seeds[0])]
+    else:
+        futures = [_pool.get(workers).submit(_simulate, inputs, int(size), shard_seed)
+                   for size, shard_seed in zip(sizes, seeds)]
+        results = [future.result() for future in futures]
+    budget = pd.to_numeric(tasks_df['Budget'], errors='coerce').fillna(0).sum()
+    return Forecast(
+        finish=np.concatenate([finish for finish, _ in results]),
+        cost=np.concatenate([cost for _, cost in results]),
+        planned_finish=inputs.schedule.planned_finish(),
+        budget=float(budget),
+        as_of=inputs.schedule.as_of,
+    )
+
+
+# --- Results ---
+def _to_date(days):
+    return pd.Timestamp(np.datetime64(int(np.ceil(days)), 'D'))
+
+
+@dataclass
+class Forecast:
+    finish: np.ndarray  # completion day number per iteration
+    cost: np.ndarray    # cost at completion per iteration
+    planned_finish: pd.Timestamp
+    budget: float
+    as_of: pd.Timestamp
+
+    @property
+    def iterations(self):
+        return len(self.finish)
+
+    def finish_date(self, percentile):
+        return _to_date(np.percentile(self.finish, percentile)) if self.iterations else None
+
+    def cost_at(self, percentile):
+        return float(np.percentile(self.cost, percentile)) if self.iterations else None
+
+    def summary(self):
+        """P10-P90 completion dates and costs, and the chance of meeting the plan."""
+        rows = {f"P{p}": {'Completion Date': self.finish_date(p), 'Cost at Completion': self.cost_at(p)}
+                for p in PERCENTILES}
+        return pd.DataFrame(rows).T
+
+    def on_time_probability(self):
+        if self.planned_finish is None or not self.iterations:
+            return None
+        planned = day_number(self.planned_finish)
+        return float((self.finish <= planned).mean())
+
+    def within_budget_probability(self):
+        return float((self.cost <= self.budget).mean()) if self.iterations else None
+
+
+def format_or_na(value, spec):
+    """``value`` formatted with ``spec``, or "n/a" when there is none (no tasks or no runs)."""
+    return "n/a" if value is None else format(value, spec)
+
+
+def _histogram_figure(values, bins, x, title, xaxis_title, markers):
+    counts, edges = np.histogram(values, bins=bins)
+    fig = go.Figure(go.Bar(
+        x=x(edges[:-1] + np.diff(edges) / 2), y=counts / max(len(values), 1) * 100,
+        marker_color='#1f77b4', hovertemplate="%{x}<br>%{y:.1f}% of runs<extra></extra>",
+    ))
+    for label, value, color in markers:
+        if value is not None:
+            fig.add_vline(x=value, line_dash='dash', line_color=color)
+            fig.add_annotation(x=value, y=1, yref='paper', text=label, showarrow=False, yanchor='bottom',
+                               font=dict(color=color))
+    fig.update_layout(title=title, xaxis_title=xaxis_title, yaxis_title="% of runs", bargap=0.05)
+    return fig
+
+
+def build_forecast_figures(forecast, bins=40):
+    """Completion-date and cost-at-completion distributions, pre-binned so the figures stay small."""
+    def dates(days):
+        return pd.to_datetime(np.ceil(days).astype(np.int64).astype('datetime64[D]'))
+    finish_fig = _histogram_figure(
+        forecast.finish, bins, dates, f"Completion Date ({forecast.iterations:,} runs)", "Completion Date",
+        [("Plan", forecast.planned_finish, '#2ca02c'), ("P50", forecast.finish_date(50), '#ff7f0e'),
+         ("P80", forecast.finish_date(80), '#d62728')],
+    )
+    finish_fig.update_xaxes(type='date')
+    cost_fig = _histogram_figure(
+        forecast.cost, bins, lambda values: values, f"Cost at Completion ({forecast.iterations:,} runs)",
+        "Cost at Completion ($)",
+        [("BAC", forecast.budget, '#2ca02c'), ("P50", forecast.cost_at(50), '#ff7f0e'),
+         ("P80", forecast.cost_at(80), '#d62728')],
+    )
+    return finish_fig, cost_fig
+
+
+def task_forecast(tasks_snapshot, risk_snapshot, as_of):
+    """Forecast for the whole project as of a day, shared across sessions."""
+    as_of = pd.Timestamp(as_of).normalize()
+    key = ('forecast', as_of, risk_snapshot.version)
+    return tasks_snapshot.derived(key, lambda df: monte_carlo(df, risk_snapshot.data, as_of))
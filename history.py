@@ -0,0 +1,466 @@
+"""Append-only history of the task, procurement and risk datasets.
+
+Every published snapshot is recorded as the cells that changed since the
+previously recorded version, column by column, in one file per dataset under
+``CACHE_DIR/history`` (``SOLAR_HISTORY_DIR``).  A full copy (keyframe) is
+written for the first record, when the columns change, when a delta would be
+larger than the table, and every ``KEYFRAME_INTERVAL`` records, so rebuilding
+any version replays a bounded number of deltas.  Versions whose declared
+columns didn't change are not recorded.
+
+Each record is a 4-byte header length, a JSON header (time, kind, workbook
+hash, columns and the byte length of each part) and the parts, each a
+zstd-compressed Arrow IPC stream.  A delta has one part per changed column
+holding the row keys and new values, plus the deleted keys; a keyframe has
+the keys and one part per column.  Queries about a column only read that
+column's parts.  The time index is rebuilt from the headers when the file is
+opened, and an incomplete last record (a crash mid-append) is cut off before
+the next append.
+
+Rows are identified by the dataset's primary key (``schema.row_keys``);
+repeated keys are told apart by their occurrence ("key#2").  Only the
+declared columns are kept, as strings, float64 and datetime64[s].
+
+Recording is on unless ``SOLAR_HISTORY=0`` and runs on a background thread,
+like the storage mirror.  Workbook versions committed to git before history
+was recorded can be replayed with ``python history.py backfill``.
+"""
+import argparse
+import bisect
+import io
+import json
+import logging
+import os
+import struct
+import subprocess
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from data_cache import CACHE_DIR
+from loaders import DATASETS, process_procurement, process_risk, process_tasks
+from schema import CATEGORY, DATE, SCHEMAS, TEXT, row_keys
+
+HISTORY_ENABLED = os.environ.get("SOLAR_HISTORY", "1").lower() in ("1", "true", "yes")
+HISTORY_DIR = os.environ.get("SOLAR_HISTORY_DIR", os.path.join(CACHE_DIR, "history"))
+KEYFRAME_INTERVAL = int(os.environ.get("SOLAR_HISTORY_KEYFRAME", "32"))
+# Past versions whose derived indexes are kept per dataset.
+MAX_DERIVED_VERSIONS = 8
+
+# Row processors for raw sheets, as the store's loaders apply them.
+PROCESSORS = {'tasks': process_tasks, 'procurement': process_procurement, 'risk': process_risk}
+
+KEY = 'Key'
+_KEYS_PART, _DELETED_PART = '__keys__', '__deleted__'
+_LENGTH = struct.Struct('<I')
+_IPC_OPTIONS = pa.ipc.IpcWriteOptions(compression='zstd')
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# --- Row form ---
+def normalise(name, df):
+    """The declared columns of ``df``, indexed by unique row key, in the dtypes history stores."""
+    keys = row_keys(name, df)
+    if not pd.Index(keys).is_unique:
+        occurrence = keys.groupby(keys).cumcount()
+        keys = keys.where(occurrence == 0, keys + '#' + (occurrence + 1).astype(str))
+    columns = {}
+    for column, kind in SCHEMAS[name].items():
+        if column not in df.columns:
+            continue
+        values = df[column]
+        if kind in (TEXT, CATEGORY):
+            values = values.astype(object).where(values.notna(), None)
+        elif kind == DATE:
+            if values.dtype.kind != 'M':
+                values = pd.to_datetime(values, errors='coerce')
+            values = values.astype('datetime64[s]')
+        else:
+            values = pd.to_numeric(values, errors='coerce').astype(np.float64)
+        columns[column] = values.to_numpy()
+    return pd.DataFrame(columns, index=pd.Index(keys.to_numpy(), name=KEY))
+
+
+def _same(old, new):
+    return (old == new) | (pd.isna(old) & pd.isna(new))
+
+
+def diff(previous, current):
+    """``(deleted keys, {column: new values of changed rows})`` from ``previous`` to ``current``.
+
+    Inserted rows appear under every column.  None if the columns differ.
+    """
+    if list(previous.columns) != list(current.columns):
+        return None
+    deleted = previous.index[~previous.index.isin(current.index)]
+    positions = previous.index.get_indexer(current.index)
+    inserted = positions < 0
+    changes = {}
+    for column in current.columns:
+        new = current[column].to_numpy()
+        changed = inserted.copy()
+        matched = ~inserted
+        changed[matched] = ~_same(previous[column].to_numpy()[positions[matched]], new[matched])
+        if changed.any():
+            changes[column] = current[column][changed]
+    return deleted, changes
+
+
+def _apply(state, deleted, changes):
+    """``state`` with the keys in ``deleted`` dropped and ``changes`` written in."""
+    if len(deleted):
+        state = state.drop(index=deleted, errors='ignore')
+    if changes:
+        keys = pd.Index(np.concatenate([values.index.to_numpy() for values in changes.values()])).unique()
+        new = keys[~keys.isin(state.index)]
+        if len(new):
+            state = state.reindex(state.index.append(new.rename(state.index.name)))
+    for column, values in changes.items():
+        if column not in state.columns:
+            continue
+        array = state[column].to_numpy(copy=True)
+        array[state.index.get_indexer(values.index)] = values.to_numpy()
+        state[column] = array
+    return state
+
+
+# --- Encoding ---
+def _encode(frame):
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema, options=_IPC_OPTIONS) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def _decode(data):
+    return pa.ipc.open_stream(data).read_all().to_pandas()
+
+
+# --- Aggregation ---
+def _aggregate(state, column, by, agg, weight):
+    groups = state[by] if by else pd.Series('Total', index=state.index)
+    if agg == 'count':
+        return state.groupby(groups).size().astype(float)
+    values = state[column].fillna(0)
+    if agg == 'sum':
+        return values.groupby(groups).sum()
+    if weight is None:
+        return values.groupby(groups).mean()
+    weights = state[weight].fillna(0)
+    sums = pd.DataFrame({'value': values * weights, 'weight': weights}).groupby(groups).sum()
+    return sums['value'] / sums['weight'].replace(0, np.nan)
+
+
+class DatasetHistory:
+    """The history file of one dataset: recorded versions and queries over them."""
+
+    def __init__(self, name, path):
+        self.name = name
+        self.path = path
+        self.records = []  # headers, with 'parts' mapped to (offset, length)
+        self._end = 0  # end of the last complete record
+        self._last = None  # normalised data of the last record, once appended or rebuilt
+        self._trends = {}
+        self._derived = OrderedDict()  # (position, key) -> built value, least recently used first
+        self._lock = threading.Lock()
+        self._scan()
+
+    # --- Index ---
+    def _scan(self):
+        """Indexes records appended since the last scan."""
+        try:
+            size = os.path.getsize(self.path)
+        except FileNotFoundError:
+            size = 0
+        if size < self._end:
+            # The file was removed or replaced; start over.
+            self.records, self._end, self._last = [], 0, None
+            self._derived.clear()
+        if size == self._end:
+            return
+        with open(self.path, 'rb') as f:
+            f.seek(self._end)
+            while True:
+                prefix = f.read(_LENGTH.size)
+                if len(prefix) < _LENGTH.size:
+                    break
+                (length,) = _LENGTH.unpack(prefix)
+                raw = f.read(length)
+                if len(raw) < length:
+                    break
+                header = json.loads(raw)
+                offset = f.tell()
+                if offset + sum(part_length for _, part_length in header['parts']) > size:
+                    break
+                parts = {}
+                for part, part_length in header['parts']:
+                    parts[part] = (offset, part_length)
+                    offset += part_length
+                header['parts'] = parts
+                self.records.append(header)
+                self._end = offset
+                f.seek(offset)
+
+    def times(self):
+        """Local time of each record."""
+        return [pd.Timestamp.fromtimestamp(record['time']) for record in self.records]
+
+    def log(self):
+        """One row per record: time, kind, rows and size on disk."""
+        return pd.DataFrame({
+            'Time': self.times(),
+            'Kind': [record['kind'] for record in self.records],
+            'Rows': [record['rows'] for record in self.records],
+            'Bytes': [sum(length for _, length in record['parts'].values()) for record in self.records],
+        })
+
+    def position(self, when):
+        """Index of the last record at or before ``when``, or None."""
+        position = bisect.bisect_right(self.times(), pd.Timestamp(when))
+        return position - 1 if position else None
+
+    # --- Reads ---
+    def _read(self, record, parts):
+        frames = {}
+        with open(self.path, 'rb') as f:
+            for part in parts:
+                if part in record['parts']:
+                    offset, length = record['parts'][part]
+                    f.seek(offset)
+                    frames[part] = _decode(f.read(length))
+        return frames
+
+    def _replay(self, state, record, columns=None):
+        """``state`` advanced by ``record``, limited to ``columns``."""
+        wanted = [column for column in record['columns'] if columns is None or column in columns]
+        if record['kind'] == 'keyframe':
+            parts = self._read(record, [_KEYS_PART, *wanted])
+            index = pd.Index(parts[_KEYS_PART][KEY].to_numpy(), name=KEY)
+            return pd.DataFrame({column: parts[column][column].to_numpy() for column in wanted}, index=index)
+        parts = self._read(record, [_DELETED_PART, *wanted])
+        deleted = parts[_DELETED_PART][KEY].to_numpy() if _DELETED_PART in parts else []
+        changes = {column: parts[column].set_index(KEY)[column] for column in wanted if column in parts}
+        return _apply(state, deleted, changes)
+
+    def state(self, position, columns=None):
+        """The dataset as of ``records[position]``, indexed by row key."""
+        start = position
+        while self.records[start]['kind'] != 'keyframe':
+            start -= 1
+        state = None
+        for record in self.records[start:position + 1]:
+            state = self._replay(state, record, columns)
+        return state
+
+    def as_of(self, when, columns=None):
+        """The dataset as last recorded at or before ``when``; None before the first record."""
+        with self._lock:
+            self._scan()
+            position = self.position(when)
+            return self.state(position, columns) if position is not None else None
+
+    def derived(self, when, key, builder):
+        """``builder(state)`` for the version recorded at or before ``when``; None before the first record.
+
+        Like ``Snapshot.derived`` for past versions: recorded versions never
+        change, so each is replayed and built once while it stays among the
+        ``MAX_DERIVED_VERSIONS`` most recently used.
+        """
+        with self._lock:
+            self._scan()
+            position = self.position(when)
+            if position is None:
+                return None
+            cache_key = (position, key)
+            if cache_key in self._derived:
+                self._derived.move_to_end(cache_key)
+            else:
+                self._derived[cache_key] = builder(self.state(position))
+                while len(self._derived) > MAX_DERIVED_VERSIONS:
+                    self._derived.popitem(last=False)
+            return self._derived[cache_key]
+
+    def trace(self, key, column):
+        """``column`` of the row ``key`` after each record, indexed by time (NaN while absent)."""
+        values = []
+        with self._lock:
+            self._scan()
+            value = np.nan
+            for record in self.records:
+                if record['kind'] == 'keyframe':
+                    parts = self._read(record, [_KEYS_PART, column])
+                    keys = parts[_KEYS_PART][KEY]
+                    matches = np.flatnonzero(keys.to_numpy() == key)
+                    value = parts[column][column].iloc[matches[0]] if len(matches) and column in parts else np.nan
+                else:
+                    parts = self._read(record, [_DELETED_PART, column])
+                    if _DELETED_PART in parts and (parts[_DELETED_PART][KEY] == key).any():
+                        value = np.nan
+                    if column in parts:
+                        changed = parts[column][parts[column][KEY] == key]
+                        if len(changed):
+                            value = changed[column].iloc[0]
+                values.append(value)
+            times = self.times()
+        return pd.Series(values, index=pd.DatetimeIndex(times, name='Time'), name=column)
+
+    def trend(self, column=None, by=None, agg='sum', weight=None):
+        """``column`` aggregated per ``by`` group after each record, indexed by time.
+
+        ``agg`` is 'sum', 'count' (rows, ``column`` unused) or 'mean'
+        (weighted by the ``weight`` column when given).  One replay over the
+        whole history, kept until the next record is appended.
+        """
+        with self._lock:
+            self._scan()
+            if not self.records:
+                return pd.DataFrame(index=pd.DatetimeIndex([], name='Time'))
+            cache_key = (len(self.records), column, by, agg, weight)
+            if cache_key not in self._trends:
+                columns = {c for c in (column, by, weight) if c} or set(self.records[0]['columns'][:1])
+                state, rows = None, []
+                for record in self.records:
+                    state = self._replay(state, record, columns)
+                    rows.append(_aggregate(state, column, by, agg, weight))
+                trend = pd.DataFrame(rows, index=pd.DatetimeIndex(self.times(), name='Time'))
+                self._trends[cache_key] = trend.fillna(0) if agg == 'count' else trend
+            return self._trends[cache_key]
+
+    # --- Writes ---
+    def _since_keyframe(self):
+        count = 0
+        for record in reversed(self.records):
+            if record['kind'] == 'keyframe':
+                break
+            count += 1
+        return count
+
+    def append(self, data, when, sha256=None):
+        """Records ``data`` (the processed dataset) as of epoch time ``when``.
+
+        Returns the record's kind, or None when nothing changed.
+        """
+        current = normalise(self.name, data)
+        with self._lock:
+            self._scan()
+            if self._last is None and self.records:
+                self._last = self.state(len(self.records) - 1)
+            changes = diff(self._last, current) if self._last is not None else None
+            if changes is not None and not len(changes[0]) and not changes[1]:
+                return None
+            keyframe = changes is None or self._since_keyframe() + 1 >= KEYFRAME_INTERVAL or (
+                len(changes[0]) + sum(len(values) for values in changes[1].values()) * 2 > current.size)
+
+            if keyframe:
+                parts = [(_KEYS_PART, pd.DataFrame({KEY: current.index.to_numpy()}))]
+                parts += [(column, current[[column]].reset_index(drop=True)) for column in current.columns]
+            else:
+                deleted, columns = changes
+                parts = [(_DELETED_PART, pd.DataFrame({KEY: deleted.to_numpy()}))] if len(deleted) else []
+                parts += [(column, values.reset_index()) for column, values in columns.items()]
+            blobs = [(part, _encode(frame)) for part, frame in parts]
+            header = json.dumps({
+                'time': float(when), 'kind': 'keyframe' if keyframe else 'delta', 'sha256': sha256,
+                'columns': list(current.columns), 'rows': len(current),
+                'parts': [[part, len(blob)] for part, blob in blobs],
+            }).encode()
+
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with open(self.path, 'ab') as f:
+                # Drop an incomplete record left by a crashed append.
+                if f.tell() > self._end:
+                    f.truncate(self._end)
+                f.write(_LENGTH.pack(len(header)) + header + b''.join(blob for _, blob in blobs))
+            self._scan()
+            self._last = current
+            self._trends.clear()
+            return self.records[-1]['kind']
+
+
+class History:
+    """Histories of all declared datasets; records the store's snapshots."""
+
+    def __init__(self, directory=HISTORY_DIR, enabled=HISTORY_ENABLED):
+        self.directory = directory
+        self.enabled = enabled
+        self._datasets = {}
+        self._lock = threading.Lock()
+        # One writer; snapshots are recorded in publish order.
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="history")
+        self._pending = None
+
+    def __getitem__(self, name):
+        with self._lock:
+            if name not in self._datasets:
+                self._datasets[name] = DatasetHistory(name, os.path.join(self.directory, f"{name}.history"))
+            return self._datasets[name]
+
+    def record(self, snapshot):
+        """Queues ``snapshot`` for recording (store listener)."""
+        if self.enabled and snapshot.name in SCHEMAS:
+            self._pending = self._writer.submit(self._record, snapshot)
+
+    def _record(self, snapshot):
+        sha256 = snapshot.fingerprint[3] if snapshot.fingerprint else None
+        try:
+            self[snapshot.name].append(snapshot.data, snapshot.loaded_at, sha256)
+        except Exception:
+            _LOGGER.exception("Recording history of dataset %r failed", snapshot.name)
+
+    def flush(self):
+        """Waits until every queued snapshot is recorded."""
+        if self._pending is not None:
+            self._pending.result()
+
+
+# Module-level so the store listener and every session share the files.
+history = History()
+
+
+# --- Backfill from git ---
+def _git(*args):
+    return subprocess.run(['git', *args], capture_output=True, check=True).stdout
+
+
+def backfill(names):
+    """Records the workbook versions committed to git after each dataset's last record."""
+    for name in names:
+        source = DATASETS[name][0]
+        dataset = history[name]
+        last = dataset.records[-1]['time'] if dataset.records else float('-inf')
+        commits = _git('log', '--reverse', '--format=%H %ct', '--', source).decode().split()
+        recorded = 0
+        for commit, committed in zip(commits[::2], commits[1::2]):
+            if float(committed) <= last:
+                continue
+            raw = pd.read_excel(io.BytesIO(_git('show', f"{commit}:./{source}")))
+            if dataset.append(PROCESSORS[name](raw), float(committed), commit) is not None:
+                recorded += 1
+        print(f"{name}: {recorded} version(s) recorded from {len(commits) // 2} commit(s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest='command', required=True)
+    backfill_parser = commands.add_parser('backfill', help="record the workbook versions committed to git")
+    backfill_parser.add_argument('datasets', nargs='*', default=list(PROCESSORS))
+    log_parser = commands.add_parser('log', help="list the recorded versions")
+    log_parser.add_argument('datasets', nargs='*', default=list(PROCESSORS))
+    args = parser.parse_args()
+
+    if args.command == 'backfill':
+        backfill(args.datasets)
+    else:
+        for name in args.datasets:
+            print(f"{name} ({history[name].path})")
+            print(history[name].log().to_string(index=False))
+
+
+if __name__ == '__main__':
+    main()
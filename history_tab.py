@@ -0,0 +1,124 @@
+"""History tab: the project as of a past date and trends over the recorded versions."""
+import datetime
+
+import plotly.express as px
+import streamlit as st
+
+from dashboard import get_snapshot
+from figure_cache import cached_figure
+from filters import FilterIndex
+from history import history
+from schema import money_sum, row_keys
+from task_list import render_task_list
+
+
+def _progress(tasks):
+    """Budget-weighted percent complete."""
+    budget = tasks['Budget'].fillna(0)
+    total = budget.sum()
+    return float((tasks['Percent Complete'].fillna(0) * budget).sum() / total) if total else 0.0
+
+
+def render(page):
+    st.header("Project History")
+    if not history.enabled:
+        st.info("History recording is off (SOLAR_HISTORY=0).")
+        return
+
+    # Loaded here so procurement versions are recorded even if its tab is never opened
+    get_snapshot('procurement')
+    history.flush()
+    tasks_history, procurement_history = history['tasks'], history['procurement']
+    if not tasks_history.records:
+        st.info("No versions recorded yet. History builds up as the workbooks are edited; "
+                "run `python history.py backfill` to record the versions committed to git.")
+        return
+    times = tasks_history.times()
+    st.caption(f"{len(times)} task version(s) recorded since {times[0]:%Y-%m-%d %H:%M}.")
+    # Figures depend on the recorded versions, not on the current snapshot
+    versions = ('history', len(tasks_history.records), len(procurement_history.records))
+
+    # --- As of ---
+    st.subheader("Project As Of")
+    as_of_date = st.date_input("As of", value=times[-1].date(), min_value=times[0].date(), key='history_as_of')
+    # Replayed and indexed once per recorded version, like the current snapshot's filter index
+    as_of_index = tasks_history.derived(datetime.datetime.combine(as_of_date, datetime.time.max), 'filter_index',
+                                        FilterIndex)
+    if as_of_index is None:
+        st.write(f"Nothing was recorded before {times[0]:%Y-%m-%d}.")
+    else:
+        # Both sides go through the sidebar filters, or neither does (no category selected)
+        if page.filter_args[0]:
+            as_of = as_of_index.filter(*page.filter_args)
+            current = page.filtered_df
+        else:
+            as_of, current = as_of_index.df, page.df
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Tasks", len(as_of), delta=len(current) - len(as_of), delta_color="off",
+                    help="Delta: change from then to now")
+        col2.metric("Progress", f"{_progress(as_of):.1f}%",
+                    delta=f"{_progress(current) - _progress(as_of):+.1f} pts")
+        actual_cost = money_sum(as_of['Actual Cost'])
+        col3.metric("Actual Cost", f"${actual_cost:,.0f}",
+                    delta=f"${money_sum(current['Actual Cost']) - actual_cost:+,.0f}", delta_color="inverse")
+        render_task_list(
+            as_of.reset_index(drop=True),
+            key='history_list',
+            columns=['Task', 'Category', 'Percent Complete', 'Actual Cost', 'Start Date', 'End Date'],
+            sort_options={
+                'Schedule order': ('Start Date', True),
+                'Least complete': ('Percent Complete', True),
+                'Actual cost': ('Actual Cost', False),
+            },
+            column_config={
+                'Percent Complete': st.column_config.ProgressColumn("Progress", format="%.1f%%", min_value=0, max_value=100),
+                'Start Date': st.column_config.DateColumn("Start Date"),
+                'End Date': st.column_config.DateColumn("End Date"),
+            },
+        )
+
+    # --- Trends ---
+    st.subheader("Progress Over Time")
+    by_category = st.checkbox("By category", key='history_by_category')
+    fig_progress = cached_figure(
+        'history_progress',
+        lambda: px.line(tasks_history.trend('Percent Complete', by='Category' if by_category else None,
+                                            agg='mean', weight='Budget'),
+                        line_shape='hv', labels={'value': 'Percent Complete', 'variable': 'Category'}),
+        versions, by_category,
+    )
+    st.plotly_chart(fig_progress, use_container_width=True)
+
+    st.subheader("Actual Cost by Category")
+    fig_cost = cached_figure(
+        'history_actual_cost',
+        lambda: px.area(tasks_history.trend('Actual Cost', by='Category'), line_shape='hv',
+                        labels={'value': 'Actual Cost', 'variable': 'Category'}),
+        versions,
+    )
+    st.plotly_chart(fig_cost, use_container_width=True)
+
+    if procurement_history.records:
+        st.subheader("PO Status Over Time")
+        fig_status = cached_figure(
+            'history_po_status',
+            lambda: px.area(procurement_history.trend(by='Status', agg='count'), line_shape='hv',
+                            labels={'value': 'POs', 'variable': 'Status'}),
+            versions,
+        )
+        st.plotly_chart(fig_status, use_container_width=True)
+
+    # --- Task progress curve ---
+    st.subheader("Task Progress Curve")
+    task_keys = row_keys('tasks', page.filtered_df).unique()
+    if not len(task_keys):
+        st.write("No tasks to display.")
+        return
+    task_key = st.selectbox("Task", task_keys, key='history_task')
+    curve = tasks_history.trace(task_key, 'Percent Complete')
+    fig_curve = px.line(curve.dropna(), line_shape='hv', markers=True,
+                        labels={'value': 'Percent Complete', 'Time': 'Recorded'})
+    fig_curve.update_layout(showlegend=False, yaxis_range=[0, 100])
+    st.plotly_chart(fig_curve, use_container_width=True)
+    if curve.isna().any():
+        st.caption(f"Absent from {int(curve.isna().sum())} recorded version(s).")
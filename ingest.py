@@ -0,0 +1,109 @@
+"""Incremental ingestion of edited workbooks.
+
+Each raw row is hashed on load and the hashes are kept with the snapshot,
+indexed by the dataset's primary key.  When the workbook changes, the new
+sheet is hashed and compared key by key against the previous version: only
+inserted and updated rows go through the row processor, unchanged rows are
+taken from the previous snapshot as they are, and the resulting ``Delta``
+lets aggregates be updated from the changed rows alone.
+
+Sheets whose key columns are missing or not unique, or whose columns
+changed, are ingested in full.  Re-read rows may come out of the schema with
+their own categories or a different numeric width; they are reassembled with
+the kept rows through ``schema.concat``.
+"""
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+from schema import compatible, concat
+
+# Snapshot.derived key under which the raw row hashes are kept.
+ROW_HASHES = '__row_hashes__'
+
+
+def row_hashes(raw, key):
+    """One hash per raw row, indexed by primary key; None if the key is unusable."""
+    if any(column not in raw.columns for column in key):
+        return None
+    index = pd.MultiIndex.from_frame(raw[key]) if len(key) > 1 else pd.Index(raw[key[0]])
+    if index.has_duplicates:
+        return None
+    hashes = pd.util.hash_pandas_object(raw, index=False).to_numpy()
+    # Fold the column names in, so a renamed column changes every hash.
+    salt = pd.util.hash_array(np.array([repr(tuple(raw.columns))], dtype=object))[0]
+    return pd.Series(hashes ^ salt, index=index)
+
+
+@dataclass(frozen=True)
+class Delta:
+    """Rows that differ between two versions of a dataset (processed form).
+
+    ``reordered`` is set when rows present in both versions changed their
+    relative order, which position-based aggregates can't carry forward.
+    """
+    inserted: pd.DataFrame
+    deleted: pd.DataFrame
+    updated_old: pd.DataFrame
+    updated_new: pd.DataFrame
+    reordered: bool = False
+
+    @property
+    def added(self):
+        """Rows whose values enter the new version."""
+        return pd.concat([self.inserted, self.updated_new])
+
+    @property
+    def removed(self):
+        """Rows whose values leave the old version."""
+        return pd.concat([self.deleted, self.updated_old])
+
+    def __len__(self):
+        return len(self.inserted) + len(self.deleted) + len(self.updated_new)
+
+    def summary(self):
+        return {"Inserted": len(self.inserted), "Updated": len(self.updated_new), "Deleted": len(self.deleted)}
+
+
+def ingest(raw, key, process, previous=None, previous_hashes=None):
+    """Processes ``raw`` into a dataset, reusing unchanged rows of ``previous``.
+
+    Returns ``(data, hashes, delta)``.  ``delta`` is None when the sheet was
+    processed in full (first load, unusable key, or changed columns).
+    """
+    hashes = row_hashes(raw, key)
+    if hashes is None or previous is None or previous_hashes is None or len(previous) != len(previous_hashes):
+        return process(raw), hashes, None
+
+    old_positions = previous_hashes.index.get_indexer(hashes.index)
+    matched = old_positions >= 0
+    unchanged = matched.copy()
+    unchanged[matched] = previous_hashes.to_numpy()[old_positions[matched]] == hashes.to_numpy()[matched]
+    if not unchanged.any():
+        # Nothing to reuse (e.g. a column was added or renamed).
+        return process(raw), hashes, None
+
+    changed = np.flatnonzero(~unchanged)
+    processed = process(raw.iloc[changed].copy())
+    kept = previous.iloc[old_positions[unchanged]]
+    if not processed.empty and not (processed.columns.equals(previous.columns) and all(
+            compatible(old, new) for old, new in zip(previous.dtypes, processed.dtypes))):
+        # The edit changed a column's type; the kept rows would not match.
+        return process(raw), hashes, None
+
+    # Reassemble in the new sheet's row order.
+    parts = [kept, processed] if not processed.empty else [kept]
+    order = np.argsort(np.concatenate([np.flatnonzero(unchanged), changed]), kind='stable')
+    data = concat(parts).iloc[order].reset_index(drop=True)
+
+    is_update = matched[changed]
+    deleted = np.setdiff1d(np.arange(len(previous)), old_positions[matched])
+    delta = Delta(
+        inserted=processed[~is_update],
+        deleted=previous.iloc[deleted],
+        updated_old=previous.iloc[old_positions[changed[is_update]]],
+        updated_new=processed[is_update],
+        reordered=bool((np.diff(old_positions[matched]) < 0).any()),
+    )
+    return data, hashes, delta
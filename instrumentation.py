@@ -0,0 +1,282 @@
+"""Lightweight timing spans for the dashboard's hot paths.
+
+Enabled with ``SOLAR_INSTRUMENT=1``.  Loaders, filters, metric
+computations, figure builds and report stages are wrapped in ``span``
+context managers or ``@timed`` decorators that record wall time, CPU time
+of the calling thread, rows processed and, with
+``SOLAR_INSTRUMENT_MEMORY=1``, memory allocated (tracemalloc, which slows
+everything down noticeably).
+
+Spans are grouped per script rerun and totalled per session and per
+process.  Records can be appended as JSON lines to ``SOLAR_METRICS_FILE``
+and the totals served in Prometheus text format on ``SOLAR_METRICS_PORT``.
+
+When disabled, ``span`` returns a shared no-op context manager and
+``@timed`` returns the function unchanged.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+ENABLED = os.environ.get("SOLAR_INSTRUMENT", "0").lower() in ("1", "true", "yes")
+TRACE_MEMORY = ENABLED and os.environ.get("SOLAR_INSTRUMENT_MEMORY", "0").lower() in ("1", "true", "yes")
+METRICS_FILE = os.environ.get("SOLAR_METRICS_FILE")
+METRICS_PORT = int(os.environ.get("SOLAR_METRICS_PORT", "0"))
+# Span records kept in memory for the admin panel and JSON-lines download.
+HISTORY = int(os.environ.get("SOLAR_INSTRUMENT_HISTORY", "5000"))
+
+# Totals per span name: calls, wall s, CPU s, rows, allocated bytes.
+_FIELDS = ('Calls', 'Wall (s)', 'CPU (s)', 'Rows', 'Allocated (bytes)')
+
+_current_run = contextvars.ContextVar('instrumentation_run', default=None)
+_depth = contextvars.ContextVar('instrumentation_depth', default=0)
+
+
+def _row_count(result):
+    if isinstance(result, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(result)
+    return None
+
+
+class Run:
+    """Spans recorded during one script rerun of one session."""
+
+    def __init__(self, session):
+        self.session = session
+        self.started = time.time()
+        self.wall = None
+        self.spans = []
+
+
+class Recorder:
+    def __init__(self, history=HISTORY, metrics_file=METRICS_FILE):
+        self.metrics_file = metrics_file
+        self.totals = {}
+        self.sessions = {}  # session -> {span name: totals}
+        self.last_runs = {}  # session -> last finished Run
+        self.reruns = 0
+        self.rerun_seconds = 0.0
+        self.recent = deque(maxlen=history)
+        self._lock = threading.Lock()
+
+    def record(self, record):
+        run = _current_run.get()
+        if run is not None:
+            record['session'] = run.session
+            run.spans.append(record)
+        values = (1, record['wall_ms'] / 1000, record['cpu_ms'] / 1000, record['rows'] or 0, record['alloc_bytes'] or 0)
+        with self._lock:
+            self.recent.append(record)
+            targets = [self.totals]
+            if run is not None:
+                targets.append(self.sessions.setdefault(run.session, {}))
+            for totals in targets:
+                current = totals.setdefault(record['name'], [0, 0.0, 0.0, 0, 0])
+                for i, value in enumerate(values):
+                    current[i] += value
+        if run is None:
+            # Outside a rerun (watcher thread, worker process): write straight away.
+            self._export([record])
+
+    # --- Reruns ---
+    def begin_run(self, session):
+        run = Run(session)
+        _current_run.set(run)
+        return run
+
+    def end_run(self, run):
+        run.wall = time.time() - run.started
+        _current_run.set(None)
+        with self._lock:
+            self.reruns += 1
+            self.rerun_seconds += run.wall
+            self.last_runs[run.session] = run
+        self._export(run.spans)
+
+    def _export(self, records):
+        if not self.metrics_file or not records:
+            return
+        with self._lock, open(self.metrics_file, "a", encoding="utf-8") as out:
+            out.writelines(json.dumps(record, default=str) + "\n" for record in records)
+
+    # --- Views ---
+    @staticmethod
+    def frame(totals):
+        frame = pd.DataFrame.from_dict(totals, orient='index', columns=list(_FIELDS))
+        frame.index.name = 'Span'
+        return frame.sort_values('Wall (s)', ascending=False)
+
+    def session_totals(self, session):
+        with self._lock:
+            return self.frame({name: list(values) for name, values in self.sessions.get(session, {}).items()})
+
+    def jsonl(self, session=None):
+        with self._lock:
+            records = [r for r in self.recent if session is None or r.get('session') == session]
+        return "".join(json.dumps(record, default=str) + "\n" for record in records)
+
+    def prometheus_text(self):
+        with self._lock:
+            totals = {name: list(values) for name, values in self.totals.items()}
+            reruns, rerun_seconds = self.reruns, self.rerun_seconds
+        metrics = [
+            ('solar_span_calls_total', 'Instrumented span calls.', 0),
+            ('solar_span_seconds_total', 'Wall time spent in spans.', 1),
+            ('solar_span_cpu_seconds_total', 'CPU time of the calling thread spent in spans.', 2),
+            ('solar_span_rows_total', 'Rows processed in spans.', 3),
+            ('solar_span_allocated_bytes_total', 'Memory allocated in spans (with SOLAR_INSTRUMENT_MEMORY).', 4),
+        ]
+        lines = []
+        for metric, help_text, field in metrics:
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} counter"]
+            for name, values in sorted(totals.items()):
+                label = name.replace('\\', '\\\\').replace('"', '\\"')
+                lines.append(f'{metric}{{span="{label}"}} {values[field]}')
+        lines += [
+            "# HELP solar_reruns_total Instrumented script reruns.", "# TYPE solar_reruns_total counter",
+            f"solar_reruns_total {reruns}",
+            "# HELP solar_rerun_seconds_total Wall time of instrumented reruns.", "# TYPE solar_rerun_seconds_total counter",
+            f"solar_rerun_seconds_total {rerun_seconds}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+# Module-level so every session and thread records into the same totals.
+recorder = Recorder()
+
+
+# --- Spans ---
+class _Span:
+    __slots__ = ('name', 'rows', '_wall', '_cpu', '_memory', '_token')
+
+    def __init__(self, name, rows=None):
+        self.name = name
+        self.rows = rows
+
+    def __enter__(self):
+        self._token = _depth.set(_depth.get() + 1)
+        self._memory = tracemalloc.get_traced_memory()[0] if TRACE_MEMORY else None
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        depth = _depth.get()
+        _depth.reset(self._token)
+        recorder.record({
+            'ts': time.time(),
+            'name': self.name,
+            'depth': depth - 1,
+            'wall_ms': wall * 1000,
+            'cpu_ms': cpu * 1000,
+            'rows': self.rows,
+            'alloc_bytes': max(tracemalloc.get_traced_memory()[0] - self._memory, 0) if self._memory is not None else None,
+            'pid': os.getpid(),
+        })
+        return False
+
+
+class _NoSpan:
+    """Shared stand-in when instrumentation is off; ``rows`` assignments are ignored."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+    def __setattr__(self, name, value):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+if TRACE_MEMORY and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def span(name, rows=None):
+    """Context manager timing the block as ``name``; set ``.rows`` inside it if not known up front."""
+    return _Span(name, rows) if ENABLED else _NO_SPAN
+
+
+def mark(name, since, rows=None):
+    """Records a span from ``since``, a ``(time.perf_counter(), time.thread_time())`` pair, to now.
+
+    For stretches that can't be wrapped in ``span``, such as a script's own
+    imports before this module is loaded.
+    """
+    if not ENABLED:
+        return
+    recorder.record({
+        'ts': time.time(),
+        'name': name,
+        'depth': _depth.get(),
+        'wall_ms': (time.perf_counter() - since[0]) * 1000,
+        'cpu_ms': (time.thread_time() - since[1]) * 1000,
+        'rows': rows,
+        'alloc_bytes': None,
+        'pid': os.getpid(),
+    })
+
+
+def timed(name=None, rows=_row_count):
+    """Decorator timing each call; ``rows(result)`` gives the rows processed."""
+    def decorate(function):
+        if not ENABLED:
+            return function
+        label = name or f"{function.__module__}.{function.__qualname__}"
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            with _Span(label) as current:
+                result = function(*args, **kwargs)
+                current.rows = rows(result) if rows is not None else None
+                return result
+        return wrapper
+    return decorate
+
+
+# --- Prometheus endpoint ---
+_server = None
+_server_lock = threading.Lock()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.rstrip('/') not in ('', '/metrics'):
+            self.send_error(404)
+            return
+        body = recorder.prometheus_text().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_metrics_server(port=METRICS_PORT):
+    """Serves ``/metrics`` on ``port`` from a daemon thread, once per process."""
+    global _server
+    if not ENABLED or not port:
+        return None
+    with _server_lock:
+        if _server is None:
+            _server = ThreadingHTTPServer(("", port), _MetricsHandler)
+            threading.Thread(target=_server.serve_forever, name="metrics-server", daemon=True).start()
+    return _server
@@ -0,0 +1,64 @@
+"""Loaders for the four workbooks behind the dashboard.
+
+These functions have no Streamlit dependency so they can run from the file
+watcher thread as well as from the script run.
+"""
+from data_cache import read_excel_cached
+from schema import KEYS, conform
+
+TASKS_FILENAME = 'solar_project_data.xlsx'
+OVERVIEW_FILENAME = 'project_overview.xlsx'
+RISK_FILENAME = 'risk.xlsx'
+PROCUREMENT_FILENAME = 'Procurement.xlsx'
+
+
+# --- Data Loading and Processing ---
+def process_tasks(df):
+    """Declared types and derived columns for raw task rows (row-wise, so it
+    also works on just the rows an edit touched)."""
+    conform('tasks', df)
+    df['Cost Variance'] = df['Budget'] - df['Actual Cost']
+    return df
+
+
+def load_and_process_data(filename=TASKS_FILENAME):
+    return process_tasks(read_excel_cached(filename))
+
+
+# --- Data Loading and Processing for Project Overview ---
+def load_project_overview(filename=OVERVIEW_FILENAME):
+    df = read_excel_cached(filename)
+    return df.set_index("Field")["Value"].to_dict()
+
+
+# --- Data Loading and Processing for Risk Data ---
+def process_risk(df):
+    return conform('risk', df)
+
+
+def load_risk_data(filename=RISK_FILENAME):
+    return process_risk(read_excel_cached(filename))
+
+
+def process_procurement(df):
+    return conform('procurement', df)
+
+
+def load_procurement_data(filename=PROCUREMENT_FILENAME):
+    return process_procurement(read_excel_cached(filename))
+
+
+# Dataset name -> (source workbook, loader)
+DATASETS = {
+    'tasks': (TASKS_FILENAME, load_and_process_data),
+    'project_overview': (OVERVIEW_FILENAME, load_project_overview),
+    'risk': (RISK_FILENAME, load_risk_data),
+    'procurement': (PROCUREMENT_FILENAME, load_procurement_data),
+}
+
+# Datasets that are re-ingested row by row on edits: name -> (primary key
+# columns, row processor).
+INCREMENTAL = {
+    'tasks': (KEYS['tasks'], process_tasks),
+    'procurement': (KEYS['procurement'], process_procurement),
+}
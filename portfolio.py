@@ -0,0 +1,187 @@
+"""Portfolio rollups across several solar sites.
+
+Each site is a directory under ``PORTFOLIO_DIR`` holding its own copies of the
+four workbooks (``projects/<site>/solar_project_data.xlsx`` and so on).  A
+site is reduced to a small set of partial aggregates -- task totals, planned
+value as of today and the procurement buckets -- which are summed into the
+portfolio figures, plus the percentiles of its Monte Carlo forecast.
+
+Partials are kept per site and keyed by the mtime and size of its workbooks,
+so adding or editing one site only re-reads that site.  When several sites
+need reading they are loaded in parallel in a process pool; workers share the
+columnar workbook cache on disk.
+"""
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from aggregates import monthly_procurement_cost, procurement_buckets, task_totals
+from evm import evm_arrays, planned_value_as_of, safe_divide
+from forecast import monte_carlo
+from loaders import (OVERVIEW_FILENAME, PROCUREMENT_FILENAME, RISK_FILENAME, TASKS_FILENAME, load_and_process_data,
+                     load_procurement_data, load_project_overview, load_risk_data)
+from worker_pool import LazyPool
+
+PORTFOLIO_DIR = os.environ.get("SOLAR_PORTFOLIO_DIR", "projects")
+PORTFOLIO_WORKERS = int(os.environ.get("SOLAR_PORTFOLIO_WORKERS", "4"))
+
+SITE_COLUMNS = ['Site', 'Project', 'Tasks', 'Completed', 'BAC', 'PV', 'EV', 'AC', 'SV', 'CV', 'SPI', 'CPI', 'EAC', 'VAC']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def discover_projects(root=PORTFOLIO_DIR):
+    """Returns ``{site: directory}`` for every subdirectory with a task workbook."""
+    if not os.path.isdir(root):
+        return {}
+    projects = {}
+    for entry in sorted(os.scandir(root), key=lambda e: e.name):
+        if entry.is_dir() and os.path.isfile(os.path.join(entry.path, TASKS_FILENAME)):
+            projects[entry.name] = os.path.abspath(entry.path)
+    return projects
+
+
+def _workbooks_key(directory):
+    """(name, mtime_ns, size) of the site's workbooks: a stat per file, no reads."""
+    key = []
+    for filename in (TASKS_FILENAME, OVERVIEW_FILENAME, RISK_FILENAME, PROCUREMENT_FILENAME):
+        path = os.path.join(directory, filename)
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        key.append((filename, stat.st_mtime_ns, stat.st_size))
+    return tuple(key)
+
+
+def project_partials(directory, as_of):
+    """Partial aggregates for one site (runs in a worker process)."""
+    tasks = load_and_process_data(os.path.join(directory, TASKS_FILENAME))
+    overview_path = os.path.join(directory, OVERVIEW_FILENAME)
+    risk_path = os.path.join(directory, RISK_FILENAME)
+    procurement_path = os.path.join(directory, PROCUREMENT_FILENAME)
+    # Run in this worker; only the percentiles go back to the parent.
+    forecast = monte_carlo(tasks, load_risk_data(risk_path) if os.path.isfile(risk_path) else None, as_of, workers=0)
+    return {
+        'overview': load_project_overview(overview_path) if os.path.isfile(overview_path) else {},
+        'totals': task_totals(tasks),
+        'planned_value': float(planned_value_as_of(tasks, as_of).sum()),
+        'procurement': (procurement_buckets(load_procurement_data(procurement_path))
+                        if os.path.isfile(procurement_path) else None),
+        'forecast': {
+            'P50 Completion': forecast.finish_date(50), 'P80 Completion': forecast.finish_date(80),
+            'P50 Cost at Completion': forecast.cost_at(50), 'P80 Cost at Completion': forecast.cost_at(80),
+            'On-time Chance': forecast.on_time_probability(),
+        },
+    }
+
+
+class Portfolio:
+    def __init__(self, root=PORTFOLIO_DIR, workers=PORTFOLIO_WORKERS):
+        self.root = root
+        self.workers = workers
+        self.errors = {}  # site -> message of the last failed load
+        self._partials = {}  # site -> (workbooks key, as_of, partials)
+        self._lock = threading.Lock()
+        self._pool = LazyPool()
+
+    def sites(self):
+        return list(discover_projects(self.root))
+
+    def refresh(self, as_of=None):
+        """Returns ``{site: partials}``, re-reading only sites whose workbooks changed.
+
+        The lock is only held to pick the stale sites and to store results, so
+        other sessions aren't blocked while sites load.  Sessions that refresh
+        concurrently may both load the same stale site.
+        """
+        as_of = pd.Timestamp(as_of if as_of is not None else pd.Timestamp.now().normalize())
+        projects = discover_projects(self.root)
+        keys = {site: _workbooks_key(directory) for site, directory in projects.items()}
+        with self._lock:
+            stale = [site for site in projects
+                     if self._partials.get(site, (None, None))[:2] != (keys[site], as_of)]
+        if len(stale) == 1:
+            # Not worth starting worker processes for one site.
+            results = {stale[0]: self._run(project_partials, projects[stale[0]], as_of)}
+        else:
+            futures = {site: self._pool.get(self.workers).submit(project_partials, projects[site], as_of) for site in stale}
+            results = {site: self._result(future) for site, future in futures.items()}
+        with self._lock:
+            for site, (partials, error) in results.items():
+                if error is None:
+                    self._partials[site] = (keys[site], as_of, partials)
+                    self.errors.pop(site, None)
+                else:
+                    _LOGGER.error("Loading site %r failed: %s", site, error)
+                    self.errors[site] = error
+                    self._partials.pop(site, None)
+            for site in set(self._partials) - set(projects):
+                del self._partials[site]
+            return {site: entry[2] for site, entry in self._partials.items()}
+
+    @staticmethod
+    def _run(function, *args):
+        try:
+            return function(*args), None
+        except Exception as exc:
+            return None, f"{type(exc).__name__}: {exc}"
+
+    @staticmethod
+    def _result(future):
+        try:
+            return future.result(), None
+        except Exception as exc:
+            return None, f"{type(exc).__name__}: {exc}"
+
+
+# --- Rollups ---
+def site_rollup(partials):
+    """One row of EVM and budget figures per site plus a 'Portfolio' total row."""
+    sites = sorted(partials)
+    totals = pd.DataFrame([partials[site]['totals'] for site in sites], index=sites)
+    sums = pd.DataFrame({
+        'Tasks': totals.get('Tasks', pd.Series(dtype=float)),
+        'Completed': totals.get('Completed', pd.Series(dtype=float)),
+        'BAC': totals.get('Budget', pd.Series(dtype=float)),
+        'PV': [partials[site]['planned_value'] for site in sites],
+        'EV': totals.get('Earned Value', pd.Series(dtype=float)),
+        'AC': totals.get('Actual Cost', pd.Series(dtype=float)),
+    }, index=sites)
+    # The portfolio row sums the partials; ratios are recomputed from the sums.
+    sums.loc['Portfolio'] = sums.sum()
+    metrics = evm_arrays(sums['BAC'], sums['AC'], safe_divide(sums['EV'], sums['BAC']) * 100, sums['PV'])
+    for name in ('SV', 'CV', 'SPI', 'CPI', 'EAC', 'VAC'):
+        sums[name] = metrics[name]
+    projects = [partials[site]['overview'].get('Project Name', site) for site in sites] + ['']
+    sums.insert(0, 'Project', np.asarray(projects, dtype=object).astype(str))
+    sums.insert(0, 'Site', sums.index)
+    return sums[SITE_COLUMNS].reset_index(drop=True)
+
+
+def site_forecasts(partials):
+    """P50/P80 completion dates and costs per site.
+
+    Percentiles don't add up across sites, so there is no portfolio row.
+    """
+    sites = sorted(partials)
+    forecasts = pd.DataFrame([partials[site]['forecast'] for site in sites], index=pd.Index(sites, name='Site'))
+    return forecasts.reset_index()
+
+
+def portfolio_procurement(partials):
+    """Monthly procurement cost summed over every site's buckets."""
+    buckets = [p['procurement'] for p in partials.values() if p['procurement'] is not None and not p['procurement'].empty]
+    if not buckets:
+        return pd.DataFrame({'Order Date': pd.Series(dtype='datetime64[ns]'), 'Total Cost': pd.Series(dtype=float)})
+    combined = buckets[0]
+    for other in buckets[1:]:
+        combined = combined.add(other, fill_value=0)
+    return monthly_procurement_cost(combined)
+
+
+# Module-level so every session shares the cached partials and the pool.
+portfolio = Portfolio()
@@ -0,0 +1,51 @@
+"""Portfolio tab: EVM, forecasts and procurement rolled up across sites."""
+import plotly.express as px
+import streamlit as st
+from streamlit_extras.metric_cards import style_metric_cards
+
+from figure_cache import cached_figure
+from portfolio import portfolio, portfolio_procurement, site_forecasts, site_rollup
+
+
+def render(page):
+    st.header("Portfolio Overview")
+
+    # Per-site partial aggregates; only sites whose workbooks changed are re-read
+    site_partials = portfolio.refresh()
+    for site, error in portfolio.errors.items():
+        st.error(f"Site '{site}' could not be loaded: {error}")
+    if site_partials:
+        site_df = site_rollup(site_partials)
+        portfolio_row = site_df.iloc[-1]
+
+        col1, col2, col3 = st.columns(3)
+        col1.metric("Sites", len(site_partials))
+        col2.metric("Total Budget", f"${portfolio_row['BAC']:,.0f}")
+        col3.metric("Portfolio CPI / SPI", f"{portfolio_row['CPI']:.2f} / {portfolio_row['SPI']:.2f}")
+        style_metric_cards()
+
+        st.subheader("EVM by Site")
+        st.dataframe(site_df, hide_index=True, use_container_width=True)
+
+        st.subheader("Completion Forecast by Site")
+        st.dataframe(
+            site_forecasts(site_partials), hide_index=True, use_container_width=True,
+            column_config={'On-time Chance': st.column_config.ProgressColumn("On-time Chance", format="percent")},
+        )
+
+        st.subheader("Budget vs. Actual Cost by Site")
+        fig_sites = cached_figure(
+            'portfolio_sites',
+            lambda: px.bar(site_df.iloc[:-1], x='Site', y=['BAC', 'AC', 'EV'], barmode='group'),
+            site_df,
+        )
+        st.plotly_chart(fig_sites, use_container_width=True)
+
+        st.subheader("Portfolio Procurement Cost Over Time")
+        monthly_cost = portfolio_procurement(site_partials)
+        fig_portfolio_cost = cached_figure(
+            'portfolio_procurement', lambda: px.line(monthly_cost, x='Order Date', y='Total Cost'), monthly_cost,
+        )
+        st.plotly_chart(fig_portfolio_cost, use_container_width=True)
+    else:
+        st.write("No site could be loaded.")
@@ -0,0 +1,226 @@
+"""Procurement analytics over a sorted Order Date index.
+
+A ``ProcurementIndex`` is built once per procurement version and holds:
+
+* PO positions sorted by Order Date, so a date window is two
+  ``searchsorted`` calls, plus a prefix sum of Total Cost in that order so an
+  unfiltered window total is a subtraction;
+* integer codes for Status and supplier;
+* monthly and weekly cost buckets (optionally split by Status or supplier),
+  computed with ``bincount`` on first use and cached.
+
+When POs are only appended to the workbook, the next version's index is
+derived from this one by merging the new rows into the sorted order and
+adding them to the cached buckets, instead of being rebuilt.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from schema import day_number, day_numbers
+
+# Bucket frequencies, labelled like pd.Grouper: month end and week ending Sunday.
+PERIODS = {'M': 'Monthly', 'W': 'Weekly'}
+# Breakdown dimension -> source column.
+BREAKDOWNS = {'Status': 'Status', 'Supplier': 'Vendor/Supplier Name'}
+
+
+def _period_ids(days, freq):
+    if freq == 'W':
+        # 1970-01-01 was a Thursday; weeks run Monday to Sunday.
+        return (days + 3) // 7
+    return days.astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def _period_labels(ids, freq):
+    if freq == 'W':
+        return pd.to_datetime((ids * 7 + 3).astype('datetime64[D]'))
+    month_end = (ids + 1).astype('datetime64[M]').astype('datetime64[D]') - np.timedelta64(1, 'D')
+    return pd.to_datetime(month_end)
+
+
+def _extend_codes(labels, values):
+    """Codes of ``values`` against ``labels``, appending unseen labels."""
+    codes, uniques = pd.factorize(values)
+    labels = list(labels)
+    lookup = {label: code for code, label in enumerate(labels)}
+    mapping = np.empty(len(uniques), dtype=np.int64)
+    for i, label in enumerate(uniques):
+        if label not in lookup:
+            lookup[label] = len(labels)
+            labels.append(label)
+        mapping[i] = lookup[label]
+    return np.where(codes >= 0, mapping[codes] if len(mapping) else codes, -1), labels
+
+
+class ProcurementIndex:
+    def __init__(self, df):
+        self.size = len(df)
+        days, valid = day_numbers(df['Order Date'])
+        self.days = days
+        self.cost = np.nan_to_num(pd.to_numeric(df['Total Cost'], errors='coerce').to_numpy(dtype=np.float64))
+        self.codes = {}
+        self.labels = {}
+        for name, column in BREAKDOWNS.items():
+            self.codes[name], self.labels[name] = _extend_codes([], df[column].to_numpy())
+
+        # POs without an Order Date never fall in a date window.
+        dated = np.flatnonzero(valid)
+        self.order = dated[np.argsort(days[dated], kind='stable')]
+        self._finish_order()
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def _finish_order(self):
+        self.sorted_days = self.days[self.order]
+        self._cost_prefix = np.concatenate([[0.0], np.cumsum(self.cost[self.order])])
+
+    # --- Queries ---
+    def _window(self, start=None, end=None):
+        lo = 0 if start is None else np.searchsorted(self.sorted_days, day_number(start), side='left')
+        hi = len(self.order) if end is None else np.searchsorted(self.sorted_days, day_number(end), side='right')
+        return lo, hi
+
+    def rows(self, start=None, end=None, statuses=None, suppliers=None):
+        """Positions of POs ordered in ``[start, end]`` with the given Status/supplier, by date.
+
+        Without a date window, POs lacking an Order Date are included at the end.
+        """
+        if start is None and end is None:
+            undated = np.setdiff1d(np.arange(self.size), self.order, assume_unique=True)
+            rows = np.concatenate([self.order, undated])
+        else:
+            lo, hi = self._window(start, end)
+            rows = self.order[lo:hi]
+        for name, wanted in (('Status', statuses), ('Supplier', suppliers)):
+            if wanted is not None:
+                rows = rows[self._code_mask(name, wanted)[self.codes[name][rows]]]
+        return rows
+
+    def _code_mask(self, name, wanted):
+        # Last slot is for missing values (code -1).
+        mask = np.zeros(len(self.labels[name]) + 1, dtype=bool)
+        lookup = {label: code for code, label in enumerate(self.labels[name])}
+        for label in wanted:
+            if label in lookup:
+                mask[lookup[label]] = True
+        return mask
+
+    def total_cost(self, start=None, end=None):
+        """Total Cost of POs ordered in ``[start, end]``."""
+        lo, hi = self._window(start, end)
+        return float(self._cost_prefix[hi] - self._cost_prefix[lo])
+
+    def counts(self, name='Status', rows=None):
+        """PO count per Status (or supplier), optionally over ``rows`` only."""
+        codes = self.codes[name] if rows is None else self.codes[name][rows]
+        counts = np.bincount(codes[codes >= 0], minlength=len(self.labels[name]))
+        return pd.Series(counts, index=pd.Index(self.labels[name], name=BREAKDOWNS[name]), name='count')
+
+    # --- Buckets ---
+    def buckets(self, freq='M', by=None):
+        """Total Cost per period (rows, zero-filled) and ``by`` value (columns)."""
+        key = (freq, by)
+        with self._lock:
+            cached = self._buckets.get(key)
+        if cached is None:
+            cached = self._build_buckets(self.order, freq, by)
+            with self._lock:
+                self._buckets[key] = cached
+        return cached
+
+    def _build_buckets(self, rows, freq, by):
+        columns = ['Total Cost'] if by is None else list(self.labels[by])
+        if rows.size == 0:
+            return pd.DataFrame(columns=columns, dtype=float, index=pd.DatetimeIndex([], name='Order Date'))
+        periods = _period_ids(self.days[rows], freq)
+        first = periods.min()
+        span = periods.max() - first + 1
+        if by is None:
+            codes = np.zeros(rows.size, dtype=np.int64)
+        else:
+            codes = self.codes[by][rows]
+            # Missing Status/supplier still counts towards the period.
+            codes = np.where(codes >= 0, codes, len(columns))
+            columns = columns + ['(missing)']
+        sums = np.bincount((periods - first) * len(columns) + codes, weights=self.cost[rows],
+                           minlength=span * len(columns))
+        frame = pd.DataFrame(sums.reshape(span, len(columns)), columns=columns,
+                             index=_period_labels(np.arange(first, first + span), freq))
+        if '(missing)' in frame and not frame['(missing)'].any():
+            frame = frame.drop(columns='(missing)')
+        frame.index.name = 'Order Date'
+        return frame
+
+    def cost_over_time(self, freq='M', by=None, start=None, end=None):
+        """Long frame (Order Date[, by], Total Cost) for a line chart, limited to a date window."""
+        frame = self.buckets(freq, by)
+        if start is not None or end is not None:
+            labels = frame.index.to_numpy()
+            # Buckets are labelled by period end: keep periods overlapping the window.
+            lo = 0 if start is None else np.searchsorted(labels, np.datetime64(pd.Timestamp(start)), side='left')
+            if end is None:
+                hi = len(labels)
+            else:
+                end = pd.Timestamp(end)
+                last_label = end + pd.offsets.MonthEnd(0) if freq == 'M' else end + pd.Timedelta(days=6)
+                hi = np.searchsorted(labels, np.datetime64(last_label), side='right')
+            frame = frame.iloc[lo:hi]
+        if by is None:
+            return frame.reset_index()
+        return frame.reset_index().melt(id_vars='Order Date', var_name=by, value_name='Total Cost')
+
+    # --- Incremental ---
+    def appended(self, new_rows):
+        """Index for this data plus ``new_rows`` appended after the last PO."""
+        index = ProcurementIndex.__new__(ProcurementIndex)
+        new_days, new_valid = day_numbers(new_rows['Order Date'])
+        new_cost = np.nan_to_num(pd.to_numeric(new_rows['Total Cost'], errors='coerce').to_numpy(dtype=np.float64))
+        index.size = self.size + len(new_rows)
+        index.days = np.concatenate([self.days, new_days])
+        index.cost = np.concatenate([self.cost, new_cost])
+        index.codes, index.labels = {}, {}
+        for name, column in BREAKDOWNS.items():
+            codes, index.labels[name] = _extend_codes(self.labels[name], new_rows[column].to_numpy())
+            index.codes[name] = np.concatenate([self.codes[name], codes])
+
+        # Merge the new dated rows into the sorted order.
+        added = self.size + np.flatnonzero(new_valid)
+        added = added[np.argsort(index.days[added], kind='stable')]
+        positions = np.searchsorted(self.sorted_days, index.days[added], side='right')
+        index.order = np.insert(self.order, positions, added)
+        index._finish_order()
+
+        # Add the new rows to every bucket frame built so far.
+        index._buckets = {}
+        index._lock = threading.Lock()
+        with self._lock:
+            cached = dict(self._buckets)
+        for (freq, by), frame in cached.items():
+            extra = index._build_buckets(added, freq, by)
+            # A label new to both frames' periods is missing on both sides: zero, not NaN.
+            merged = frame.add(extra, fill_value=0).fillna(0)
+            if not merged.empty:
+                full = _period_labels(np.arange(*_period_range(merged.index, freq)), freq)
+                merged = merged.reindex(full, fill_value=0)
+                merged.index.name = 'Order Date'
+            # ``add`` sorts the columns; restore label order.
+            columns = ['Total Cost'] if by is None else list(index.labels[by]) + ['(missing)']
+            index._buckets[(freq, by)] = merged[[c for c in columns if c in merged.columns]]
+        return index
+
+
+def _period_range(labels, freq):
+    ids = _period_ids(labels.to_numpy().astype('datetime64[D]').astype(np.int64), freq)
+    return ids.min(), ids.max() + 1
+
+
+def update_procurement_index(index, delta):
+    """Carries the index forward when POs were only appended; otherwise None (rebuild)."""
+    inserted = delta.inserted
+    if len(delta.deleted) or len(delta.updated_new) or delta.reordered:
+        return None
+    if not np.array_equal(inserted.index.to_numpy(), np.arange(index.size, index.size + len(inserted))):
+        return None
+    return index.appended(inserted)
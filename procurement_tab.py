@@ -0,0 +1,95 @@
+"""Procurement Tracking tab: purchase orders, cost KPIs and cost over time."""
+import plotly.express as px
+import streamlit as st
+
+from dashboard import get_snapshot, kpi_card
+from figure_cache import cached_figure
+from procurement import BREAKDOWNS, PERIODS, ProcurementIndex
+from schema import money_sum
+from task_list import render_task_list
+
+
+def render(page):
+    st.header("Procurement Dashboard")
+
+    # Load and display data
+    procurement_snapshot = get_snapshot('procurement')
+    procurement_df = procurement_snapshot.data
+    # Sorted Order Date index with cost buckets; carried forward when POs are appended.
+    # The KPIs, table and charts all come from it.
+    procurement_index = procurement_snapshot.derived('procurement_index', ProcurementIndex)
+
+    # Purchase orders, filtered through the index and sent one page at a time
+    st.subheader("All Purchase Orders")
+    po_filters = st.columns(3)
+    order_dates = procurement_df['Order Date'].dropna()
+    with po_filters[0]:
+        po_dates = st.date_input(
+            "Order Date Range",
+            value=(order_dates.min().date(), order_dates.max().date()) if not order_dates.empty else (),
+            key='po_dates',
+        )
+    with po_filters[1]:
+        po_statuses = st.multiselect("Status", procurement_index.labels['Status'], key='po_statuses')
+    with po_filters[2]:
+        po_suppliers = st.multiselect("Supplier", procurement_index.labels['Supplier'], key='po_suppliers')
+    # Only a complete range narrows the table; while picking, show everything
+    po_start, po_end = po_dates if len(po_dates) == 2 else (None, None)
+    po_rows = procurement_index.rows(po_start, po_end, po_statuses or None, po_suppliers or None)
+    render_task_list(
+        procurement_df.iloc[po_rows],
+        key='po_list',
+        columns=list(procurement_df.columns),
+        sort_options={
+            'Order date': ('Order Date', True),
+            'Newest first': ('Order Date', False),
+            'Total cost': ('Total Cost', False),
+            'PO number': ('PO Number', True),
+            'Status': ('Status', True),
+        },
+        column_config={
+            'Order Date': st.column_config.DateColumn("Order Date"),
+            'Delivery Date': st.column_config.DateColumn("Delivery Date"),
+        },
+        jump_column='PO Number',
+        item='PO',
+        items='POs',
+    )
+
+    # --- KPI cards for metrics ---
+    col1, col2, col3 = st.columns(3)
+
+    # Every PO, with or without an Order Date
+    po_count = procurement_index.size
+    total_cost = money_sum(procurement_index.cost)
+    with col1:
+        kpi_card(f'Total POs: {po_count}')
+    with col2:
+        kpi_card(f'Total Cost: ${total_cost:.2f}')
+    with col3:
+        kpi_card(f'Average Cost/PO: ${total_cost / po_count if po_count else 0:.2f}')
+
+    # Total Cost over time graph, from the precomputed buckets
+    st.subheader("Total Cost Over Time")
+    trend_controls = st.columns(2)
+    with trend_controls[0]:
+        cost_freq = st.radio("Resolution", list(PERIODS), format_func=PERIODS.get, horizontal=True, key='po_freq')
+    with trend_controls[1]:
+        cost_by = st.selectbox("Break down by", [None] + list(BREAKDOWNS), format_func=lambda b: b or "Total", key='po_by')
+
+    def build_cost_over_time():
+        cost_over_time_data = procurement_index.cost_over_time(cost_freq, cost_by, po_start, po_end)
+        return px.line(cost_over_time_data, x='Order Date', y='Total Cost', color=cost_by)
+    fig_cost_over_time = cached_figure(
+        'procurement_cost_over_time', build_cost_over_time, procurement_snapshot, cost_freq, cost_by, po_start, po_end,
+    )
+    st.plotly_chart(fig_cost_over_time, use_container_width=True)
+
+    # PO status
+    st.subheader('PO Status')
+    def build_po_status():
+        status_counts = procurement_index.counts('Status')
+        status_counts = status_counts[status_counts > 0]
+        return px.pie(status_counts, values=status_counts.values, names=status_counts.index)
+    fig_status = cached_figure('po_status', build_po_status, procurement_snapshot)
+    st.plotly_chart(fig_status)
@@ -0,0 +1,105 @@
+"""Progress Overview tab: KPIs, the timeline, the critical path and task progress."""
+import pandas as pd
+import streamlit as st
+from streamlit_extras.metric_cards import style_metric_cards
+
+from dashboard import kpi_card
+from figure_cache import cached_figure
+from schedule import STATUS_COLORS, task_schedule
+from task_list import render_task_list, task_statuses
+from timeline import build_timeline_figure, category_colors
+
+
+def render(page):
+    df, filtered_df, tasks_snapshot = page.df, page.filtered_df, page.tasks_snapshot
+    filter_state, filter_index = page.filter_state, page.filter_index
+
+    # --- Progress Tracking ---
+    st.subheader("Project Progress")
+
+    # --- KPI cards for metrics ---
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        kpi_card(f'Total Tasks: {len(df)}  <span style="font-size:smaller;">({len(filtered_df)} filtered)</span>')
+    with col2:
+        kpi_card(f'Tasks Completed: {int(page.task_totals["Completed"])}')
+    with col3:
+        if not filtered_df.empty:
+            overall_progress = filtered_df['Percent Complete'].mean() / 100
+            kpi_card(f'Overall Progress: {overall_progress * 100:.1f}%')
+        else:
+            kpi_card('Overall Progress: No data available')
+    style_metric_cards()
+
+    # Gantt Chart with Task Progress
+    st.subheader("Project Timeline")
+    # Large schedules are aggregated server-side; pick a category to drill down.
+    timeline_colors = category_colors(filter_index.categories)
+    gantt_categories = list(filtered_df['Category'].unique())
+    zoom_category = st.selectbox("Drill down to category", ["All categories"] + gantt_categories, key='gantt_zoom')
+    gantt_df = filtered_df if zoom_category == "All categories" else filtered_df[filtered_df['Category'] == zoom_category]
+    # Critical path over the whole project as of today; critical and at-risk
+    # tasks are outlined when the timeline shows one bar per task.
+    schedule = task_schedule(tasks_snapshot, pd.Timestamp.now())
+    schedule_status = pd.Series(schedule.labels(), index=df.index)
+    outline = {status: STATUS_COLORS[status] for status in ("Critical", "At risk")}
+    fig_gantt = cached_figure(
+        'gantt',
+        lambda: build_timeline_figure(gantt_df, color_map=timeline_colors,
+                                      highlight=schedule_status.loc[gantt_df.index].map(outline)),
+        tasks_snapshot, filter_state, zoom_category, schedule.as_of,
+    )
+    st.plotly_chart(fig_gantt, use_container_width=True, key='gantt_chart')
+    st.caption("Outlined bars: critical (red) and at-risk (orange) tasks.")
+
+    # Critical path and forecast slip
+    st.subheader("Critical Path")
+    col1, col2, col3 = st.columns(3)
+    planned_finish, forecast_finish = schedule.planned_finish(), schedule.forecast_finish()
+    col1.metric("Planned Finish", planned_finish.strftime('%Y-%m-%d') if planned_finish is not None else "n/a")
+    if forecast_finish is not None:
+        col2.metric("Forecast Finish", forecast_finish.strftime('%Y-%m-%d'),
+                    delta=f"{(forecast_finish - planned_finish).days} days", delta_color="inverse")
+    col3.metric("Critical Tasks", int((schedule_status == "Critical").sum()),
+                delta=f"{int((schedule_status == 'At risk').sum())} at risk", delta_color="off")
+    if schedule.graph.cyclic.size:
+        st.warning(f"{schedule.graph.cyclic.size} task(s) are in or after a dependency cycle and were scheduled without their predecessors.")
+    if schedule.problems:
+        st.warning(f"{len(schedule.problems)} predecessor reference(s) could not be resolved, e.g. "
+                   + ", ".join(f"'{token}' (row {row + 1})" for row, token in schedule.problems[:5]))
+    schedule_df = schedule.frame(df).loc[filtered_df.index]
+    render_task_list(
+        schedule_df[schedule_df['Schedule'].isin(["Critical", "At risk"])],
+        key='critical_list',
+        columns=['Task', 'Category', 'Schedule', 'Forecast Finish', 'Total Float (days)', 'Slip (days)'],
+        sort_options={
+            'Forecast start': ('Forecast Start', True),
+            'Least float': ('Total Float (days)', True),
+            'Most slip': ('Slip (days)', False),
+        },
+        column_config={'Forecast Finish': st.column_config.DateColumn("Forecast Finish")},
+    )
+
+    # Individual Task Progress Bars with Percentages and Alerts (one page at a time)
+    st.subheader("Task Progress")
+    filtered_status = task_statuses(tasks_snapshot).loc[filtered_df.index]
+    overdue_count = int(filtered_status['Overdue'].sum())
+    if overdue_count:
+        st.warning(f"⚠️ {overdue_count} task(s) are overdue and not complete!")
+    render_task_list(
+        filtered_df.assign(Status=filtered_status['Status']),
+        key='progress_list',
+        columns=['Task', 'Percent Complete', 'Status', 'End Date'],
+        sort_options={
+            'Schedule order': ('Start Date', True),
+            'End date': ('End Date', True),
+            'Least complete': ('Percent Complete', True),
+            'Most complete': ('Percent Complete', False),
+            'Status': ('Status', True),
+        },
+        column_config={
+            'Percent Complete': st.column_config.ProgressColumn("Progress", format="%.1f%%", min_value=0, max_value=100),
+            'End Date': st.column_config.DateColumn("End Date"),
+        },
+    )
@@ -0,0 +1,331 @@
+"""PDF report generation.
+
+Everything here takes its data as arguments and has no Streamlit dependency,
+so reports can be built in worker processes or from the command line.
+
+The HTML is written section by section into one file, next to the chart PNGs
+it references, and wkhtmltopdf reads it from disk.  Table and alert markup is
+built column-wise, so no stage holds more than one copy of the document.
+"""
+import datetime
+import os
+import tempfile
+
+import pandas as pd
+import plotly.express as px
+
+from evm import METRIC_LABELS, planned_value_as_of, project_evm
+from forecast import build_forecast_figures, format_or_na
+from instrumentation import span
+from procurement import ProcurementIndex
+from report_render import render_figures
+from schema import money_sum
+from task_status import (COST_ALERT_CLASSES, PROGRESS_ALERT_CLASSES, PROGRESS_LABELS, BUDGET_CONSUMED,
+                         OVER_BUDGET, cost_status, progress_status)
+from timeline import build_timeline_figure, category_colors
+
+# The PDF page fits fewer bars than the dashboard.
+REPORT_GANTT_BARS = 150
+
+REPORT_CSS = """
+    body { font-family: sans-serif; color: #333; }
+    h1, h2 { color: #007bff; } /* Blue headings */
+    table { border-collapse: collapse; width: 100%; }
+    th, td { border: 1px solid #ccc; padding: 8px; text-align: left; }
+    th { background-color: #f0f0f0; }
+    .alert { padding: 10px; margin-bottom: 10px; border-radius: 5px; }
+    .alert-warning { background-color: #fff3cd; border-color: #ffeeba; color: #856404; }
+    .alert-danger { background-color: #f8d7da; border-color: #f5c6cb; color: #721c24; }
+    .alert-success { background-color: #d4edda; border-color: #c3e6cb; color: #155724; }
+"""
+
+PDF_OPTIONS = {
+    'page-size': 'Letter',
+    'margin-top': '0.75in',
+    'margin-right': '0.75in',
+    'margin-bottom': '0.75in',
+    'margin-left': '0.75in',
+    'encoding': "UTF-8",
+    'no-outline': None,
+    # Chart images are local files next to the HTML.
+    'enable-local-file-access': None,
+}
+
+
+def _no_progress(stage, fraction):
+    pass
+
+
+def escape_html(values):
+    """Vectorized ``html.escape`` for a Series of text."""
+    return (values.astype(str)
+            .str.replace('&', '&amp;', regex=False)
+            .str.replace('<', '&lt;', regex=False)
+            .str.replace('>', '&gt;', regex=False)
+            .str.replace('"', '&quot;', regex=False)
+            .str.replace("'", '&#x27;', regex=False))
+
+
+def _image_html(path):
+    return f'<div style="display: flex; justify-content: center; align-items: center;"><img style="width: 80%;" src="{path}" /></div>\n'
+
+
+def _procurement_figures(procurement_df):
+    # Cost Over Time Chart (Procurement) with color scheme and size control
+    procurement_index = ProcurementIndex(procurement_df)
+    cost_over_time_data = procurement_index.cost_over_time('M')
+    fig_cost_over_time = px.line(cost_over_time_data, x='Order Date', y='Total Cost', title='Procurement Cost Over Time', color_discrete_sequence=px.colors.qualitative.Plotly)
+    fig_cost_over_time.update_layout(
+        width=1200,
+        height=800,
+        xaxis_title='Order Date',
+        yaxis_title='Total Cost'
+    )
+
+    # PO Status Chart (Procurement) with color scheme and size control
+    status_counts = procurement_index.counts('Status')
+    status_counts = status_counts[status_counts > 0]
+    fig_status = px.pie(status_counts, values=status_counts.values, names=status_counts.index, title='PO Status', color_discrete_sequence=px.colors.qualitative.Plotly)
+    fig_status.update_layout(
+        width=1200,
+        height=800
+    )
+    return fig_cost_over_time, fig_status
+
+
+def _evm_metrics_html(filtered_df):
+    project_metrics = project_evm(filtered_df, planned_value_as_of(filtered_df, datetime.datetime.now()))
+    evm_rows = "".join(
+        f"<tr><td>{METRIC_LABELS[name]}</td><td>{project_metrics[name]:.2f}{' $' if name not in ('SPI', 'CPI', 'TCPI') else ''}</td></tr>"
+        for name in ['SV', 'CV', 'SPI', 'CPI', 'EAC', 'ETC', 'VAC', 'TCPI']
+    )
+    return f"""
+    <h2>Earned Value Management (EVM) Metrics</h2>
+    <table style="width:50%">
+        <tr><th>Metric</th><th>Value</th></tr>
+        {evm_rows}
+    </table>
+    """
+
+
+def _forecast_html(forecast):
+    summary = forecast.summary()
+    rows = "".join(
+        f"<tr><td>{name}</td><td>{row['Completion Date']:%Y-%m-%d}</td><td>${row['Cost at Completion']:,.2f}</td></tr>"
+        for name, row in summary.iterrows()
+    )
+    return f"""
+    <h2>Completion Forecast</h2>
+    <p>{forecast.iterations:,} Monte Carlo runs as of {forecast.as_of:%Y-%m-%d}.
+       Chance of finishing by the planned {format_or_na(forecast.planned_finish, '%Y-%m-%d')}:
+       {format_or_na(forecast.on_time_probability(), '.0%')};
+       within the ${forecast.budget:,.2f} budget: {format_or_na(forecast.within_budget_probability(), '.0%')}.</p>
+    <table style="width:50%">
+        <tr><th>Percentile</th><th>Completion Date</th><th>Cost at Completion</th></tr>
+        {rows}
+    </table>
+    """
+
+
+# --- Report Generation ---
+def generate_pdf_report(filtered_df, tasks_df, procurement_df, forecast=None, progress=_no_progress):
+    """Generates a PDF report from the filtered DataFrame.
+
+    ``tasks_df`` is the unfiltered task data used for the key metrics;
+    ``forecast`` is an optional ``forecast.Forecast`` for the whole project.
+    ``progress(stage, fraction)`` is called as each stage starts.
+    """
+    import pdfkit
+
+    with tempfile.TemporaryDirectory(prefix="report-") as workdir:
+        html_path = os.path.join(workdir, "report.html")
+        with span('report.html', rows=len(filtered_df)):
+            write_report_html(html_path, filtered_df, tasks_df, procurement_df, progress, forecast)
+        progress("Writing PDF", 0.7)
+        with span('report.pdf'):
+            pdf = pdfkit.from_file(html_path, False, options=PDF_OPTIONS)
+    progress("Done", 1.0)
+    return pdf
+
+
+def report_figures(filtered_df, procurement_df, forecast=None):
+    """``{name: figure}`` for every chart in the report."""
+    fig_cost_over_time, fig_status = _procurement_figures(procurement_df)
+    figures = {
+        'gantt': create_gantt_chart(filtered_df),
+        'cost_comparison': create_cost_comparison_chart(filtered_df),
+        'budget_allocation': create_budget_allocation_chart(filtered_df),
+        'cost_over_time': fig_cost_over_time,
+        'po_status': fig_status,
+    }
+    if forecast is not None:
+        figures['forecast_finish'], figures['forecast_cost'] = create_forecast_charts(forecast)
+    return figures
+
+
+def write_report_html(html_path, filtered_df, tasks_df, procurement_df, progress=_no_progress, forecast=None):
+    """Streams the report HTML to ``html_path``; chart PNGs go in the same directory."""
+    progress("Rendering charts", 0.1)
+    figures = report_figures(filtered_df, procurement_df, forecast)
+    # Rasterize every report figure concurrently; figures whose spec and data
+    # are unchanged since an earlier report come straight from the PNG cache.
+    with span('report.render_figures', rows=len(figures)):
+        images = render_figures(figures)
+    workdir = os.path.dirname(os.path.abspath(html_path))
+    image_paths = {}
+    for name, data in images.items():
+        image_paths[name] = os.path.join(workdir, name + ".png")
+        with open(image_paths[name], "wb") as f:
+            f.write(data)
+    del images
+
+    progress("Assembling HTML", 0.5)
+    with open(html_path, "w", encoding="utf-8") as out:
+        out.write(f"""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>Project Report - {datetime.datetime.now().strftime('%Y-%m-%d')}</title>
+    <style>{REPORT_CSS}</style>
+</head>
+<body>
+    <h1>Project Report - NEOM Bay Airport</h1>
+    <h2>Key Metrics</h2>
+    <p><b>Total Tasks:</b> {len(tasks_df)}</p>
+    <p><b>Tasks Completed:</b> {tasks_df['Percent Complete'].value_counts().get(100, 0)}</p>
+
+    <h2>Financial Details</h2>
+""")
+        filtered_df[['Task', 'Budget', 'Actual Cost', 'Cost Variance']].to_html(
+            buf=out, index=False, float_format='{:,.2f}'.format)
+        out.write(_evm_metrics_html(filtered_df))
+
+        if forecast is not None:
+            out.write(_forecast_html(forecast))
+            out.write(_image_html(image_paths['forecast_finish']))
+            out.write(_image_html(image_paths['forecast_cost']))
+
+        out.write("<h2>Gantt Chart</h2>\n")
+        out.write(_image_html(image_paths['gantt']))
+
+        out.write("<h2>Task Progress</h2>\n")
+        out.write("<table><thead><tr><th>Task</th><th>Progress</th><th>Status</th></tr></thead><tbody>\n")
+        out.writelines(task_progress_rows(filtered_df))
+        out.write("</tbody></table>\n")
+
+        out.write("<h2>Cost Comparison Chart</h2>\n")
+        out.write(_image_html(image_paths['cost_comparison']))
+        out.write("<h2>Budget Allocation Chart</h2>\n")
+        out.write(_image_html(image_paths['budget_allocation']))
+
+        # Procurement Summary Section
+        out.write(f"""<h2>Procurement Summary</h2>
+    <p><b>Total Purchase Orders:</b> {len(procurement_df)}</p>
+    <p><b>Total Procurement Cost:</b> ${money_sum(procurement_df['Total Cost']):,.2f}</p>
+    <h3>Purchase Orders</h3>
+""")
+        procurement_df.to_html(buf=out, index=False, classes='procurement-table')
+        out.write(_image_html(image_paths['cost_over_time']))
+        out.write(_image_html(image_paths['po_status']))
+
+        out.write("<h2>Cost Variance Alerts</h2>\n")
+        out.writelines(cost_variance_alert_rows(filtered_df))
+        out.write("</body>\n</html>\n")
+
+
+def task_progress_rows(df, now=None):
+    """One ``<tr>`` per task, built column-wise."""
+    status = progress_status(df, now)
+    percent = pd.to_numeric(df['Percent Complete'], errors='coerce').fillna(0).astype(float).round(1).astype(str)
+    rows = (
+        '<tr><td>' + escape_html(df['Task']) + '</td><td>'
+        '<div style="background-color: #eee; border-radius: 5px;">'
+        '<div style="background-color: #4CAF50; width: ' + percent + '%; height: 20px; border-radius: 5px;"></div>'
+        '</div><span>' + percent + '%</span></td>'
+        '<td><div class="alert ' + PROGRESS_ALERT_CLASSES[status] + '">' + PROGRESS_LABELS[status] + '</div></td></tr>\n'
+    )
+    return rows.tolist()
+
+
+def generate_task_progress_table(df):
+    return "".join(task_progress_rows(df))
+
+
+def create_gantt_chart(df):
+    # Define a color map for each unique category
+    color_map = category_colors(df['Category'].unique())
+
+    # Create the Gantt chart; large schedules are aggregated to fit the page
+    fig = build_timeline_figure(df, bar_budget=REPORT_GANTT_BARS, color_map=color_map)
+
+    # Update layout and traces for styling
+    fig.update_layout(
+        plot_bgcolor="white",
+        paper_bgcolor="white"
+    )
+    fig.update_traces(marker=dict(line=dict(width=2, color='DarkSlateGrey')))
+
+    fig.update_layout(
+        width=1500,  # Adjust the width as needed
+        height=1000  # Adjust the height as needed
+    )
+
+    return fig
+
+
+def create_forecast_charts(forecast):
+    figures = build_forecast_figures(forecast)
+    for fig in figures:
+        fig.update_layout(plot_bgcolor="white", paper_bgcolor="white", width=1200, height=600)
+    return figures
+
+
+def cost_variance_alert_rows(df):
+    """One alert ``<div>`` per task, built column-wise."""
+    status = cost_status(df)
+    names = escape_html(df['Task'])
+    variance = df['Cost Variance']
+    saved = variance.map('{:,.2f}'.format)
+    exceeded = (-variance).map('{:,.2f}'.format)
+    messages = pd.Series(
+        '✅ Task "' + names + '" has saved $' + saved + ' of its budget.',
+        index=df.index,
+    )
+    messages[status == OVER_BUDGET] = ('🚨 Task "' + names + '" has exceeded its budget by $' + exceeded + '.')[status == OVER_BUDGET]
+    messages[status == BUDGET_CONSUMED] = ('⚠️ Task "' + names + '" has consumed its entire budget.')[status == BUDGET_CONSUMED]
+    return ('<div class="alert ' + COST_ALERT_CLASSES[status] + '">' + messages + '</div>\n').tolist()
+
+
+def generate_cost_variance_alerts(df):
+    return "".join(cost_variance_alert_rows(df))
+
+
+# Function to create the cost comparison bar chart
+def create_cost_comparison_chart(df):
+    cost_df = df.melt(id_vars='Task', value_vars=['Budget', 'Actual Cost'])
+    fig = px.bar(cost_df, x='Task', y='value', color='variable', barmode='group', title='Cost Comparison',
+                 color_discrete_sequence=px.colors.qualitative.Plotly)  # Add color sequence
+    fig.update_layout(
+        plot_bgcolor="white",
+        paper_bgcolor="white"
+    )
+    fig.update_layout(
+        width=1500,  # Adjust the width as needed
+        height=800  # Adjust the height as needed
+    )
+    return fig
+
+
+# Function to create the budget allocation pie chart
+def create_budget_allocation_chart(df):
+    fig = px.pie(df, values='Budget', names='Category', title='Budget Allocation',
+                 color_discrete_sequence=px.colors.qualitative.Plotly)  # Add color sequence
+    fig.update_layout(
+        plot_bgcolor="white",
+        paper_bgcolor="white"
+    )
+    fig.update_layout(
+        width=1500,  # Adjust the width as needed
+        height=800  # Adjust the height as needed
+    )
+    return fig
@@ -0,0 +1,177 @@
+"""Background PDF report jobs.
+
+Reports are generated in a small process pool so that Kaleido and
+wkhtmltopdf never block a session's script thread.  Jobs are keyed by the
+filter state, dataset versions and as-of date they were built from:
+
+* submitting a key that is already running returns the running job;
+* finished PDFs stay in a size-bounded LRU store, so a repeat download of
+  the same report is served without regenerating it.
+
+Workers report progress through a queue that a listener thread drains into
+the job objects the UI polls.
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from worker_pool import SPAWN, spawn_pool
+
+REPORT_WORKERS = int(os.environ.get("SOLAR_REPORT_WORKERS", "2"))
+REPORT_STORE_MAX_BYTES = int(os.environ.get("SOLAR_REPORT_STORE_MB", "200")) * 1024 * 1024
+
+
+def report_job_key(filters, dataset_versions, as_of):
+    """Stable key for a report built from ``filters`` over ``dataset_versions`` as of the date ``as_of``.
+
+    Planned value and the forecast depend on the as-of date, so a report from
+    an earlier day is not reused.
+    """
+    payload = json.dumps({"filters": filters, "versions": dataset_versions, "as_of": as_of},
+                         sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+# --- Worker side ---
+_progress_queue = None
+
+
+def _init_worker(progress_queue):
+    global _progress_queue
+    _progress_queue = progress_queue
+
+
+def _run_report(key, filtered_df, tasks_df, procurement_df, risk_df=None, as_of=None):
+    from forecast import monte_carlo
+    from report import generate_pdf_report
+
+    def progress(stage, fraction):
+        _progress_queue.put((key, stage, fraction))
+
+    forecast = None
+    if as_of is not None:
+        progress("Forecasting", 0.0)
+        # In-process: the report pool already runs reports side by side.
+        forecast = monte_carlo(tasks_df, risk_df, as_of, workers=0)
+    return generate_pdf_report(filtered_df, tasks_df, procurement_df, forecast, progress=progress)
+
+
+# --- Parent side ---
+class ReportJob:
+    def __init__(self, key):
+        self.key = key
+        self.stage = "Queued"
+        self.progress = 0.0
+        self.submitted_at = time.time()
+        self.future = None
+        # Set once the PDF has been stored (it may be evicted since) or the job failed.
+        self.settled = False
+
+    @property
+    def done(self):
+        return self.future is not None and self.future.done()
+
+    @property
+    def error(self):
+        return self.future.exception() if self.done else None
+
+
+class PdfStore:
+    """LRU store of finished PDFs, evicting the least recently used past ``max_bytes``."""
+
+    def __init__(self, max_bytes=REPORT_STORE_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key):
+        with self._lock:
+            pdf = self._items.get(key)
+            if pdf is not None:
+                self._items.move_to_end(key)
+            return pdf
+
+    def put(self, key, pdf):
+        with self._lock:
+            if key in self._items:
+                self.nbytes -= len(self._items.pop(key))
+            self._items[key] = pdf
+            self.nbytes += len(pdf)
+            while self.nbytes > self.max_bytes and len(self._items) > 1:
+                _, evicted = self._items.popitem(last=False)
+                self.nbytes -= len(evicted)
+
+
+class ReportJobs:
+    def __init__(self, workers=REPORT_WORKERS, max_bytes=REPORT_STORE_MAX_BYTES):
+        self.workers = workers
+        self.store = PdfStore(max_bytes)
+        self._jobs = {}
+        # Reentrant: a done-callback can fire inside submit() on the same thread.
+        self._lock = threading.RLock()
+        self._executor = None
+
+    def _start(self):
+        queue = SPAWN.Queue()
+        self._executor = spawn_pool(self.workers, initializer=_init_worker, initargs=(queue,))
+        threading.Thread(target=self._drain_progress, args=(queue,), name="report-progress", daemon=True).start()
+
+    def _drain_progress(self, queue):
+        while True:
+            key, stage, fraction = queue.get()
+            job = self._jobs.get(key)
+            if job is not None and not job.done:
+                job.stage, job.progress = stage, fraction
+
+    def get(self, key):
+        """Returns the in-flight or finished job for ``key``, or None."""
+        return self._jobs.get(key)
+
+    def result(self, key):
+        """Returns the finished PDF for ``key``, or None."""
+        return self.store.get(key)
+
+    def submit(self, key, filtered_df, tasks_df, procurement_df, risk_df=None, as_of=None):
+        """Queues a report unless an identical one is running or already stored.
+
+        With an ``as_of`` date the job also runs the Monte Carlo forecast over
+        ``tasks_df`` and ``risk_df`` for the report.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is not None and (not job.done or key in self.store):
+                return job
+            if self._executor is None:
+                self._start()
+            job = ReportJob(key)
+            job.future = self._executor.submit(_run_report, key, filtered_df, tasks_df, procurement_df, risk_df, as_of)
+            job.future.add_done_callback(lambda future: self._finish(job, future))
+            self._jobs[key] = job
+            return job
+
+    def discard(self, key):
+        """Forgets the job for ``key``, so the next submit starts a new one."""
+        with self._lock:
+            self._jobs.pop(key, None)
+
+    def _finish(self, job, future):
+        if future.cancelled() or future.exception() is not None:
+            job.stage, job.settled = "Failed", True
+            return
+        self.store.put(job.key, future.result())
+        job.stage, job.progress, job.settled = "Done", 1.0, True
+        # Forget finished jobs whose PDFs have been evicted.
+        with self._lock:
+            for key in [k for k, j in self._jobs.items() if j.stage == "Done" and k not in self.store]:
+                del self._jobs[key]
+
+
+# Module-level so every session shares one pool and one PDF store.
+report_jobs = ReportJobs()
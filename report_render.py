@@ -0,0 +1,148 @@
+"""Figure rasterization for the PDF report.
+
+Report figures are rendered to PNG concurrently through one warm Kaleido
+browser with several tabs, kept alive for the life of the process.  PNG bytes
+are cached on disk under a hash of the figure JSON (layout plus the data it
+was built from) and the image options, so re-downloading a report, or one
+that only differs in other sections, skips rendering for unchanged figures.
+"""
+import asyncio
+import hashlib
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import plotly.io as pio
+
+from data_cache import CACHE_DIR
+
+RENDER_WORKERS = int(os.environ.get("SOLAR_RENDER_WORKERS", "4"))
+PNG_CACHE_DIR = os.path.join(CACHE_DIR, "png")
+PNG_CACHE_MAX_BYTES = int(os.environ.get("SOLAR_PNG_CACHE_MB", "256")) * 1024 * 1024
+
+
+# --- PNG cache ---
+def figure_key(fig, image_format="png"):
+    """Hash of the full figure spec (traces with their data, and layout)."""
+    digest = hashlib.sha256(fig.to_json().encode())
+    digest.update(image_format.encode())
+    return digest.hexdigest()
+
+
+def _cache_path(key):
+    return os.path.join(PNG_CACHE_DIR, key + ".png")
+
+
+def _cache_get(key):
+    path = _cache_path(key)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    os.utime(path)  # LRU bookkeeping
+    return data
+
+
+def _cache_put(key, data):
+    os.makedirs(PNG_CACHE_DIR, exist_ok=True)
+    tmp = _cache_path(key) + f".{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, _cache_path(key))
+    _evict()
+
+
+def _evict():
+    entries = []
+    for name in os.listdir(PNG_CACHE_DIR):
+        if name.endswith(".png"):
+            stat = os.stat(os.path.join(PNG_CACHE_DIR, name))
+            entries.append((stat.st_mtime, stat.st_size, name))
+    total = sum(size for _, size, _ in entries)
+    for _, size, name in sorted(entries):
+        if total <= PNG_CACHE_MAX_BYTES:
+            break
+        try:
+            os.remove(os.path.join(PNG_CACHE_DIR, name))
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+# --- Renderer ---
+class Renderer:
+    """Warm Kaleido browser with ``workers`` tabs on a private event loop.
+
+    Falls back to a thread pool around ``pio.to_image`` when the installed
+    Kaleido has no async API (Kaleido < 1.0).
+    """
+
+    def __init__(self, workers=RENDER_WORKERS):
+        self.workers = workers
+        self._loop = None
+        self._kaleido = None
+        self._pool = None
+        self._lock = threading.Lock()
+
+    def _start(self):
+        with self._lock:
+            if self._loop is not None or self._pool is not None:
+                return
+            try:
+                from kaleido import Kaleido
+            except ImportError:
+                self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix="render")
+                return
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name="kaleido", daemon=True).start()
+            kaleido = Kaleido(n=self.workers)
+            asyncio.run_coroutine_threadsafe(kaleido.open(), loop).result()
+            self._loop, self._kaleido = loop, kaleido
+
+    def warm_up(self):
+        """Starts the browser ahead of the first report."""
+        self._start()
+
+    def render(self, figures, image_format="png"):
+        """Rasterizes ``{name: figure}`` concurrently; returns ``{name: bytes}``."""
+        self._start()
+        if self._pool is not None:
+            futures = {name: self._pool.submit(pio.to_image, fig, format=image_format) for name, fig in figures.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+        async def render_all():
+            names = list(figures)
+            images = await asyncio.gather(*(
+                self._kaleido.calc_fig(figures[name].to_dict(), opts={"format": image_format})
+                for name in names
+            ))
+            return dict(zip(names, images))
+
+        return asyncio.run_coroutine_threadsafe(render_all(), self._loop).result()
+
+
+_renderer = Renderer()
+
+
+def warm_up():
+    _renderer.warm_up()
+
+
+def render_figures(figures, image_format="png"):
+    """Returns ``{name: image bytes}``, rendering only figures not already cached."""
+    keys = {name: figure_key(fig, image_format) for name, fig in figures.items()}
+    images = {}
+    missing = {}
+    for name, fig in figures.items():
+        cached = _cache_get(keys[name])
+        if cached is None:
+            missing[name] = fig
+        else:
+            images[name] = cached
+    if missing:
+        rendered = _renderer.render(missing, image_format)
+        for name, data in rendered.items():
+            _cache_put(keys[name], data)
+        images.update(rendered)
+    return images
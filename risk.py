@@ -0,0 +1,115 @@
+"""Vectorized risk register analytics.
+
+A ``RiskAnalysis`` is built once per risk version (via ``Snapshot.derived``)
+and holds Probability and Impact as ordinal scores, each risk's exposure
+(Probability x Impact) and rank, per-category rollups and a fixed-size
+Probability x Impact grid with the count and total exposure of the risks in
+each cell.  The matrix is drawn from the grid, so its size does not depend on
+the size of the register; the risks of one cell are found by binary search on
+the rows sorted by cell.
+"""
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+
+# Rating levels in ascending order; a risk's score is its 1-based position.
+LEVELS = ['Low', 'Medium', 'High']
+
+
+def level_scores(column):
+    """Ordinal score per rating: 1..len(LEVELS), 0 for missing or unknown ratings.
+
+    Text ratings are matched case-insensitively; numeric ratings within the
+    scale are used as they are.
+    """
+    lookup = {level.lower(): score for score, level in enumerate(LEVELS, start=1)}
+    # Score each distinct rating once, then broadcast by code.
+    codes, uniques = pd.factorize(column)
+    uniques = pd.Series(uniques)
+    scores = uniques.astype(str).str.strip().str.lower().map(lookup)
+    numeric = pd.to_numeric(uniques, errors='coerce')
+    scores = scores.fillna(numeric.where(numeric.between(1, len(LEVELS))).round()).fillna(0)
+    scores = np.append(scores.to_numpy(dtype=np.int64), 0)  # code -1 (missing) -> 0
+    return scores[codes]
+
+
+class RiskAnalysis:
+    def __init__(self, df):
+        self.df = df
+        self.size = len(df)
+        self.probability = level_scores(df['Probability'])
+        self.impact = level_scores(df['Impact'])
+        self.exposure = self.probability * self.impact
+
+        # Rank 1 is the highest exposure; ties keep register order.
+        self.order = np.argsort(-self.exposure, kind='stable')
+        self.rank = np.empty(self.size, dtype=np.int64)
+        self.rank[self.order] = np.arange(1, self.size + 1)
+
+        # Grid cell per risk; row/column 0 holds unrated risks.
+        side = len(LEVELS) + 1
+        cells = self.impact * side + self.probability
+        self.counts = np.bincount(cells, minlength=side * side).reshape(side, side)
+        self.cell_exposure = np.bincount(cells, weights=self.exposure, minlength=side * side).reshape(side, side)
+        self._cell_order = np.argsort(cells, kind='stable')
+        self._sorted_cells = cells[self._cell_order]
+
+    def ranked(self):
+        """The register with Exposure and Rank columns, highest exposure first."""
+        return self.df.assign(Exposure=self.exposure, Rank=self.rank).iloc[self.order]
+
+    def cell_rows(self, probability, impact):
+        """Positions of the risks rated ``probability`` x ``impact`` (labels from LEVELS)."""
+        cell = _score(impact) * (len(LEVELS) + 1) + _score(probability)
+        lo, hi = np.searchsorted(self._sorted_cells, [cell, cell + 1])
+        return self._cell_order[lo:hi]
+
+    def category_rollup(self):
+        """Count, total/mean/max exposure and high-exposure count per Category."""
+        high = self.exposure >= len(LEVELS) * (len(LEVELS) - 1)  # e.g. Medium x High and above
+        frame = pd.DataFrame({
+            'Risks': 1,
+            'Total Exposure': self.exposure,
+            'Max Exposure': self.exposure,
+            'High Exposure': high.astype(np.int64),
+        }, index=self.df.index)
+        groups = frame.groupby(self.df['Category'].astype(str).to_numpy())
+        rollup = groups.agg({'Risks': 'sum', 'Total Exposure': 'sum', 'Max Exposure': 'max', 'High Exposure': 'sum'})
+        rollup.insert(2, 'Mean Exposure', rollup['Total Exposure'] / rollup['Risks'])
+        rollup.index.name = 'Category'
+        return rollup.sort_values('Total Exposure', ascending=False)
+
+    def grid(self):
+        """Rated part of the grid as (counts, exposure) frames: Impact rows, Probability columns."""
+        counts = pd.DataFrame(self.counts[1:, 1:], index=LEVELS, columns=LEVELS)
+        exposure = pd.DataFrame(self.cell_exposure[1:, 1:], index=LEVELS, columns=LEVELS)
+        return counts, exposure
+
+    def unrated(self):
+        return int(self.counts[0, :].sum() + self.counts[1:, 0].sum())
+
+
+def _score(label):
+    return LEVELS.index(label) + 1 if label in LEVELS else 0
+
+
+def build_risk_heatmap(analysis, title="Risk Matrix"):
+    """Probability x Impact heat map coloured by exposure, annotated with counts."""
+    counts, exposure = analysis.grid()
+    text = counts.astype(str) + ' risk(s)<br>exposure ' + exposure.round(0).astype(np.int64).astype(str)
+    fig = go.Figure(go.Heatmap(
+        z=exposure.to_numpy(),
+        x=LEVELS,
+        y=LEVELS,
+        text=text.to_numpy(),
+        texttemplate="%{text}",
+        hovertemplate="Probability %{x}<br>Impact %{y}<br>%{text}<extra></extra>",
+        colorscale='YlOrRd',
+        colorbar=dict(title='Exposure'),
+    ))
+    fig.update_layout(
+        title=title,
+        xaxis_title="Probability of Occurrence",
+        yaxis_title="Impact on Project",
+    )
+    return fig
@@ -0,0 +1,56 @@
+"""Risk Management tab: the ranked register and the risk matrix."""
+import streamlit as st
+
+from dashboard import get_snapshot
+from figure_cache import cached_figure
+from risk import LEVELS, RiskAnalysis, build_risk_heatmap
+from task_list import render_task_list
+
+
+def render(page):
+    # --- Risk Management ---
+    st.header("Risk Management")
+
+    # Load Risk Data
+    risk_snapshot = get_snapshot('risk')
+    # Scores, ranks, rollups and the heat-map grid, computed once per version
+    risk_analysis = risk_snapshot.derived('risk_analysis', RiskAnalysis)
+
+    # Risk Table, highest exposure first, one page at a time
+    st.subheader("Risk Register")
+    render_task_list(
+        risk_analysis.ranked(),
+        key='risk_list',
+        columns=['Rank', 'Risk ID', 'Risk Description', 'Category', 'Probability', 'Impact', 'Exposure',
+                 'Mitigation Plan', 'Owner', 'Status'],
+        sort_options={
+            'Exposure': ('Rank', True),
+            'Risk ID': ('Risk ID', True),
+            'Category': ('Category', True),
+            'Status': ('Status', True),
+        },
+        jump_column='Risk Description',
+        item='risk',
+        items='risks',
+    )
+
+    st.subheader("Exposure by Category")
+    st.dataframe(risk_analysis.category_rollup(), use_container_width=True)
+
+    # Risk Matrix: a fixed Probability x Impact grid, whatever the register size
+    st.subheader("Risk Matrix")
+    fig = cached_figure('risk_matrix', lambda: build_risk_heatmap(risk_analysis), risk_snapshot)
+    st.plotly_chart(fig)
+    if risk_analysis.unrated():
+        st.caption(f"{risk_analysis.unrated()} risk(s) without a Low/Medium/High rating are not shown in the matrix.")
+
+    # Drill down to the risks in one cell
+    cell_controls = st.columns(2)
+    with cell_controls[0]:
+        cell_probability = st.selectbox("Probability", LEVELS[::-1], key='risk_cell_probability')
+    with cell_controls[1]:
+        cell_impact = st.selectbox("Impact", LEVELS[::-1], key='risk_cell_impact')
+    cell_rows = risk_analysis.cell_rows(cell_probability, cell_impact)
+    st.caption(f"{len(cell_rows)} risk(s) rated {cell_probability} probability, {cell_impact} impact")
+    if len(cell_rows):
+        st.dataframe(risk_snapshot.data.iloc[cell_rows], hide_index=True, use_container_width=True)
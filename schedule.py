@@ -0,0 +1,328 @@
+"""Critical path scheduling over task dependencies.
+
+Dependencies come from an optional ``Predecessors`` column in
+``solar_project_data.xlsx``.  Each cell lists predecessors separated by
+commas or semicolons, either as 1-based row numbers of the sheet or as task
+names (a name that repeats across categories resolves to the task in the
+same category).  Without the column every task is independent.
+
+The tasks form an integer-indexed DAG stored as CSR arrays for successors
+and predecessors, grouped into topological levels with Kahn's algorithm.
+The forward and backward CPM passes run level by level, each level pulling
+from the already-final neighbouring level with NumPy, so a pass is O(V+E).
+
+Forecast dates account for progress as of a date: finished tasks keep their
+planned dates, started tasks finish after their remaining work, and tasks
+that should have started are pushed to the as-of date.  Total float against
+the forecast project finish marks the critical path; tasks with little float,
+or forecast to finish late, are at risk.
+
+When only dates or progress of some tasks change, ``Schedule.updated``
+reuses the graph and re-runs the forward pass over their descendants and the
+backward pass over their ancestors.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+from instrumentation import timed
+from schema import day_number, day_numbers
+
+PREDECESSORS_COLUMN = 'Predecessors'
+AT_RISK_DAYS = int(os.environ.get("SOLAR_AT_RISK_DAYS", "5"))
+
+CRITICAL, AT_RISK, ON_TRACK, COMPLETE = range(4)
+STATUS_LABELS = np.array(["Critical", "At risk", "On track", "Complete"], dtype=object)
+STATUS_COLORS = {"Critical": "#d62728", "At risk": "#ff7f0e", "On track": "#1f77b4", "Complete": "#2ca02c"}
+
+
+# --- Dependencies ---
+def parse_predecessors(df):
+    """Returns ``(sources, targets, problems)``: edge arrays and unresolved references."""
+    empty = np.empty(0, np.int64)
+    if PREDECESSORS_COLUMN not in df.columns:
+        return empty, empty, []
+    cells = pd.Series(df[PREDECESSORS_COLUMN].to_numpy())
+    cells = cells[cells.notna()]
+    # Whole numbers read from Excel arrive as floats (3.0).
+    numbers = pd.to_numeric(cells, errors='coerce')
+    cells = cells.where(numbers.isna(), numbers.astype('Int64').astype(str))
+    tokens = cells.astype(str).str.split(r'[,;]').explode().str.strip()
+    tokens = tokens[tokens.ne('') & tokens.ne('0')]
+    if tokens.empty:
+        return empty, empty, []
+    targets = tokens.index.to_numpy(dtype=np.int64)
+
+    # Row numbers are 1-based sheet rows.
+    numbers = pd.to_numeric(tokens, errors='coerce').to_numpy()
+    is_number = ~np.isnan(numbers) & (numbers == np.round(numbers))
+    sources = np.full(len(tokens), -1, dtype=np.int64)
+    in_range = is_number & (numbers >= 1) & (numbers <= len(df))
+    sources[in_range] = numbers[in_range].astype(np.int64) - 1
+
+    # Task names: unique across the sheet, else unique within the category.
+    names = pd.Series(df['Task'].astype(str).str.strip().str.lower().to_numpy())
+    categories = df['Category'].astype(str).to_numpy()
+    lowered = tokens.str.lower().to_numpy()
+    unique_names = pd.Index(names[~names.duplicated(keep=False)])
+    by_name = unique_names.get_indexer(lowered)
+    rows_by_name = np.flatnonzero(~names.duplicated(keep=False).to_numpy())
+    found = ~is_number & (by_name >= 0)
+    sources[found] = rows_by_name[by_name[found]]
+    pending = ~is_number & (sources < 0)
+    if pending.any():
+        pairs = pd.MultiIndex.from_arrays([categories, names])
+        unique_pairs = ~pairs.duplicated(keep=False)
+        wanted = pd.MultiIndex.from_arrays([categories[targets[pending]], lowered[pending]])
+        by_pair = pairs[unique_pairs].get_indexer(wanted)
+        sources[np.flatnonzero(pending)[by_pair >= 0]] = np.flatnonzero(unique_pairs)[by_pair[by_pair >= 0]]
+
+    bad = (sources < 0) | (sources == targets)
+    problems = list(zip(targets[bad].tolist(), tokens[bad].tolist()))
+    return sources[~bad], targets[~bad], problems
+
+
+def _csr(keys, values, n):
+    order = np.argsort(keys, kind='stable')
+    indptr = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(keys, minlength=n), out=indptr[1:])
+    return indptr, values[order]
+
+
+def _gather(indptr, indices, nodes):
+    """Neighbours of ``nodes`` and, aligned with them, the node each came from."""
+    counts = indptr[nodes + 1] - indptr[nodes]
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    owners = np.repeat(nodes, counts)
+    # Positions indptr[node] .. indptr[node+1] for every node, concatenated.
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return indices[np.repeat(indptr[nodes], counts) + offsets], owners
+
+
+class TaskGraph:
+    def __init__(self, n, sources, targets):
+        self.n = n
+        if len(sources):
+            edges = np.unique(np.stack([sources, targets], axis=1), axis=0)
+            sources, targets = edges[:, 0], edges[:, 1]
+        self.succ_indptr, self.succ = _csr(sources, targets, n)
+        self.pred_indptr, self.pred = _csr(targets, sources, n)
+
+        # Kahn's algorithm, one whole frontier (topological level) at a time.
+        indegree = np.diff(self.pred_indptr)
+        frontier = np.flatnonzero(indegree == 0)
+        self.levels = []
+        while frontier.size:
+            self.levels.append(frontier)
+            successors, _ = _gather(self.succ_indptr, self.succ, frontier)
+            successors, counts = np.unique(successors, return_counts=True)
+            indegree[successors] -= counts
+            frontier = successors[indegree[successors] == 0]
+        # Tasks on or downstream of a cycle never reach indegree 0; they go in
+        # a last level and are scheduled without their dependencies.
+        self.acyclic = indegree == 0
+        self.cyclic = np.flatnonzero(~self.acyclic)
+        if self.cyclic.size:
+            self.levels.append(self.cyclic)
+
+    @property
+    def edge_count(self):
+        return len(self.succ)
+
+    def _scheduled_edges(self, indptr, indices, nodes):
+        neighbours, owners = _gather(indptr, indices, nodes)
+        # Cyclic tasks ignore their dependencies.
+        keep = self.acyclic[neighbours] & self.acyclic[owners]
+        return neighbours[keep], owners[keep]
+
+    def predecessor_edges(self, nodes):
+        """Predecessors of ``nodes`` that scheduling honours and, aligned with them, the node each precedes."""
+        return self._scheduled_edges(self.pred_indptr, self.pred, nodes)
+
+    def successor_edges(self, nodes):
+        """Successors of ``nodes`` that scheduling honours and, aligned with them, the node each follows."""
+        return self._scheduled_edges(self.succ_indptr, self.succ, nodes)
+
+    def _closure(self, nodes, indptr, indices):
+        reached = np.zeros(self.n, dtype=bool)
+        reached[nodes] = True
+        frontier = np.asarray(nodes, dtype=np.int64)
+        while frontier.size:
+            neighbours, _ = _gather(indptr, indices, frontier)
+            neighbours = neighbours[~reached[neighbours]]
+            neighbours = np.unique(neighbours)
+            reached[neighbours] = True
+            frontier = neighbours
+        return reached
+
+    def descendants(self, nodes):
+        """Mask of ``nodes`` and every task downstream of them."""
+        return self._closure(nodes, self.succ_indptr, self.succ)
+
+    def ancestors(self, nodes):
+        """Mask of ``nodes`` and every task upstream of them."""
+        return self._closure(nodes, self.pred_indptr, self.pred)
+
+
+# --- CPM ---
+def _task_inputs(df, as_of):
+    """Day numbers for the planned dates, durations and remaining work per task.
+
+    A task with only one of its dates is a milestone on that day; one with
+    neither is placed at the as-of date.
+    """
+    start, start_valid = day_numbers(df['Start Date'])
+    end, end_valid = day_numbers(df['End Date'])
+    today = day_number(as_of)
+    start = np.where(start_valid, start, np.where(end_valid, end, today))
+    end = np.maximum(np.where(end_valid, end, start), start)
+    percent = np.clip(np.nan_to_num(pd.to_numeric(df['Percent Complete'], errors='coerce').to_numpy(dtype=np.float64)), 0, 100)
+    return start, end, percent
+
+
+class Schedule:
+    def __init__(self, graph, start, end, percent, as_of, problems=()):
+        self.graph = graph
+        self.as_of = pd.Timestamp(as_of).normalize()
+        self.problems = list(problems)
+        self._set_inputs(start, end, percent)
+        self.early_start = np.empty(graph.n, dtype=np.int64)
+        self.early_finish = np.empty(graph.n, dtype=np.int64)
+        self.late_start = np.empty(graph.n, dtype=np.int64)
+        self.late_finish = np.empty(graph.n, dtype=np.int64)
+        everything = np.ones(graph.n, dtype=bool)
+        self._forward(everything)
+        self._backward(everything)
+        self._classify()
+
+    @classmethod
+    @timed('schedule.build', rows=lambda schedule: schedule.graph.n)
+    def build(cls, df, as_of=None):
+        as_of = as_of if as_of is not None else pd.Timestamp.now()
+        sources, targets, problems = parse_predecessors(df)
+        graph = TaskGraph(len(df), sources, targets)
+        start, end, percent = _task_inputs(df, as_of)
+        return cls(graph, start, end, percent, as_of, problems)
+
+    def _set_inputs(self, start, end, percent):
+        today = day_number(self.as_of)
+        self.start, self.end, self.percent = start, end, percent
+        duration = end - start
+        self.complete = percent >= 100
+        started = (percent > 0) & ~self.complete
+        self.remaining = np.where(self.complete, 0, np.ceil(duration * (1 - percent / 100)).astype(np.int64))
+        # Earliest start ignoring predecessors: planned start, or today if a
+        # task that hasn't started is already late to start.
+        self.constraint = np.where(started | self.complete, start, np.maximum(start, today))
+        # Earliest finish ignoring predecessors.
+        self.own_finish = np.where(
+            self.complete, end,
+            np.where(started, np.maximum(end, today + self.remaining), self.constraint + duration),
+        )
+
+    def _forward(self, mask):
+        # Levels are sorted node arrays, so searchsorted maps edges to positions.
+        graph = self.graph
+        for nodes in graph.levels:
+            nodes = nodes[mask[nodes]]
+            if not nodes.size:
+                continue
+            earliest = self.constraint[nodes].copy()
+            preds, owners = graph.predecessor_edges(nodes)
+            if preds.size:
+                np.maximum.at(earliest, np.searchsorted(nodes, owners), self.early_finish[preds])
+            self.early_start[nodes] = np.where(self.complete[nodes], self.start[nodes], earliest)
+            self.early_finish[nodes] = np.where(
+                self.complete[nodes], self.end[nodes], np.maximum(self.own_finish[nodes], earliest + self.remaining[nodes])
+            )
+        self.finish = int(self.early_finish.max()) if self.graph.n else 0
+
+    def _backward(self, mask):
+        graph = self.graph
+        for nodes in reversed(graph.levels):
+            nodes = nodes[mask[nodes]]
+            if not nodes.size:
+                continue
+            latest = np.full(nodes.size, self.finish, dtype=np.int64)
+            succs, owners = graph.successor_edges(nodes)
+            if succs.size:
+                np.minimum.at(latest, np.searchsorted(nodes, owners), self.late_start[succs])
+            self.late_finish[nodes] = latest
+            self.late_start[nodes] = latest - self.remaining[nodes]
+
+    def _classify(self):
+        self.total_float = self.late_finish - self.early_finish
+        self.slip = self.early_finish - self.end
+        self.status = np.select(
+            [self.complete, self.total_float <= 0, (self.total_float <= AT_RISK_DAYS) | (self.slip > 0)],
+            [COMPLETE, CRITICAL, AT_RISK],
+            default=ON_TRACK,
+        ).astype(np.int8)
+
+    # --- Incremental ---
+    def updated(self, rows, start, end, percent):
+        """Schedule with new dates/progress for task positions ``rows``.
+
+        Only the changed tasks' descendants are re-run forward; the backward
+        pass is limited to their ancestors unless the project finish moved.
+        """
+        new = Schedule.__new__(Schedule)
+        new.graph, new.as_of, new.problems = self.graph, self.as_of, self.problems
+        all_start, all_end, all_percent = self.start.copy(), self.end.copy(), self.percent.copy()
+        all_start[rows], all_end[rows], all_percent[rows] = start, end, percent
+        new._set_inputs(all_start, all_end, all_percent)
+        new.early_start, new.early_finish = self.early_start.copy(), self.early_finish.copy()
+        new.late_start, new.late_finish = self.late_start.copy(), self.late_finish.copy()
+        new._forward(self.graph.descendants(rows))
+        if new.finish != self.finish:
+            new._backward(np.ones(self.graph.n, dtype=bool))
+        else:
+            new._backward(self.graph.ancestors(rows))
+        new._classify()
+        return new
+
+    # --- Results ---
+    def frame(self, df):
+        """``df`` with forecast dates, float, slip and schedule status columns."""
+        def dates(days):
+            return pd.to_datetime(days.astype('datetime64[D]'))
+        return df.assign(**{
+            'Forecast Start': dates(self.early_start),
+            'Forecast Finish': dates(self.early_finish),
+            'Latest Finish': dates(self.late_finish),
+            'Total Float (days)': self.total_float,
+            'Slip (days)': self.slip,
+            'Schedule': STATUS_LABELS[self.status],
+        })
+
+    def labels(self):
+        """Schedule status label per task."""
+        return STATUS_LABELS[self.status]
+
+    def planned_finish(self):
+        return pd.Timestamp(np.datetime64(int(self.end.max()), 'D')) if self.graph.n else None
+
+    def forecast_finish(self):
+        return pd.Timestamp(np.datetime64(self.finish, 'D')) if self.graph.n else None
+
+
+def task_schedule(snapshot, as_of):
+    """Schedule for ``snapshot`` as of a day, shared across sessions."""
+    as_of = pd.Timestamp(as_of).normalize()
+    return snapshot.derived(('schedule', as_of), lambda df: Schedule.build(df, as_of))
+
+
+def update_schedule(schedule, delta):
+    """Carries a schedule forward when tasks only changed dates or progress; otherwise None."""
+    if len(delta.inserted) or len(delta.deleted) or delta.reordered:
+        return None
+    old, new = delta.updated_old, delta.updated_new
+    if PREDECESSORS_COLUMN in new.columns:
+        if not old[PREDECESSORS_COLUMN].astype(str).equals(new[PREDECESSORS_COLUMN].astype(str).set_axis(old.index)):
+            return None
+    rows = new.index.to_numpy()
+    start, end, percent = _task_inputs(new, schedule.as_of)
+    return schedule.updated(rows, start, end, percent)
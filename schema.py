@@ -0,0 +1,257 @@
+"""Declared column types for the datasets, applied once at load.
+
+Each dataset lists its columns by kind:
+
+* ``TEXT``: Python strings, missing as ''.
+* ``CATEGORY``: pandas categoricals with sorted categories; missing stays NaN.
+* ``MONEY``: float32, which holds whole dollars exactly up to $16.7M and
+  cents up to $131k; a column with a value that would lose its cents is
+  kept as float64 instead.  Totals should be accumulated in float64
+  (``money_sum``).  Missing amounts are 0.
+* ``PERCENT``: uint8 in 0..100, or float32 when some value has a fraction.
+  Values outside the range are clipped; missing ones are 0.
+* ``DATE``: datetime64[s]; missing or unparseable dates are NaT.  Date
+  arithmetic works on int64 days since the epoch (``day_numbers``).
+* ``NUMBER``: float64; missing values are 0.
+
+Columns a sheet doesn't declare pass through untouched.  Values that can't
+be coerced are not dropped -- the row processors must keep every row -- but
+are reported in ``issue_log`` under the row's primary key, together with
+missing values in required columns.
+"""
+import logging
+import threading
+
+import numpy as np
+import pandas as pd
+
+TEXT, CATEGORY, MONEY, PERCENT, DATE, NUMBER = 'text', 'category', 'money', 'percent', 'date', 'number'
+
+SCHEMAS = {
+    'tasks': {
+        'Task': TEXT,
+        'Start Date': DATE,
+        'End Date': DATE,
+        'Percent Complete': PERCENT,
+        'Category': CATEGORY,
+        'Budget': MONEY,
+        'Actual Cost': MONEY,
+        'Cost Variance': MONEY,
+        'System Size (kWp)': NUMBER,
+        'Actual Energy Production (kWh)': NUMBER,
+        'PV System Energy Production (kWh)': NUMBER,
+    },
+    'procurement': {
+        'PO Number': TEXT,
+        'Vendor/Supplier Name': CATEGORY,
+        'Item/Service Description': TEXT,
+        'Quantity': NUMBER,
+        'Unit Price': MONEY,
+        'Total Cost': MONEY,
+        'Order Date': DATE,
+        'Delivery Date': DATE,
+        'Status': CATEGORY,
+    },
+    'risk': {
+        'Risk ID': TEXT,
+        'Risk Description': TEXT,
+        'Category': CATEGORY,
+        'Probability': CATEGORY,
+        'Impact': CATEGORY,
+        'Mitigation Plan': TEXT,
+        'Owner': CATEGORY,
+        'Status': CATEGORY,
+    },
+}
+
+# Primary key per dataset, for incremental ingest and issue reports.  Task
+# names repeat across categories, so tasks are keyed by both.
+KEYS = {
+    'tasks': ['Category', 'Task'],
+    'procurement': ['PO Number'],
+    'risk': ['Risk ID'],
+}
+
+# Columns a row is reported for when they are empty.
+REQUIRED = {
+    'tasks': ['Task', 'Category', 'Start Date', 'End Date'],
+    'procurement': ['PO Number', 'Order Date'],
+    'risk': ['Risk ID'],
+}
+
+ISSUE_COLUMNS = ['Key', 'Column', 'Value', 'Problem']
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def money_sum(values):
+    """Total of a money column, accumulated in float64."""
+    return float(np.nansum(np.asarray(values, dtype=np.float64)))
+
+
+def day_number(date):
+    """Days since the epoch for a date, datetime or Timestamp."""
+    return int(np.datetime64(pd.Timestamp(date).date(), 'D').astype(np.int64))
+
+
+def day_numbers(dates):
+    """``(days, valid)`` for a date column: days since the epoch, 0 where the date is missing (NaT)."""
+    days = np.asarray(pd.to_datetime(dates).to_numpy().astype('datetime64[D]'))
+    valid = ~np.isnat(days)
+    return np.where(valid, days.astype(np.int64), 0), valid
+
+
+# --- Coercion ---
+def _numbers(raw):
+    """``(values, unparseable)``: floats, and a mask of present values that aren't numbers."""
+    values = pd.to_numeric(raw, errors='coerce')
+    return values.to_numpy(dtype=np.float64), values.isna().to_numpy() & raw.notna().to_numpy()
+
+
+def _text(raw):
+    return raw.where(raw.isna(), raw.astype(str)).fillna('').astype(object), np.zeros(len(raw), dtype=bool)
+
+
+def _category(raw):
+    values = raw.where(raw.isna(), raw.astype(str))
+    return values.astype(pd.CategoricalDtype(sorted(values.dropna().unique()))), np.zeros(len(raw), dtype=bool)
+
+
+def _money(raw):
+    values, bad = _numbers(raw)
+    values = np.nan_to_num(values)
+    narrow = values.astype(np.float32)
+    # Keep float64 if float32 would move any amount by half a cent or more.
+    if np.abs(narrow.astype(np.float64) - values).max(initial=0) >= 0.005:
+        return pd.Series(values, index=raw.index), bad
+    return pd.Series(narrow, index=raw.index), bad
+
+
+def _percent(raw):
+    values, bad = _numbers(raw)
+    values = np.nan_to_num(values)
+    bad |= (values < 0) | (values > 100)
+    values = np.clip(values, 0, 100)
+    if (values != np.round(values)).any():
+        return pd.Series(values.astype(np.float32), index=raw.index), bad
+    return pd.Series(values.astype(np.uint8), index=raw.index), bad
+
+
+def _date(raw):
+    values = pd.to_datetime(raw, errors='coerce')
+    bad = values.isna().to_numpy() & raw.notna().to_numpy()
+    return values.astype('datetime64[s]'), bad
+
+
+def _number(raw):
+    values, bad = _numbers(raw)
+    return pd.Series(np.nan_to_num(values), index=raw.index), bad
+
+
+_COERCE = {TEXT: _text, CATEGORY: _category, MONEY: _money, PERCENT: _percent, DATE: _date, NUMBER: _number}
+_PROBLEMS = {MONEY: "not a number", PERCENT: "not a percentage from 0 to 100", DATE: "not a date",
+             NUMBER: "not a number"}
+
+
+def row_keys(name, df):
+    """Primary key of each row of ``df`` as one string ("Category / Task" for tasks)."""
+    columns = [column for column in KEYS.get(name, []) if column in df.columns]
+    if not columns:
+        return pd.Series(df.index.astype(str), index=df.index)
+    # Raw and coerced rows must give the same key, missing values included.
+    parts = [df[column].astype(object).where(df[column].notna(), '').astype(str) for column in columns]
+    keys = parts[0]
+    for part in parts[1:]:
+        keys = keys + ' / ' + part
+    return keys
+
+
+def conform(name, df):
+    """Coerces ``df``'s declared columns in place and reports bad values; returns ``df``."""
+    keys = row_keys(name, df)
+    issues = []
+    required = set(REQUIRED.get(name, []))
+    for column, kind in SCHEMAS[name].items():
+        if column not in df.columns:
+            continue
+        raw = df[column]
+        values, bad = _COERCE[kind](raw)
+        checks = [(bad, _PROBLEMS.get(kind))]
+        if column in required:
+            checks.append((raw.isna().to_numpy() | (raw.astype(str).str.strip() == '').to_numpy(), "missing"))
+        for mask, problem in checks:
+            if mask.any():
+                issues.append(pd.DataFrame({
+                    'Key': keys[mask].to_numpy(), 'Column': column,
+                    'Value': raw[mask].astype(str).to_numpy(), 'Problem': problem,
+                }))
+        df[column] = values
+    issues = pd.concat(issues, ignore_index=True) if issues else pd.DataFrame(columns=ISSUE_COLUMNS)
+    if len(issues):
+        _LOGGER.warning("%s: %d value(s) could not be read as their declared type", name, len(issues))
+    issue_log.record(name, keys, issues)
+    return df
+
+
+# --- Issue reports ---
+class IssueLog:
+    """Coercion problems per dataset, by primary key.
+
+    Incremental reloads only re-read the rows that changed, so each record
+    replaces the issues of just the keys it covered; issues of rows that have
+    since been deleted are dropped when read.
+    """
+
+    def __init__(self):
+        self._issues = {}
+        self._lock = threading.Lock()
+
+    def record(self, name, keys, issues):
+        with self._lock:
+            previous = self._issues.get(name)
+            if previous is not None and len(previous):
+                issues = pd.concat([previous[~previous['Key'].isin(keys)], issues], ignore_index=True)
+            self._issues[name] = issues
+
+    def issues(self, name, df=None):
+        """Issues for ``name``, limited to the rows still in ``df`` when given."""
+        with self._lock:
+            issues = self._issues.get(name)
+        if issues is None:
+            return pd.DataFrame(columns=ISSUE_COLUMNS)
+        if df is not None and len(issues):
+            issues = issues[issues['Key'].isin(row_keys(name, df))]
+        return issues.reset_index(drop=True)
+
+
+# Module-level so every session sees the issues of the shared snapshots.
+issue_log = IssueLog()
+
+
+# --- Reassembly ---
+def compatible(old, new):
+    """True if columns of dtypes ``old`` and ``new`` can be concatenated losslessly with ``concat``."""
+    if old == new:
+        return True
+    if isinstance(old, pd.CategoricalDtype) and isinstance(new, pd.CategoricalDtype):
+        return True
+    # A re-read subset may have been narrowed differently (uint8 vs float32 percent).
+    return old.kind in 'iuf' and new.kind in 'iuf'
+
+
+def concat(parts):
+    """``pd.concat`` that keeps categoricals (with the union of categories) and widens numeric columns."""
+    parts = [part.copy(deep=False) for part in parts]
+    for column in parts[0].columns:
+        dtypes = [part[column].dtype for part in parts]
+        if all(dtype == dtypes[0] for dtype in dtypes):
+            continue
+        if all(isinstance(dtype, pd.CategoricalDtype) for dtype in dtypes):
+            categories = sorted(set().union(*(dtype.categories for dtype in dtypes)))
+            for part in parts:
+                part[column] = part[column].cat.set_categories(categories)
+        elif all(dtype.kind in 'iuf' for dtype in dtypes):
+            common = np.result_type(*dtypes)
+            for part in parts:
+                part[column] = part[column].astype(common)
+    return pd.concat(parts)
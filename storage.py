@@ -0,0 +1,216 @@
+"""Optional embedded-database storage for the dashboard datasets.
+
+The Excel workbooks stay the import/export format and the loaders keep
+reading them through the Arrow cache.  With ``SOLAR_STORAGE=sqlite`` (or
+``duckdb``, when the package is installed) every published snapshot of the
+tasks, risk and procurement datasets is also mirrored into one database file,
+indexed on Category, the date columns and Status, and the dashboard pushes
+its task filters, monthly procurement grouping and EVM rollups down into SQL.
+
+Mirroring runs on a background thread.  A query only answers for the
+snapshot version the database currently holds and returns None otherwise,
+so callers fall back to pandas until the mirror catches up.  The default,
+``SOLAR_STORAGE=excel``, never mirrors and always returns None.
+"""
+import logging
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from data_cache import CACHE_DIR
+from evm import rollup_metrics
+
+STORAGE_BACKEND = os.environ.get("SOLAR_STORAGE", "excel").lower()
+DB_PATH = os.environ.get("SOLAR_DB_PATH", os.path.join(CACHE_DIR, "solar.db"))
+
+# Mirrored datasets -> indexed columns.
+MIRRORED = {
+    'tasks': ['Category', 'Start Date', 'End Date'],
+    'risk': ['Category'],
+    'procurement': ['Order Date', 'Status'],
+}
+
+_LOGGER = logging.getLogger(__name__)
+
+# Month bucket expression per SQL dialect.
+_MONTH_SQL = {
+    'sqlite': "strftime('%Y-%m', \"Order Date\")",
+    'duckdb': "strftime(\"Order Date\", '%Y-%m')",
+}
+
+
+def _quote(name):
+    return '"' + name.replace('"', '""') + '"'
+
+
+class ExcelStorage:
+    """Default backend: nothing is mirrored, every query falls back to pandas."""
+
+    name = 'excel'
+
+    def sync(self, snapshot):
+        pass
+
+    def holds(self, snapshot):
+        return False
+
+    def filter_rows(self, snapshot, categories, search, start_date, end_date):
+        return None
+
+    def procurement_buckets(self, snapshot):
+        return None
+
+    def evm_rollup(self, snapshot, categories, search, start_date, end_date):
+        return None
+
+
+class SqlStorage(ExcelStorage):
+    """Mirrors snapshots into SQLite or DuckDB and answers pushed-down queries."""
+
+    def __init__(self, path=DB_PATH, dialect='sqlite'):
+        self.name = dialect
+        self.path = path
+        self.dialect = dialect
+        self._versions = {}  # dataset -> snapshot version held in the database
+        self._lock = threading.Lock()
+        # One writer; syncs for successive versions apply in order.
+        self._writer = ThreadPoolExecutor(1, thread_name_prefix="storage-sync")
+        self._duckdb = None
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    # --- Connections ---
+    def _connect(self):
+        if self.dialect == 'duckdb':
+            if self._duckdb is None:
+                import duckdb
+                self._duckdb = duckdb.connect(self.path)
+            return self._duckdb.cursor()
+        connection = sqlite3.connect(self.path)
+        connection.execute("PRAGMA journal_mode=WAL")
+        return connection
+
+    def _read_sql(self, sql, params=()):
+        connection = self._connect()
+        try:
+            if self.dialect == 'duckdb':
+                return connection.execute(sql, list(params)).df()
+            return pd.read_sql_query(sql, connection, params=list(params))
+        finally:
+            connection.close()
+
+    # --- Mirroring ---
+    def sync(self, snapshot):
+        """Queues a copy of ``snapshot`` into the database (store listener)."""
+        if snapshot.name in MIRRORED:
+            self._writer.submit(self._write, snapshot)
+
+    def _write(self, snapshot):
+        name = snapshot.name
+        with self._lock:
+            if self._versions.get(name, 0) >= snapshot.version:
+                return
+        table = snapshot.data.reset_index(drop=True)
+        table.insert(0, 'row_id', np.arange(len(table), dtype=np.int64))
+        if name == 'tasks':
+            # Lower-cased here so search matches str.lower(), not SQL's ASCII-only lower().
+            table['_task_lower'] = table['Task'].astype(str).str.lower()
+        staging = _quote(name + '__new')
+        try:
+            connection = self._connect()
+            try:
+                connection.execute(f"DROP TABLE IF EXISTS {staging}")
+                if self.dialect == 'duckdb':
+                    connection.register('snapshot_frame', table)
+                    connection.execute(f"CREATE TABLE {staging} AS SELECT * FROM snapshot_frame")
+                    connection.unregister('snapshot_frame')
+                else:
+                    table.to_sql(name + '__new', connection, index=False)
+                connection.execute(f"DROP TABLE IF EXISTS {_quote(name)}")
+                connection.execute(f"ALTER TABLE {staging} RENAME TO {_quote(name)}")
+                for column in MIRRORED[name]:
+                    index = _quote(f"idx_{name}_{column.lower().replace(' ', '_')}")
+                    connection.execute(f"CREATE INDEX IF NOT EXISTS {index} ON {_quote(name)} ({_quote(column)})")
+                if self.dialect == 'sqlite':
+                    connection.commit()
+            finally:
+                connection.close()
+        except Exception:
+            _LOGGER.exception("Mirroring dataset %r into %s failed", name, self.path)
+            return
+        with self._lock:
+            self._versions[name] = max(self._versions.get(name, 0), snapshot.version)
+
+    def holds(self, snapshot):
+        with self._lock:
+            return self._versions.get(snapshot.name) == snapshot.version
+
+    # --- Queries ---
+    @staticmethod
+    def _task_filter(categories, search, start_date, end_date):
+        """WHERE clause with the sidebar semantics of ``FilterIndex``."""
+        if not categories:
+            return "1 = 0", []
+        clauses = [f"Category IN ({', '.join('?' * len(categories))})"]
+        params = [str(category) for category in categories]
+        # Whole days: start on/after start_date, end before the day after end_date.
+        clauses.append('"Start Date" >= ?')
+        params.append(pd.Timestamp(start_date).strftime('%Y-%m-%d'))
+        clauses.append('"End Date" < ?')
+        params.append((pd.Timestamp(end_date) + pd.Timedelta(days=1)).strftime('%Y-%m-%d'))
+        if search:
+            clauses.append("instr(_task_lower, ?) > 0")
+            params.append(search.lower())
+        return " AND ".join(clauses), params
+
+    def filter_rows(self, snapshot, categories, search, start_date, end_date):
+        """Row positions of the filtered tasks in ``snapshot.data``, or None."""
+        if not self.holds(snapshot):
+            return None
+        where, params = self._task_filter(categories, search, start_date, end_date)
+        rows = self._read_sql(f"SELECT row_id FROM tasks WHERE {where} ORDER BY row_id", params)
+        return rows['row_id'].to_numpy(dtype=np.int64)
+
+    def procurement_buckets(self, snapshot):
+        """Same frame as ``aggregates.procurement_buckets``, grouped in SQL."""
+        if not self.holds(snapshot):
+            return None
+        month = _MONTH_SQL[self.dialect]
+        buckets = self._read_sql(
+            f'SELECT {month} AS Month, Status, SUM("Total Cost") AS "Total Cost", COUNT(*) AS POs '
+            f'FROM procurement GROUP BY 1, 2'
+        )
+        buckets['Month'] = pd.PeriodIndex(buckets['Month'], freq='M')
+        return buckets.set_index(['Month', 'Status']).astype(float).sort_index()
+
+    def evm_rollup(self, snapshot, categories, search, start_date, end_date):
+        """``evm.evm_rollup`` of the filtered tasks, summed in SQL."""
+        if not self.holds(snapshot):
+            return None
+        where, params = self._task_filter(categories, search, start_date, end_date)
+        sums = self._read_sql(
+            'SELECT Category, COUNT(*) AS Tasks, SUM(Budget) AS BAC, '
+            'SUM(Budget * "Percent Complete" / 100.0) AS EV, SUM("Actual Cost") AS AC '
+            f'FROM tasks WHERE {where} GROUP BY Category ORDER BY Category',
+            params,
+        )
+        return rollup_metrics(sums.set_index('Category').astype(float))
+
+
+def open_storage(backend=STORAGE_BACKEND, path=DB_PATH):
+    if backend in ('sqlite', 'duckdb'):
+        if backend == 'duckdb':
+            try:
+                import duckdb  # noqa: F401
+            except ImportError:
+                _LOGGER.warning("SOLAR_STORAGE=duckdb but duckdb is not installed; using SQLite")
+                backend = 'sqlite'
+        return SqlStorage(path, backend)
+    return ExcelStorage()
+
+
+# Module-level so the store listener and every session share one database.
+storage = open_storage()
@@ -0,0 +1,80 @@
+"""Paginated task list widgets.
+
+Only the current page of tasks is sent to the browser, as one dataframe
+element, instead of a row of Streamlit elements per task.  Status labels are
+computed once per dataset version (and day, since "overdue" depends on the
+date) and looked up for the filtered rows.
+"""
+import math
+
+import pandas as pd
+import streamlit as st
+
+from task_status import COST_LABELS, OVERDUE, PROGRESS_LABELS, cost_status, progress_status
+
+PAGE_SIZES = [25, 50, 100, 250]
+
+
+def build_task_statuses(df, now=None):
+    """Progress and cost status labels for every task, aligned to ``df.index``."""
+    progress = progress_status(df, now)
+    return pd.DataFrame({
+        'Status': PROGRESS_LABELS[progress],
+        'Cost Status': COST_LABELS[cost_status(df)],
+        'Overdue': progress == OVERDUE,
+    }, index=df.index)
+
+
+def task_statuses(snapshot):
+    """Status frame for ``snapshot``, shared across sessions for the current day."""
+    today = pd.Timestamp.now().normalize()
+    return snapshot.derived(('task_statuses', today), lambda df: build_task_statuses(df, today))
+
+
+def sort_order(column, ascending=True):
+    """Positions that sort ``column`` stably, with missing values (NaN/NaT) last either way."""
+    ordered = column.reset_index(drop=True).sort_values(ascending=ascending, na_position='last', kind='stable')
+    return ordered.index.to_numpy()
+
+
+def render_task_list(df, key, columns, sort_options, column_config=None, default_page_size=25,
+                     jump_column='Task', item='task', items='tasks'):
+    """Shows one sortable page of ``df[columns]`` with paging and jump-to controls.
+
+    ``sort_options`` maps a label to ``(column, ascending)``; jump-to searches
+    ``jump_column``.  ``item``/``items`` name the rows in labels.
+    """
+    if df.empty:
+        st.write(f"No {items} to display.")
+        return
+
+    page_key = f'{key}_page'
+    controls = st.columns([2, 1, 2, 1])
+    with controls[0]:
+        sort_label = st.selectbox("Sort by", list(sort_options), key=f'{key}_sort')
+    with controls[1]:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(default_page_size), key=f'{key}_page_size')
+
+    sort_column, ascending = sort_options[sort_label]
+    order = sort_order(df[sort_column], ascending)
+    page_count = max(1, math.ceil(len(df) / page_size))
+
+    with controls[2]:
+        jump_to = st.text_input(f"Jump to {item}", key=f'{key}_jump')
+    # Jump once when the search text changes, so paging away still works.
+    if jump_to and jump_to != st.session_state.get(f'{key}_last_jump'):
+        st.session_state[f'{key}_last_jump'] = jump_to
+        names = df[jump_column].astype(str).str.lower().to_numpy()[order]
+        matches = (pd.Series(names).str.find(jump_to.lower()) >= 0).to_numpy().nonzero()[0]
+        if matches.size:
+            st.session_state[page_key] = int(matches[0] // page_size) + 1
+        else:
+            st.caption(f"No {item} matches '{jump_to}'.")
+    if st.session_state.get(page_key, 1) > page_count:
+        st.session_state[page_key] = page_count
+    with controls[3]:
+        page = st.number_input("Page", min_value=1, max_value=page_count, step=1, key=page_key)
+
+    window = order[(page - 1) * page_size:page * page_size]
+    st.dataframe(df.iloc[window][columns], column_config=column_config, hide_index=True, use_container_width=True)
+    st.caption(f"{items[:1].upper() + items[1:]} {(page - 1) * page_size + 1}–{(page - 1) * page_size + len(window)} of {len(df)}")
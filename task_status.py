@@ -0,0 +1,35 @@
+"""Vectorized task status classification.
+
+Shared by the dashboard and the PDF report so both label tasks the same way.
+Statuses are small integer codes; index the label arrays with them.
+"""
+import numpy as np
+import pandas as pd
+
+# Progress status codes, in the order the rules are checked.
+OVERDUE, IN_PROGRESS, NOT_STARTED, COMPLETED = range(4)
+PROGRESS_LABELS = np.array(["⚠️ Overdue", "🚧 In Progress", "Not Started", "✅ Completed"], dtype=object)
+PROGRESS_ALERT_CLASSES = np.array(["alert-danger", "alert-warning", "alert-warning", "alert-success"], dtype=object)
+
+# Cost status codes.
+BUDGET_CONSUMED, OVER_BUDGET, UNDER_BUDGET = range(3)
+COST_LABELS = np.array(["Budget consumed", "Over budget", "Under budget"], dtype=object)
+COST_ALERT_CLASSES = np.array(["alert-warning", "alert-danger", "alert-success"], dtype=object)
+
+
+def progress_status(df, now=None):
+    """Overdue / in progress / not started / completed code per task."""
+    now = pd.Timestamp(now if now is not None else pd.Timestamp.now())
+    percent = pd.to_numeric(df['Percent Complete'], errors='coerce').fillna(0).to_numpy()
+    overdue = (percent < 100) & (pd.to_datetime(df['End Date']).to_numpy() < now.to_datetime64())
+    return np.select(
+        [overdue, (percent > 0) & (percent < 100), percent == 0],
+        [OVERDUE, IN_PROGRESS, NOT_STARTED],
+        default=COMPLETED,
+    ).astype(np.int8)
+
+
+def cost_status(df):
+    """Budget consumed / over budget / under budget code per task."""
+    variance = pd.to_numeric(df['Cost Variance'], errors='coerce').fillna(0).to_numpy()
+    return np.select([variance == 0, variance < 0], [BUDGET_CONSUMED, OVER_BUDGET], default=UNDER_BUDGET).astype(np.int8)
@@ -0,0 +1,22 @@
+"""Test setup: import the flat modules from the repo root, without side effects.
+
+The dataset store is created on import, so the history recorder, the
+workbook watcher and the caches are pointed away from the working tree
+before any test module imports it.
+"""
+import os
+import sys
+import tempfile
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+sys.path.insert(0, os.path.join(REPO_ROOT, "benchmarks"))
+
+os.environ.setdefault("SOLAR_CACHE_DIR", tempfile.mkdtemp(prefix="solar-test-cache-"))
+os.environ.setdefault("SOLAR_HISTORY", "0")
+os.environ.setdefault("SOLAR_WATCH", "0")
+
+# As in the app (dataset_store), whichever test module imports it first.
+import pandas as pd  # noqa: E402
+
+pd.set_option("mode.copy_on_write", True)
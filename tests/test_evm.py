@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from evm import TASK_METRICS, evm_arrays, evm_frame, planned_value_as_of, project_evm, time_phased_evm
+
+
+def tasks(start_dates, end_dates, budgets, percent=50, actual=100.0):
+    n = len(budgets)
+    return pd.DataFrame({
+        'Task': [f"T{i}" for i in range(n)],
+        'Category': 'A',
+        'Start Date': pd.to_datetime(start_dates),
+        'End Date': pd.to_datetime(end_dates),
+        'Budget': np.asarray(budgets, dtype=np.float64),
+        'Percent Complete': np.full(n, percent, dtype=np.float64),
+        'Actual Cost': np.full(n, actual),
+    })
+
+
+def progress_sheet():
+    """On plan and under cost; nothing spent yet; no budget; done exactly on budget."""
+    df = tasks(['2024-01-01'] * 4, ['2024-01-10'] * 4, [1000, 2000, 0, 500])
+    return df.assign(**{'Percent Complete': [50.0, 25.0, 0.0, 100.0], 'Actual Cost': [400.0, 0.0, 50.0, 500.0]})
+
+
+PLANNED = [600.0, 1000.0, 0.0, 500.0]
+
+
+def test_evm_arrays_per_task():
+    df = progress_sheet()
+    metrics = evm_arrays(df['Budget'], df['Actual Cost'], df['Percent Complete'], PLANNED)
+    expected = {
+        'PV': [600, 1000, 0, 500],
+        'EV': [500, 500, 0, 500],
+        'AC': [400, 0, 50, 500],
+        'SV': [-100, -500, 0, 0],
+        'CV': [100, 500, -50, 0],
+        # Zero PV and zero AC divide to 0.
+        'SPI': [500 / 600, 0.5, 0, 1],
+        'CPI': [1.25, 0, 0, 1],
+        # Without a CPI, the remaining budget is added to the actual cost.
+        'EAC': [800, 1500, 50, 500],
+        'ETC': [400, 1500, 0, 0],
+        'VAC': [200, 500, -50, 0],
+        # BAC - AC is 0 for the last task.
+        'TCPI': [500 / 600, 0.75, 0, 0],
+    }
+    for name, values in expected.items():
+        np.testing.assert_allclose(metrics[name], values, err_msg=name)
+
+
+def test_evm_arrays_plan_defaults_to_the_budget():
+    metrics = evm_arrays([1000.0], [400.0], [50.0])
+    assert metrics['PV'].tolist() == [1000]
+    assert metrics['SPI'].tolist() == [0.5]
+
+
+def test_evm_frame_adds_the_task_metrics():
+    df = progress_sheet().assign(Budget=['1000', 'tbc', None, 500])
+    frame = evm_frame(df, PLANNED)
+    assert frame.columns.tolist() == df.columns.tolist() + TASK_METRICS
+    # Unparseable and missing budgets count as 0.
+    np.testing.assert_allclose(frame['EV'], [500, 0, 0, 500])
+    np.testing.assert_allclose(frame['EAC'], [800, 0, 50, 500])
+    pd.testing.assert_frame_equal(frame[df.columns], df)
+
+
+def test_project_evm_applies_the_formulas_to_the_totals():
+    metrics = project_evm(progress_sheet(), PLANNED)
+    # BAC 3500, EV 1500, AC 950, PV 2100.
+    expected = {
+        'PV': 2100, 'EV': 1500, 'AC': 950, 'SV': -600, 'CV': 550, 'SPI': 1500 / 2100, 'CPI': 1500 / 950,
+        'EAC': 3500 * 950 / 1500, 'ETC': 3500 * 950 / 1500 - 950, 'VAC': 3500 - 3500 * 950 / 1500,
+        'TCPI': 2000 / 2550,
+    }
+    assert metrics == pytest.approx(expected)
+    assert project_evm(progress_sheet())['PV'] == pytest.approx(3500)
+
+
+def test_project_evm_without_budget_or_cost():
+    unbudgeted = progress_sheet().assign(Budget=0.0)
+    metrics = project_evm(unbudgeted)
+    assert metrics['EV'] == 0 and metrics['SPI'] == 0 and metrics['CPI'] == 0
+    assert metrics['EAC'] == pytest.approx(950) and metrics['VAC'] == pytest.approx(-950)
+    assert all(value == 0 for value in project_evm(unbudgeted.assign(**{'Actual Cost': 0.0})).values())
+    assert all(value == 0 for value in project_evm(tasks([], [], [])).values())
+
+
+def test_planned_value_as_of_spreads_budget_linearly():
+    df = tasks(['2024-01-01'], ['2024-01-10'], [1000])
+    assert planned_value_as_of(df, '2024-01-05')[0] == pytest.approx(500)
+    assert planned_value_as_of(df, '2024-02-01')[0] == pytest.approx(1000)
+    assert planned_value_as_of(df, '2023-12-31')[0] == 0
+
+
+def test_planned_value_as_of_gives_undated_tasks_no_pv():
+    df = tasks(['2024-01-01', None, '2024-01-01'], ['2024-01-10', '2024-01-10', None], [1000, 200_000, 800_000])
+    pv = planned_value_as_of(df, '2024-02-01')
+    assert pv.tolist() == pytest.approx([1000, 0, 0])
+
+
+def test_time_phased_evm_leaves_out_undated_tasks():
+    dated = tasks(['2024-01-01', '2024-01-05'], ['2024-01-10', '2024-01-20'], [1000, 500])
+    undated = tasks([None, '2024-01-03'], ['2024-01-12', None], [200_000, 800_000])
+    series = time_phased_evm(pd.concat([dated, undated], ignore_index=True), as_of='2024-01-15')
+    expected = time_phased_evm(dated, as_of='2024-01-15')
+    pd.testing.assert_frame_equal(series, expected)
+    assert series['PV'].iloc[-1] == pytest.approx(1500)
+
+
+def test_time_phased_evm_without_dated_tasks_is_empty():
+    assert time_phased_evm(tasks([None], [None], [100]), as_of='2024-01-15').empty
+    assert time_phased_evm(tasks([], [], []), as_of='2024-01-15').empty
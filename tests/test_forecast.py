@@ -0,0 +1,95 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import forecast
+from forecast import monte_carlo
+from loaders import process_risk, process_tasks
+from report import _forecast_html
+from schedule import Schedule
+from synthetic import make_risks, make_tasks
+
+AS_OF = pd.Timestamp('2024-03-01')
+
+
+@pytest.fixture(scope='module')
+def tasks():
+    return process_tasks(make_tasks(400, seed=6))
+
+
+@pytest.fixture(scope='module')
+def risks():
+    return process_risk(make_risks(30, seed=6))
+
+
+def run(tasks, risks=None, **kwargs):
+    return monte_carlo(tasks, risks, AS_OF, **{'iterations': 500, 'workers': 0, **kwargs})
+
+
+def test_same_seed_gives_the_same_forecast(tasks, risks):
+    first, second = run(tasks, risks, seed=1), run(tasks, risks, seed=1)
+    np.testing.assert_array_equal(first.finish, second.finish)
+    np.testing.assert_array_equal(first.cost, second.cost)
+    assert not np.array_equal(first.cost, run(tasks, risks, seed=2).cost)
+
+
+def test_sharded_runs_are_reproducible(tasks, risks):
+    first = run(tasks, risks, workers=2, iterations=400)
+    second = run(tasks, risks, workers=2, iterations=400)
+    assert first.iterations == 400
+    np.testing.assert_array_equal(first.finish, second.finish)
+    np.testing.assert_array_equal(first.cost, second.cost)
+
+
+def test_percentiles_are_ordered(tasks, risks):
+    result = run(tasks, risks)
+    finish = [result.finish_date(p) for p in forecast.PERCENTILES]
+    cost = [result.cost_at(p) for p in forecast.PERCENTILES]
+    assert finish == sorted(finish) and cost == sorted(cost)
+    assert result.summary().index.tolist() == [f"P{p}" for p in forecast.PERCENTILES]
+    assert 0 <= result.on_time_probability() <= 1
+    assert 0 <= result.within_budget_probability() <= 1
+
+
+def test_without_spread_the_forecast_is_the_critical_path(tasks, monkeypatch):
+    # Multipliers just under 1 everywhere: every run is the deterministic schedule.
+    monkeypatch.setattr(forecast, 'DURATION_SPREAD', (1 - 1e-9, 1.0, 1.0))
+    monkeypatch.setattr(forecast, 'COST_SPREAD', (1 - 1e-9, 1.0, 1.0))
+    result = run(tasks, iterations=50)
+    schedule = Schedule.build(tasks, AS_OF)
+    assert (np.ceil(result.finish) == schedule.finish).all()
+    percent = tasks['Percent Complete'].astype(np.float64) / 100
+    budget = tasks['Budget'].astype(np.float64)
+    expected = tasks['Actual Cost'].astype(np.float64).sum() + (budget * (1 - percent)).sum()
+    np.testing.assert_allclose(result.cost, expected, rtol=1e-6)
+
+
+def test_risks_push_the_forecast_out(tasks, risks):
+    severe = risks.assign(Probability='High', Impact='High', Status='Ongoing')
+    baseline, risky = run(tasks), run(tasks, severe)
+    assert risky.cost_at(50) > baseline.cost_at(50)
+    assert risky.finish_date(50) >= baseline.finish_date(50)
+
+
+def test_inactive_or_missing_risks_change_nothing(tasks, risks):
+    baseline = run(tasks)
+    mitigated = risks.assign(Status='Mitigated')
+    for register in (mitigated, risks.iloc[:0]):
+        result = run(tasks, register)
+        np.testing.assert_array_equal(result.finish, baseline.finish)
+        np.testing.assert_array_equal(result.cost, baseline.cost)
+
+
+def test_missing_dates_and_empty_tasks(tasks):
+    undated = tasks.copy()
+    undated.loc[[3, 50], 'Start Date'] = pd.NaT
+    undated.loc[[4, 50], 'End Date'] = pd.NaT
+    result = run(undated)
+    assert np.isfinite(result.finish).all()
+    assert result.finish_date(90) < pd.Timestamp('2030-01-01')
+
+    empty = run(tasks.iloc[:0])
+    assert empty.iterations == 500
+    assert empty.cost_at(50) == 0
+    assert empty.on_time_probability() is None
+    assert 'planned n/a:' in ' '.join(_forecast_html(empty).split())
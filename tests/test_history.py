@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import history
+from history import DatasetHistory, normalise
+from loaders import process_tasks
+from synthetic import make_tasks
+
+
+def version(raw):
+    return process_tasks(raw.reset_index(drop=True).copy())
+
+
+@pytest.fixture(scope='module')
+def versions():
+    """Successive task sheets: edits, deletes, inserts, a missing date and a repeated key."""
+    raw = make_tasks(300, seed=7)
+    sheets = [raw]
+    edited = raw.astype({'Percent Complete': float})
+    edited.loc[:20, 'Percent Complete'] = 100
+    edited.loc[5, 'Actual Cost'] = 12_345
+    sheets.append(edited)
+    edited = edited.drop(index=[7, 8])
+    edited = pd.concat([edited, raw.iloc[[0]].assign(Task='New task')])
+    sheets.append(edited)
+    edited = edited.copy()
+    edited.loc[30, 'Start Date'] = pd.NaT
+    edited.loc[31, 'Percent Complete'] = 42.5
+    sheets.append(edited)
+    sheets.append(pd.concat([edited, edited.iloc[[3]]]))
+    return [version(sheet) for sheet in sheets]
+
+
+def recorded(path, versions, start=1000.0):
+    dataset = DatasetHistory('tasks', str(path))
+    kinds = [dataset.append(data, start + 1000 * i) for i, data in enumerate(versions)]
+    return dataset, kinds
+
+
+def at(i, start=1000.0):
+    """A time just after the ``i``-th recorded version."""
+    return pd.Timestamp.fromtimestamp(start + 1000 * i + 500)
+
+
+def test_as_of_replays_every_recorded_version(tmp_path, versions):
+    _, kinds = recorded(tmp_path / 'tasks.history', versions)
+    assert kinds == ['keyframe'] + ['delta'] * (len(versions) - 1)
+    reopened = DatasetHistory('tasks', str(tmp_path / 'tasks.history'))
+    for i, data in enumerate(versions):
+        pd.testing.assert_frame_equal(reopened.as_of(at(i)).sort_index(), normalise('tasks', data).sort_index())
+    assert reopened.as_of(pd.Timestamp.fromtimestamp(999)) is None
+    assert reopened.as_of(at(2), columns=['Budget']).columns.tolist() == ['Budget']
+
+
+def test_keyframe_interval_bounds_the_replay(tmp_path, versions, monkeypatch):
+    monkeypatch.setattr(history, 'KEYFRAME_INTERVAL', 2)
+    dataset, kinds = recorded(tmp_path / 'tasks.history', versions)
+    assert kinds == ['keyframe', 'delta', 'keyframe', 'delta', 'keyframe']
+    for i, data in enumerate(versions):
+        pd.testing.assert_frame_equal(dataset.as_of(at(i)).sort_index(), normalise('tasks', data).sort_index())
+
+
+def test_unchanged_versions_are_not_recorded(tmp_path, versions):
+    dataset, kinds = recorded(tmp_path / 'tasks.history', [versions[0], versions[0].copy()])
+    assert kinds == ['keyframe', None]
+    # Dropping a column changes the layout: a keyframe.
+    assert dataset.append(versions[1].drop(columns=['System Size (kWp)']), 5000.0) == 'keyframe'
+
+
+def test_derived_is_built_once_per_recorded_version(tmp_path, versions, monkeypatch):
+    monkeypatch.setattr(history, 'MAX_DERIVED_VERSIONS', 2)
+    dataset, _ = recorded(tmp_path / 'tasks.history', versions)
+    built = []
+
+    def build(state):
+        built.append(len(state))
+        return state
+
+    first = dataset.derived(at(1), 'rows', build)
+    assert dataset.derived(at(1) + pd.Timedelta(seconds=100), 'rows', build) is first
+    pd.testing.assert_frame_equal(first.sort_index(), normalise('tasks', versions[1]).sort_index())
+    assert dataset.derived(pd.Timestamp.fromtimestamp(999), 'rows', build) is None
+    for i in (2, 3, 1):
+        dataset.derived(at(i), 'rows', build)
+    # Version 1 was the least recently used of three, so it is built again.
+    assert len(built) == 4
+
+
+def test_trace_follows_one_row(tmp_path, versions):
+    dataset, _ = recorded(tmp_path / 'tasks.history', versions)
+    keys = normalise('tasks', versions[0]).index
+    assert dataset.trace(keys[5], 'Actual Cost').tolist()[1:] == [12_345] * 4
+    deleted = dataset.trace(keys[7], 'Percent Complete')
+    assert deleted.notna().tolist() == [True, True, False, False, False]
+    assert dataset.trace('nobody', 'Budget').isna().all()
+
+
+def test_trend_matches_aggregating_each_version(tmp_path, versions):
+    dataset, _ = recorded(tmp_path / 'tasks.history', versions)
+    by_category = dataset.trend('Actual Cost', by='Category')
+    weighted = dataset.trend('Percent Complete', agg='mean', weight='Budget')['Total']
+    counts = dataset.trend(agg='count')['Total']
+    for i, data in enumerate(versions):
+        expected = data['Actual Cost'].astype(np.float64).groupby(data['Category'].astype(str)).sum()
+        pd.testing.assert_series_equal(by_category.iloc[i][expected.index], expected, check_names=False)
+        budget = data['Budget'].astype(np.float64)
+        assert weighted.iloc[i] == pytest.approx((data['Percent Complete'] * budget).sum() / budget.sum())
+        assert counts.iloc[i] == len(data)
+
+
+def test_a_torn_last_record_is_cut_off(tmp_path, versions):
+    path = tmp_path / 'tasks.history'
+    recorded(path, versions[:2])
+    size = path.stat().st_size
+    with open(path, 'ab') as f:
+        f.write(b'\x10\x00\x00\x00{"ti')
+    dataset = DatasetHistory('tasks', str(path))
+    assert len(dataset.records) == 2
+    assert dataset.append(versions[2], 9000.0) == 'delta'
+    reopened = DatasetHistory('tasks', str(path))
+    assert len(reopened.records) == 3
+    assert path.stat().st_size > size
+    pd.testing.assert_frame_equal(reopened.as_of(pd.Timestamp.fromtimestamp(9001)).sort_index(),
+                                  normalise('tasks', versions[2]).sort_index())
+
+
+def test_empty_history_and_empty_versions(tmp_path, versions):
+    dataset = DatasetHistory('tasks', str(tmp_path / 'tasks.history'))
+    assert dataset.as_of(pd.Timestamp.now()) is None
+    assert dataset.trend('Budget').empty
+    empty = versions[0].iloc[:0]
+    assert dataset.append(empty, 1000.0) == 'keyframe'
+    assert dataset.as_of(pd.Timestamp.fromtimestamp(1001)).empty
+    assert dataset.append(versions[0], 2000.0) is not None
+    assert dataset.trend(agg='count')['Total'].tolist() == [0, len(versions[0])]
@@ -0,0 +1,123 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import procurement_buckets, task_totals, update_procurement_buckets, update_task_totals
+from ingest import ingest
+from loaders import process_procurement, process_tasks
+from schema import KEYS
+from synthetic import make_procurement, make_tasks
+
+
+def load(name, raw, previous=None):
+    """``ingest`` of a copy of ``raw`` on top of ``previous`` (a prior ``load`` result)."""
+    process = {'tasks': process_tasks, 'procurement': process_procurement}[name]
+    if previous is None:
+        return ingest(raw.copy(), KEYS[name], process)
+    data, hashes, _ = previous
+    return ingest(raw.copy(), KEYS[name], process, data, hashes)
+
+
+def full(name, raw):
+    return {'tasks': process_tasks, 'procurement': process_procurement}[name](raw.copy())
+
+
+def as_rows(buckets):
+    """Buckets as plain rows; carried-forward buckets may hold Status as object rather than category."""
+    rows = buckets.reset_index().astype({'Month': str, 'Status': str})
+    return rows.sort_values(['Month', 'Status'], ignore_index=True)
+
+
+def edited_tasks(raw):
+    """Updates, deletes and inserts rows of a task sheet, keeping its row order."""
+    edited = raw.copy()
+    edited.loc[[3, 10, 11], 'Percent Complete'] = 100
+    edited.loc[20, 'Actual Cost'] = 123_456
+    edited.loc[21, 'Start Date'] = pd.NaT
+    edited = edited.drop(index=[30, 31])
+    inserted = raw.iloc[[0, 1]].assign(Task=['New task 1', 'New task 2'])
+    return pd.concat([edited, inserted], ignore_index=True)
+
+
+@pytest.fixture
+def raw_tasks():
+    return make_tasks(500, seed=1)
+
+
+def test_incremental_tasks_match_a_full_rebuild(raw_tasks):
+    edited = edited_tasks(raw_tasks)
+    data, _, delta = load('tasks', edited, load('tasks', raw_tasks))
+    pd.testing.assert_frame_equal(data, full('tasks', edited))
+    assert delta.summary() == {"Inserted": 2, "Updated": 5, "Deleted": 2}
+    assert not delta.reordered
+    assert data['Start Date'].isna().sum() == 1
+
+
+def test_carried_forward_aggregates_match_a_full_rebuild(raw_tasks):
+    previous = load('tasks', raw_tasks)
+    edited = edited_tasks(raw_tasks)
+    data, _, delta = load('tasks', edited, previous)
+    carried = update_task_totals(task_totals(previous[0]), delta)
+    pd.testing.assert_series_equal(carried, task_totals(full('tasks', edited)), rtol=1e-9)
+
+    raw_pos = make_procurement(400, seed=2)
+    previous = load('procurement', raw_pos)
+    edited = raw_pos.copy()
+    edited.loc[[5, 6], 'Status'] = 'Paid'
+    edited.loc[7, 'Total Cost'] = 99
+    edited.loc[8, 'Order Date'] = pd.NaT
+    edited = edited.drop(index=[9])
+    data, _, delta = load('procurement', edited, previous)
+    carried = update_procurement_buckets(procurement_buckets(previous[0]), delta)
+    expected = procurement_buckets(full('procurement', edited))
+    pd.testing.assert_frame_equal(as_rows(carried), as_rows(expected))
+
+
+def test_unchanged_sheet_gives_an_empty_delta(raw_tasks):
+    previous = load('tasks', raw_tasks)
+    data, _, delta = load('tasks', raw_tasks, previous)
+    assert len(delta) == 0
+    pd.testing.assert_frame_equal(data, previous[0])
+
+
+def test_reordered_rows_are_flagged(raw_tasks):
+    reordered = raw_tasks.iloc[::-1].reset_index(drop=True)
+    data, _, delta = load('tasks', reordered, load('tasks', raw_tasks))
+    assert delta.reordered
+    pd.testing.assert_frame_equal(data, full('tasks', reordered))
+
+
+def test_narrower_edit_keeps_the_values_of_a_full_rebuild(raw_tasks):
+    # One fractional percent makes the column float32; the re-read row alone is uint8.
+    raw = raw_tasks.astype({'Percent Complete': float})
+    raw.loc[4, 'Percent Complete'] = 12.5
+    edited = raw.copy()
+    edited.loc[6, 'Percent Complete'] = 60
+    data, _, delta = load('tasks', edited, load('tasks', raw))
+    assert delta.updated_new['Percent Complete'].dtype == np.uint8
+    expected = full('tasks', edited)
+    assert expected['Percent Complete'].dtype == np.float32
+    pd.testing.assert_frame_equal(data, expected)
+
+
+@pytest.mark.parametrize('edit', [
+    lambda raw: raw.assign(Notes='x'),
+    lambda raw: raw.rename(columns={'System Size (kWp)': 'System Size (kW)'}),
+    lambda raw: pd.concat([raw, raw.iloc[[0]]], ignore_index=True),
+    lambda raw: raw.drop(columns=['Category']),
+], ids=['column added', 'column renamed', 'duplicate key', 'key column missing'])
+def test_unusable_edits_fall_back_to_a_full_rebuild(raw_tasks, edit):
+    edited = edit(raw_tasks)
+    data, _, delta = load('tasks', edited, load('tasks', raw_tasks))
+    assert delta is None
+    pd.testing.assert_frame_equal(data, full('tasks', edited))
+
+
+def test_empty_sheets(raw_tasks):
+    empty = raw_tasks.iloc[:0]
+    data, _, delta = load('tasks', empty, load('tasks', raw_tasks))
+    assert data.empty and delta is None
+    data, _, delta = load('tasks', raw_tasks, load('tasks', empty))
+    pd.testing.assert_frame_equal(data, full('tasks', raw_tasks))
+    assert task_totals(load('tasks', empty)[0])['Tasks'] == 0
+    assert np.isfinite(task_totals(load('tasks', empty)[0]).to_numpy()).all()
@@ -0,0 +1,129 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest import ingest
+from loaders import process_procurement
+from procurement import ProcurementIndex, update_procurement_index
+from schema import KEYS
+from synthetic import make_procurement
+
+BUCKET_KEYS = [('M', None), ('W', None), ('M', 'Status'), ('W', 'Supplier')]
+
+
+def purchase_orders(n=300, seed=3, undated=(4, 50)):
+    raw = make_procurement(n, seed)
+    raw.loc[list(undated), 'Order Date'] = pd.NaT
+    return raw
+
+
+@pytest.fixture
+def raw():
+    return purchase_orders()
+
+
+@pytest.fixture
+def df(raw):
+    return process_procurement(raw.copy())
+
+
+def expected_buckets(df, freq, by):
+    """The same buckets through a pandas resample over the dated POs."""
+    rule = {'M': 'ME', 'W': 'W-SUN'}[freq]
+    dated = df[df['Order Date'].notna()].astype({'Order Date': 'datetime64[ns]'})
+    cost = dated['Total Cost'].astype(np.float64)
+    if by is None:
+        frame = cost.set_axis(dated['Order Date']).resample(rule).sum().to_frame('Total Cost')
+    else:
+        column = {'Status': 'Status', 'Supplier': 'Vendor/Supplier Name'}[by]
+        frame = dated.assign(cost=cost).pivot_table(index=pd.Grouper(key='Order Date', freq=rule), columns=column,
+                                                    values='cost', aggfunc='sum', fill_value=0, observed=True)
+        frame = frame.asfreq(rule, fill_value=0)
+        frame.columns = pd.Index(list(frame.columns), dtype=object)
+    frame.index.name = 'Order Date'
+    return frame
+
+
+@pytest.mark.parametrize('freq,by', BUCKET_KEYS)
+def test_buckets_match_a_pandas_resample(df, freq, by):
+    buckets = ProcurementIndex(df).buckets(freq, by)
+    expected = expected_buckets(df, freq, by)
+    pd.testing.assert_frame_equal(buckets[sorted(buckets.columns)], expected[sorted(expected.columns)],
+                                  check_freq=False, check_index_type=False)
+
+
+def test_window_queries_match_pandas(df):
+    index = ProcurementIndex(df)
+    start, end = pd.Timestamp('2024-03-10'), pd.Timestamp('2025-02-20')
+    in_window = df['Order Date'].between(start, end)
+    assert index.total_cost(start, end) == pytest.approx(df.loc[in_window, 'Total Cost'].astype(np.float64).sum())
+    assert index.total_cost() == pytest.approx(df.loc[df['Order Date'].notna(), 'Total Cost'].astype(np.float64).sum())
+
+    rows = index.rows(start, end, statuses=['Paid', 'Shipped'], suppliers=['Solar Tech'])
+    wanted = in_window & df['Status'].isin(['Paid', 'Shipped']) & (df['Vendor/Supplier Name'] == 'Solar Tech')
+    expected = df[wanted].sort_values('Order Date', kind='stable').index.to_numpy()
+    np.testing.assert_array_equal(rows, expected)
+
+    counts = index.counts('Status', rows=index.rows(start, end))
+    pd.testing.assert_series_equal(counts.sort_index(), df.loc[in_window, 'Status'].astype(object).value_counts()
+                                   .rename_axis('Status').rename('count').sort_index(), check_index_type=False)
+
+
+def test_undated_orders_are_outside_every_window(df):
+    index = ProcurementIndex(df)
+    rows = index.rows()
+    assert len(rows) == len(df)
+    assert set(rows[-2:]) == {4, 50}
+    assert not {4, 50} & set(index.rows('2000-01-01', '2100-01-01'))
+    assert index.buckets('M')['Total Cost'].sum() == pytest.approx(index.total_cost())
+
+
+def carried_forward(raw, edited, warm=BUCKET_KEYS):
+    previous = process_procurement(raw.copy())
+    index = ProcurementIndex(previous)
+    for freq, by in warm:
+        index.buckets(freq, by)
+    _, _, delta = ingest(edited.copy(), KEYS['procurement'], process_procurement,
+                         previous, ingest(raw.copy(), KEYS['procurement'], process_procurement)[1])
+    # As in the dataset store: without a delta the index is rebuilt.
+    return update_procurement_index(index, delta) if delta is not None else None
+
+
+def test_appended_orders_match_a_fresh_index(raw):
+    appended = purchase_orders(40, seed=4, undated=(7,))
+    appended['PO Number'] = 'NEW-' + appended['PO Number']
+    # A supplier and a month the index hasn't seen yet.
+    appended.loc[0, 'Vendor/Supplier Name'] = 'New Supplier'
+    appended.loc[1, 'Order Date'] = pd.Timestamp('2028-06-15')
+    edited = pd.concat([raw, appended], ignore_index=True)
+
+    index = carried_forward(raw, edited)
+    fresh = ProcurementIndex(process_procurement(edited.copy()))
+    assert index is not None
+    np.testing.assert_array_equal(index.rows(), fresh.rows())
+    assert index.labels == fresh.labels
+    assert index.total_cost('2024-01-01', '2025-06-30') == pytest.approx(fresh.total_cost('2024-01-01', '2025-06-30'))
+    for freq, by in BUCKET_KEYS:
+        pd.testing.assert_frame_equal(index.buckets(freq, by), fresh.buckets(freq, by))
+
+
+@pytest.mark.parametrize('edit', [
+    lambda raw: raw.drop(index=[10]),
+    lambda raw: raw.assign(Status=raw['Status'].where(raw.index != 10, 'Paid')),
+    lambda raw: raw.iloc[::-1],
+], ids=['deleted', 'updated', 'reordered'])
+def test_other_edits_rebuild_the_index(raw, edit):
+    edited = edit(raw).reset_index(drop=True)
+    if edited.equals(raw):
+        pytest.skip("edit left the sheet unchanged")
+    assert carried_forward(raw, edited) is None
+
+
+def test_empty_index(df):
+    index = ProcurementIndex(df.iloc[:0])
+    assert index.rows().size == 0
+    assert index.total_cost() == 0
+    assert index.buckets('M').empty
+    assert index.cost_over_time('W', 'Status').empty
+    # Nothing to reuse from an empty sheet: ingest processes it in full.
+    assert carried_forward(purchase_orders(0, undated=()), purchase_orders(20, undated=())) is None
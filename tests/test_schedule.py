@@ -0,0 +1,108 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from ingest import ingest
+from loaders import process_tasks
+from schedule import Schedule, parse_predecessors, update_schedule
+from schema import KEYS
+from synthetic import make_tasks
+
+AS_OF = pd.Timestamp('2024-02-15')
+RESULTS = ['early_start', 'early_finish', 'late_start', 'late_finish', 'total_float', 'slip', 'status']
+
+
+def chain(predecessors, percent=0, start='2024-03-01'):
+    """Tasks of 10 days each, all planned to start on ``start``."""
+    n = len(predecessors)
+    return pd.DataFrame({
+        'Task': [f"T{i + 1}" for i in range(n)],
+        'Category': 'Site A',
+        'Start Date': pd.Timestamp(start),
+        'End Date': pd.Timestamp(start) + pd.Timedelta(days=10),
+        'Percent Complete': percent,
+        'Predecessors': predecessors,
+    })
+
+
+def assert_same_schedule(schedule, expected):
+    assert schedule.finish == expected.finish
+    for name in RESULTS:
+        np.testing.assert_array_equal(getattr(schedule, name), getattr(expected, name), err_msg=name)
+
+
+def test_forward_and_backward_pass_over_a_small_network():
+    # T1 -> T2 -> T4 is the long path; T3 runs beside T2 with float but finishes after its planned end.
+    df = chain([None, '1', 'T1', 'T2; T3']).assign(
+        **{'End Date': pd.to_datetime(['2024-03-11', '2024-03-11', '2024-03-04', '2024-03-11'])})
+    schedule = Schedule.build(df, AS_OF)
+    frame = schedule.frame(df)
+    assert frame['Forecast Finish'].dt.strftime('%m-%d').tolist() == ['03-11', '03-21', '03-14', '03-31']
+    assert frame['Total Float (days)'].tolist() == [0, 0, 7, 0]
+    assert frame['Schedule'].tolist() == ['Critical', 'Critical', 'At risk', 'Critical']
+    assert schedule.forecast_finish() == pd.Timestamp('2024-03-31')
+
+
+def test_unresolved_and_cyclic_predecessors():
+    sources, targets, problems = parse_predecessors(chain([None, '1, 9', 'nope', '2']))
+    assert sorted(zip(sources.tolist(), targets.tolist())) == [(0, 1), (1, 3)]
+    assert problems == [(1, '9'), (2, 'nope')]
+
+    # T1 and T2 depend on each other: both are scheduled without their dependencies.
+    schedule = Schedule.build(chain(['2', '1', '2']), AS_OF)
+    assert schedule.graph.cyclic.tolist() == [0, 1, 2]
+    assert schedule.frame(chain(['2', '1', '2']))['Forecast Start'].nunique() == 1
+
+
+def test_missing_dates_are_placed_on_the_other_date_or_the_as_of_date():
+    df = chain([None, None, None]).astype({'Start Date': 'datetime64[s]', 'End Date': 'datetime64[s]'})
+    df.loc[0, 'Start Date'] = pd.NaT
+    df.loc[1, 'End Date'] = pd.NaT
+    df.loc[2, ['Start Date', 'End Date']] = pd.NaT
+    frame = Schedule.build(df, AS_OF).frame(df)
+    assert frame['Forecast Start'].tolist() == [pd.Timestamp('2024-03-11'), pd.Timestamp('2024-03-01'), AS_OF]
+    assert (frame['Forecast Finish'] == frame['Forecast Start']).all()
+    assert frame['Total Float (days)'].between(0, 30).all()
+
+
+def test_empty_schedule():
+    df = chain([])
+    schedule = Schedule.build(df, AS_OF)
+    assert schedule.forecast_finish() is None and schedule.planned_finish() is None
+    assert schedule.frame(df).empty
+
+
+# --- Carry forward ---
+@pytest.fixture
+def raw():
+    return make_tasks(600, seed=5)
+
+
+def carried_forward(raw, edited):
+    """``update_schedule`` over the delta between two sheets, next to a fresh build."""
+    previous, hashes, _ = ingest(raw.copy(), KEYS['tasks'], process_tasks)
+    data, _, delta = ingest(edited.copy(), KEYS['tasks'], process_tasks, previous, hashes)
+    schedule = Schedule.build(previous, AS_OF)
+    return update_schedule(schedule, delta), Schedule.build(data, AS_OF)
+
+
+@pytest.mark.parametrize('edit', [
+    lambda raw: raw.assign(**{'Percent Complete': raw['Percent Complete'].where(~raw.index.isin([5, 250, 251]), 100)}),
+    lambda raw: raw.assign(**{'End Date': raw['End Date'].where(raw.index != 399, raw['End Date'] + pd.Timedelta(days=90))}),
+    lambda raw: raw.assign(**{'Start Date': raw['Start Date'].where(raw.index != 10, raw['Start Date'] + pd.Timedelta(days=3))}),
+    lambda raw: raw.assign(**{'Start Date': raw['Start Date'].where(raw.index != 20, pd.NaT)}),
+], ids=['progress', 'finish moved', 'start slipped', 'start removed'])
+def test_carried_forward_schedule_matches_a_fresh_build(raw, edit):
+    carried, fresh = carried_forward(raw, edit(raw))
+    assert carried is not None
+    assert_same_schedule(carried, fresh)
+
+
+@pytest.mark.parametrize('edit', [
+    lambda raw: raw.drop(index=[7]).reset_index(drop=True),
+    lambda raw: pd.concat([raw, raw.iloc[[0]].assign(Task='New task')], ignore_index=True),
+    lambda raw: raw.assign(Predecessors=raw['Predecessors'].where(raw.index != 30, None)),
+], ids=['deleted', 'inserted', 'dependencies changed'])
+def test_other_edits_rebuild_the_schedule(raw, edit):
+    carried, _ = carried_forward(raw, edit(raw))
+    assert carried is None
@@ -0,0 +1,114 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from schema import IssueLog, compatible, concat, conform, day_number, day_numbers, issue_log, money_sum, row_keys
+
+
+def raw_tasks(**columns):
+    base = {
+        'Task': ['Survey', 'Piling', 'Cabling'],
+        'Category': ['Site B', 'Site A', 'Site A'],
+        'Start Date': ['2024-01-01', '2024-01-05', '2024-01-09'],
+        'End Date': ['2024-01-10', '2024-01-20', '2024-01-30'],
+        'Percent Complete': [100, 50, 0],
+        'Budget': [1000, 2500, 4000],
+        'Actual Cost': [900, 1200, 0],
+    }
+    return pd.DataFrame({**base, **columns})
+
+
+def test_declared_types():
+    df = conform('tasks', raw_tasks(Extra=['a', 'b', 'c']))
+    assert df['Task'].dtype == object
+    assert isinstance(df['Category'].dtype, pd.CategoricalDtype)
+    assert df['Category'].cat.categories.tolist() == ['Site A', 'Site B']
+    assert df['Start Date'].dtype == 'datetime64[s]'
+    assert df['Percent Complete'].dtype == np.uint8
+    assert df['Budget'].dtype == np.float32
+    # Undeclared columns pass through.
+    assert df['Extra'].tolist() == ['a', 'b', 'c']
+
+
+def test_bad_and_missing_values_are_kept_and_reported():
+    df = conform('tasks', raw_tasks(**{
+        'Start Date': ['2024-01-01', 'soon', None],
+        'Percent Complete': [100, 'half', 140],
+        'Budget': [1000, 'tbc', None],
+    }))
+    assert len(df) == 3
+    assert df['Start Date'].isna().tolist() == [False, True, True]
+    assert df['Percent Complete'].tolist() == [100, 0, 100]
+    assert df['Budget'].tolist() == [1000, 0, 0]
+    issues = issue_log.issues('tasks', df)
+    reported = set(zip(issues['Key'], issues['Column'], issues['Problem']))
+    assert reported == {
+        ('Site A / Piling', 'Start Date', 'not a date'),
+        ('Site A / Cabling', 'Start Date', 'missing'),
+        ('Site A / Piling', 'Percent Complete', 'not a percentage from 0 to 100'),
+        ('Site A / Cabling', 'Percent Complete', 'not a percentage from 0 to 100'),
+        ('Site A / Piling', 'Budget', 'not a number'),
+    }
+
+
+def test_fractional_values_widen_the_column():
+    df = conform('tasks', raw_tasks(**{'Percent Complete': [100, 12.5, 0], 'Budget': [1000, 20_000_000.25, 4000]}))
+    assert df['Percent Complete'].dtype == np.float32
+    # float32 can't hold $20M to the cent, so the column stays float64.
+    assert df['Budget'].dtype == np.float64
+    assert df['Budget'][1] == 20_000_000.25
+    # Cents below $131k are exact in float32.
+    assert conform('tasks', raw_tasks(Budget=[0.25, 130_000.75, 1]))['Budget'].dtype == np.float32
+
+
+def test_money_sum_accumulates_in_float64():
+    values = pd.Series(np.full(1_000_000, 0.1, dtype=np.float32))
+    assert money_sum(values) == pytest.approx(100_000, abs=1)
+    assert money_sum(pd.Series([np.nan, 1.5])) == 1.5
+    assert money_sum(pd.Series([], dtype=np.float32)) == 0
+
+
+def test_day_numbers():
+    days, valid = day_numbers(pd.Series([pd.Timestamp('1970-01-02'), pd.NaT, pd.Timestamp('2024-03-01 18:00')]))
+    assert days.tolist() == [1, 0, day_number('2024-03-01')]
+    assert valid.tolist() == [True, False, True]
+    assert day_numbers(pd.Series([], dtype='datetime64[s]'))[0].dtype == np.int64
+
+
+def test_empty_sheet():
+    df = conform('tasks', raw_tasks().iloc[:0].copy())
+    assert df.empty
+    assert df['Start Date'].dtype == 'datetime64[s]'
+    assert isinstance(df['Category'].dtype, pd.CategoricalDtype)
+
+
+def test_issue_log_replaces_the_issues_of_reread_keys():
+    log = IssueLog()
+    keys = pd.Series(['a', 'b'])
+    log.record('tasks', keys, pd.DataFrame({'Key': ['a', 'b'], 'Column': 'Budget', 'Value': 'x',
+                                            'Problem': 'not a number'}))
+    # Only row 'a' is re-read, and it is now valid.
+    log.record('tasks', pd.Series(['a']), pd.DataFrame(columns=['Key', 'Column', 'Value', 'Problem']))
+    assert log.issues('tasks')['Key'].tolist() == ['b']
+    # Issues of rows that have since been deleted are dropped.
+    remaining = pd.DataFrame({'Category': ['x'], 'Task': ['y']})
+    assert log.issues('tasks', remaining).empty
+    assert row_keys('tasks', remaining).tolist() == ['x / y']
+
+
+def test_concat_matches_conforming_the_whole_sheet():
+    raw = raw_tasks(**{'Category': ['Site B', 'Site A', 'Site C'], 'Percent Complete': [100, 12.5, 0]})
+    whole = conform('tasks', raw.copy())
+    # Re-read separately, the parts get their own categories and numeric widths.
+    parts = [conform('tasks', raw.iloc[:1].copy()), conform('tasks', raw.iloc[1:].copy())]
+    assert parts[0]['Percent Complete'].dtype == np.uint8
+    assert all(compatible(a, b) for a, b in zip(parts[0].dtypes, parts[1].dtypes))
+    pd.testing.assert_frame_equal(concat(parts), whole)
+
+
+def test_compatible():
+    category = pd.CategoricalDtype(['a'])
+    assert compatible(category, pd.CategoricalDtype(['b']))
+    assert compatible(np.dtype(np.uint8), np.dtype(np.float32))
+    assert not compatible(np.dtype('datetime64[s]'), np.dtype(np.float64))
+    assert not compatible(np.dtype(object), category)
@@ -0,0 +1,83 @@
+import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from aggregates import procurement_buckets
+from dataset_store import Snapshot
+from evm import evm_rollup
+from filters import FilterIndex
+from loaders import process_procurement, process_tasks
+from storage import SqlStorage
+from synthetic import make_procurement, make_tasks
+
+FILTERS = [
+    (['PR0001, Site', 'PR0003, Site'], '', datetime.date(2024, 1, 1), datetime.date(2025, 12, 31)),
+    (['PR0002, Site'], 'test', datetime.date(2024, 2, 1), datetime.date(2024, 3, 31)),
+    (['PR0001, Site'], 'ÜMLAUT', datetime.date(2024, 1, 1), datetime.date(2025, 12, 31)),
+    ([], '', datetime.date(2024, 1, 1), datetime.date(2025, 12, 31)),
+]
+
+
+def task_versions():
+    raw = make_tasks(700, seed=8)
+    edited = raw.astype({'Percent Complete': float}).drop(index=[3, 4])
+    edited.loc[10:40, 'Percent Complete'] = 100
+    edited.loc[50, 'Start Date'] = pd.NaT
+    edited.loc[51, 'Task'] = 'Testing Ümlaut'
+    return [Snapshot('tasks', 1, process_tasks(raw.copy()), 'test'),
+            Snapshot('tasks', 2, process_tasks(edited.reset_index(drop=True)), 'test')]
+
+
+def mirrored(path, *snapshots):
+    storage = SqlStorage(str(path))
+    for snapshot in snapshots:
+        # What sync() queues on the writer thread, run inline.
+        storage._write(snapshot)
+    return storage
+
+
+@pytest.mark.parametrize('filters', FILTERS, ids=['categories', 'search and dates', 'non-ASCII search', 'nothing selected'])
+def test_mirrored_queries_match_pandas_after_each_version(tmp_path, filters):
+    first, second = task_versions()
+    storage = mirrored(tmp_path / 'solar.db', first)
+    for snapshot in (first, second):
+        if snapshot is second:
+            storage._write(second)
+        assert storage.holds(snapshot)
+        index = FilterIndex(snapshot.data)
+        np.testing.assert_array_equal(storage.filter_rows(snapshot, *filters), np.flatnonzero(index.mask(*filters)))
+        expected = evm_rollup(index.filter(*filters))
+        pd.testing.assert_frame_equal(storage.evm_rollup(snapshot, *filters), expected,
+                                      check_index_type=False, check_dtype=False, rtol=1e-6)
+    assert not storage.holds(first)
+
+
+def test_mirror_matches_a_fresh_rebuild(tmp_path):
+    first, second = task_versions()
+    updated = mirrored(tmp_path / 'updated.db', first, second)
+    fresh = mirrored(tmp_path / 'fresh.db', second)
+    for filters in FILTERS:
+        np.testing.assert_array_equal(updated.filter_rows(second, *filters), fresh.filter_rows(second, *filters))
+    assert updated._read_sql('SELECT * FROM tasks').equals(fresh._read_sql('SELECT * FROM tasks'))
+    # A late write of an older version is ignored.
+    updated._write(first)
+    assert updated.holds(second)
+
+
+def test_procurement_buckets_match_pandas(tmp_path):
+    raw = make_procurement(500, seed=8)
+    snapshot = Snapshot('procurement', 1, process_procurement(raw.copy()), 'test')
+    storage = mirrored(tmp_path / 'solar.db', snapshot)
+    buckets = storage.procurement_buckets(snapshot)
+    expected = procurement_buckets(snapshot.data)
+    expected.index = expected.index.set_levels(expected.index.levels[1].astype(object), level='Status')
+    pd.testing.assert_frame_equal(buckets, expected.sort_index(), rtol=1e-6)
+
+
+def test_queries_wait_for_the_mirror(tmp_path):
+    first, _ = task_versions()
+    storage = SqlStorage(str(tmp_path / 'solar.db'))
+    assert storage.filter_rows(first, *FILTERS[0]) is None
+    assert storage.evm_rollup(first, *FILTERS[0]) is None
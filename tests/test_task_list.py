@@ -0,0 +1,23 @@
+import numpy as np
+import pandas as pd
+
+from task_list import sort_order
+
+
+def test_missing_values_sort_last_and_every_row_is_kept():
+    dates = pd.Series(pd.to_datetime(['2024-03-01', None, '2024-01-01', '2024-02-01', None]), index=[10, 11, 12, 13, 14])
+    assert sort_order(dates).tolist() == [2, 3, 0, 1, 4]
+    assert sort_order(dates, ascending=False).tolist() == [0, 3, 2, 1, 4]
+
+    costs = pd.Series([5.0, np.nan, 1.0, 5.0])
+    assert sort_order(costs).tolist() == [2, 0, 3, 1]
+    assert sort_order(costs, ascending=False).tolist() == [0, 3, 2, 1]
+    assert sorted(sort_order(costs)) == list(range(len(costs)))
+
+
+def test_sorted_positions_give_a_monotonic_column():
+    values = pd.Series(pd.to_datetime(['2024-05-01', '2024-01-01', None, '2024-03-01']))
+    ordered = values.iloc[sort_order(values)]
+    assert ordered.dropna().is_monotonic_increasing
+    assert ordered.iloc[-1] is pd.NaT
+    assert sort_order(values.iloc[:0]).size == 0
@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from loaders import process_tasks
+from synthetic import make_tasks
+from timeline import aggregate_timeline, build_timeline_figure
+
+
+@pytest.fixture(scope='module')
+def undated():
+    """Tasks with a missing start, a missing end, and one category with no dates at all."""
+    df = process_tasks(make_tasks(300, seed=9))
+    df.loc[3, 'Start Date'] = pd.NaT
+    df.loc[4, 'End Date'] = pd.NaT
+    df.loc[[5, 6], ['Start Date', 'End Date']] = pd.NaT
+    df['Category'] = df['Category'].astype(object)
+    df.loc[[5, 6], 'Category'] = 'Undated'
+    return df
+
+
+@pytest.mark.parametrize('bar_budget, level', [(500, 'task'), (200, 'lane'), (8, 'group')])
+def test_undated_tasks_are_left_out(undated, bar_budget, level):
+    bars, used = aggregate_timeline(undated, bar_budget=bar_budget)
+    assert used == level
+    assert len(bars) <= bar_budget
+    assert bars['Tasks'].sum() == len(undated) - 2
+    assert 'Undated' not in set(bars['Group'])
+    # Every other group keeps its bars, all within the planned dates.
+    assert set(bars['Group']) == set(undated['Category']) - {'Undated'}
+    earliest = undated['Start Date'].min().value // 1_000_000
+    assert (bars['Start'] >= earliest).all() and (bars['End'] >= bars['Start']).all()
+
+
+def test_one_date_makes_a_point_and_keeps_the_row_position(undated):
+    bars, _ = aggregate_timeline(undated)
+    assert 5 not in bars.index and 6 not in bars.index
+    end = undated.loc[3, 'End Date'].value // 1_000_000
+    start = undated.loc[4, 'Start Date'].value // 1_000_000
+    assert bars.loc[3, ['Start', 'End']].tolist() == [end, end]
+    assert bars.loc[4, ['Start', 'End']].tolist() == [start, start]
+
+    highlight = np.where(np.arange(len(undated)) == 7, 'red', None)
+    fig = build_timeline_figure(undated, highlight=highlight)
+    outlined = [trace for trace in fig.data if 'red' in list(trace.marker.line.color)]
+    assert len(outlined) == 1
+    assert '2 tasks without dates not shown' in fig.layout.annotations[0].text
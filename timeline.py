@@ -0,0 +1,178 @@
+"""Server-side aggregated Gantt/timeline figures.
+
+Large schedules are reduced before they reach the browser:
+
+1. Up to ``bar_budget`` tasks are drawn one bar per task, as before.
+2. Beyond that, tasks are lane-packed within each group (Category by
+   default): non-overlapping tasks share a row.  Within a lane, neighbouring
+   tasks separated by less than a gap threshold are merged into one bar; the
+   threshold is chosen so the bar count fits the budget exactly.
+3. If a group has more lanes than the budget allows, each group collapses to
+   a single span.
+
+Bars are emitted as one horizontal ``go.Bar`` trace per group built straight
+from NumPy arrays.  Streamlit does not send zoom events back to the server,
+so drill-down is done by re-building the figure for one group or date window.
+"""
+import heapq
+import os
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from plotly.colors import qualitative
+
+DEFAULT_BAR_BUDGET = int(os.environ.get("SOLAR_TIMELINE_BARS", "500"))
+_MS_PER_DAY = 86_400_000
+
+
+def lane_pack(starts, ends):
+    """Assigns each interval the lowest lane free at its start (greedy partitioning).
+
+    Returns an int array of lane numbers; intervals in one lane never overlap.
+    """
+    order = np.lexsort((ends, starts))
+    lanes = np.empty(len(starts), dtype=np.int64)
+    free = []  # heap of (lane end, lane)
+    lane_count = 0
+    for i in order:
+        if free and free[0][0] <= starts[i]:
+            _, lane = heapq.heappop(free)
+        else:
+            lane = lane_count
+            lane_count += 1
+        lanes[i] = lane
+        heapq.heappush(free, (ends[i], lane))
+    return lanes
+
+
+def _milliseconds(column):
+    """Epoch milliseconds of a date column, and where it has a date."""
+    dates = pd.to_datetime(column).to_numpy().astype('datetime64[ms]')
+    return dates.astype(np.int64), ~np.isnat(dates)
+
+
+def aggregate_timeline(df, group_by='Category', bar_budget=DEFAULT_BAR_BUDGET):
+    """Reduces ``df`` to at most ``bar_budget`` bars.
+
+    Returns a frame with Group, Row, Start, End, Tasks, Budget and Progress
+    columns (one row per bar) and the detail level used: 'task', 'lane' or
+    'group'.  Tasks with neither date are left out.
+    """
+    starts, start_valid = _milliseconds(df['Start Date'])
+    ends, end_valid = _milliseconds(df['End Date'])
+    # A task with one date is drawn on it; one with neither can't be placed and is left out.
+    placed = np.flatnonzero(start_valid | end_valid)
+    starts, ends = np.where(start_valid, starts, ends)[placed], np.where(end_valid, ends, starts)[placed]
+    ends = np.maximum(ends, starts)
+    groups = df[group_by].astype(str).to_numpy()[placed]
+    budget = pd.to_numeric(df['Budget'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)[placed]
+    percent = pd.to_numeric(df['Percent Complete'], errors='coerce').fillna(0).to_numpy(dtype=np.float64)[placed]
+
+    if len(placed) <= bar_budget:
+        # Indexed by position in ``df``, for ``highlight``.
+        bars = pd.DataFrame({
+            'Group': groups, 'Row': df['Task'].astype(str).to_numpy()[placed], 'Start': starts, 'End': ends,
+            'Tasks': 1, 'Budget': budget, 'Progress': percent,
+        }, index=placed)
+        return bars, 'task'
+
+    # Lane-pack each group; a row is (group, lane).
+    group_codes, group_names = pd.factorize(groups, sort=True)
+    lanes = np.empty(len(placed), dtype=np.int64)
+    for code in range(len(group_names)):
+        members = np.flatnonzero(group_codes == code)
+        lanes[members] = lane_pack(starts[members], ends[members])
+    row_codes, row_keys = pd.factorize(pd.MultiIndex.from_arrays([group_codes, lanes]), sort=True)
+
+    if len(row_keys) > bar_budget:
+        # Even one bar per lane is too many: one span per group.
+        segment = group_codes
+        level = 'group'
+    else:
+        # Sort by (row, start) and merge neighbours whose gap is below the
+        # threshold; keeping the (budget - rows) largest gaps as bar breaks
+        # hits the budget exactly.
+        order = np.lexsort((starts, row_codes))
+        sorted_rows = row_codes[order]
+        # Tasks in a lane never overlap, so the gap is start minus previous end.
+        gaps = np.r_[np.inf, starts[order][1:] - ends[order][:-1]].astype(np.float64)
+        new_row = np.r_[True, sorted_rows[1:] != sorted_rows[:-1]]
+        gaps[new_row] = np.inf
+        breaks_allowed = bar_budget - len(row_keys)
+        inner_gaps = np.sort(gaps[~new_row])[::-1]
+        threshold = inner_gaps[breaks_allowed] if breaks_allowed < inner_gaps.size else -np.inf
+        boundary = new_row | (gaps > threshold)
+        segment = np.empty(len(placed), dtype=np.int64)
+        segment[order] = np.cumsum(boundary) - 1
+        level = 'lane'
+
+    bars = pd.DataFrame({
+        'segment': segment, 'row': row_codes if level == 'lane' else group_codes, 'group': group_codes,
+        'Start': starts, 'End': ends, 'Budget': budget, 'earned': budget * percent,
+    }).groupby('segment').agg(
+        row=('row', 'first'), group=('group', 'first'), Start=('Start', 'min'), End=('End', 'max'),
+        Tasks=('Start', 'size'), Budget=('Budget', 'sum'), earned=('earned', 'sum'),
+    )
+    bars['Group'] = np.asarray(group_names)[bars['group'].to_numpy()]
+    if level == 'lane':
+        lane_numbers = np.asarray([lane for _, lane in row_keys])[bars['row'].to_numpy()]
+        bars['Row'] = bars['Group'] + ' · lane ' + (lane_numbers + 1).astype(str)
+    else:
+        bars['Row'] = bars['Group']
+    bars['Progress'] = np.divide(bars['earned'], bars['Budget'], out=np.zeros(len(bars)), where=bars['Budget'].to_numpy() != 0)
+    return bars[['Group', 'Row', 'Start', 'End', 'Tasks', 'Budget', 'Progress']].reset_index(drop=True), level
+
+
+def build_timeline_figure(df, group_by='Category', bar_budget=DEFAULT_BAR_BUDGET, title=None, color_map=None,
+                          highlight=None):
+    """Timeline figure for ``df`` with at most ``bar_budget`` bars.
+
+    ``highlight`` gives an outline colour (or None) per row of ``df``; it
+    applies when tasks are drawn one bar each.
+    """
+    bars, level = aggregate_timeline(df, group_by, bar_budget) if not df.empty else (pd.DataFrame(), 'task')
+    fig = go.Figure()
+    palette = qualitative.Plotly
+    for i, (group, part) in enumerate(bars.groupby('Group', sort=False) if not bars.empty else []):
+        start = part['Start'].to_numpy()
+        duration = part['End'].to_numpy() - start
+        if level == 'task':
+            hover = part['Row'] + '<br>' + part['Progress'].round(1).astype(str) + '% complete'
+        else:
+            hover = (part['Tasks'].astype(str) + ' tasks<br>Budget $' + part['Budget'].round(0).astype(np.int64).astype(str)
+                     + '<br>' + part['Progress'].round(1).astype(str) + '% complete (budget-weighted)')
+        marker_line = {}
+        if level == 'task' and highlight is not None:
+            outline = np.asarray(highlight, dtype=object)[part.index.to_numpy()]
+            marker_line = dict(marker_line_color=np.where(pd.isna(outline), 'rgba(0,0,0,0)', outline),
+                               marker_line_width=np.where(pd.isna(outline), 0, 3))
+        fig.add_trace(go.Bar(
+            name=str(group),
+            orientation='h',
+            base=pd.to_datetime(start, unit='ms'),
+            # Duration in ms on a date axis, as px.timeline does.
+            x=np.maximum(duration, _MS_PER_DAY // 24),
+            y=part['Row'].to_numpy(),
+            marker_color=(color_map or {}).get(group, palette[i % len(palette)]),
+            hovertext=hover.to_numpy(),
+            hoverinfo='text+name',
+            **marker_line,
+        ))
+    fig.update_layout(barmode='overlay', title=title, xaxis_type='date', legend_title_text=group_by)
+    fig.update_yaxes(autorange="reversed")
+    shown = int(bars['Tasks'].sum()) if not bars.empty else 0
+    notes = []
+    if level != 'task':
+        notes.append(f"{shown} tasks shown as {len(bars)} bars ({'lane-packed' if level == 'lane' else 'one per ' + group_by})")
+    if shown < len(df):
+        notes.append(f"{len(df) - shown} tasks without dates not shown")
+    if notes:
+        fig.add_annotation(text='; '.join(notes), xref='paper', yref='paper', x=0, y=1.05, showarrow=False)
+    return fig
+
+
+def category_colors(categories):
+    """Stable Category -> colour map, so filtered and full timelines agree."""
+    palette = qualitative.Plotly
+    return {category: palette[i % len(palette)] for i, category in enumerate(categories)}
@@ -0,0 +1,31 @@
+"""Process pools for the CPU-bound work: forecasts, site loads and reports.
+
+Workers are spawned, never forked: the parent runs Streamlit, watchdog and
+Kaleido threads that must not be duplicated into them.  Queues passed to
+spawned workers must come from the same context, ``SPAWN``.
+"""
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+SPAWN = multiprocessing.get_context("spawn")
+
+
+def spawn_pool(workers, initializer=None, initargs=()):
+    """A new pool of ``workers`` spawned processes."""
+    return ProcessPoolExecutor(workers, mp_context=SPAWN, initializer=initializer, initargs=initargs)
+
+
+class LazyPool:
+    """A spawned pool started on first use and kept for the life of the process."""
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get(self, workers):
+        """The pool, started with ``workers`` processes if this is the first use."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = spawn_pool(workers)
+            return self._executor